@@ -0,0 +1,103 @@
+"""
+Benchmark of the embedding backends.
+
+Embeds the same chunks with the PyTorch (sentence-transformers) backend and the quantized ONNX backend, reports
+chunks/sec of each and the cosine agreement of their vectors.
+
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 models/all-MiniLM-L6-v2
+    python resources/bench_embedder.py --onnx-path models/all-MiniLM-L6-v2 --quantize
+    python resources/bench_embedder.py --onnx-path models/all-MiniLM-L6-v2 --chunks 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from langchain_core.embeddings.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from shapeandshare.agents.core.services.vector.onnx_embedder import OnnxEmbeddings
+
+
+def quantize(onnx_path: Path) -> None:
+    """Writes `model_quantized.onnx`, the dynamic int8 quantization of `model.onnx`"""
+    # pylint: disable-next=import-outside-toplevel
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        model_input=onnx_path / "model.onnx",
+        model_output=onnx_path / "model_quantized.onnx",
+        weight_type=QuantType.QInt8,
+    )
+    print(f"wrote {onnx_path / 'model_quantized.onnx'}")
+
+
+def load_chunks(source: Path, count: int) -> list[str]:
+    """Chunks of the source tree, split as ingestion splits them"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
+    chunks: list[str] = []
+    for path in sorted(source.rglob("*")):
+        if path.suffix in {".py", ".md", ".yaml"} and path.is_file():
+            chunks.extend(splitter.split_text(path.read_text(encoding="utf-8", errors="ignore")))
+        if len(chunks) >= count:
+            break
+    if not chunks:
+        raise ValueError(f"no chunks found under {source}")
+    # repeat the tree when it is smaller than the requested count
+    return (chunks * (count // len(chunks) + 1))[:count]
+
+
+def run(name: str, embedder: Embeddings, chunks: list[str]) -> np.ndarray:
+    embedder.embed_documents(chunks[:8])  # warm up
+    start = time.perf_counter()
+    vectors = np.array(embedder.embed_documents(chunks), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<10} {elapsed:8.2f} s  {len(chunks) / elapsed:10,.1f} chunks/s")
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the embedding backends")
+    parser.add_argument("--onnx-path", type=Path, required=True, help="Directory of the ONNX export")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="PyTorch model name")
+    parser.add_argument("--chunks", type=int, default=2000, help="Number of chunks to embed")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per inference")
+    parser.add_argument("--source", type=Path, default=Path(__file__).resolve().parent.parent / "src")
+    parser.add_argument("--quantize", action="store_true", help="Quantize model.onnx to int8 and exit")
+    args = parser.parse_args()
+
+    if args.quantize:
+        quantize(onnx_path=args.onnx_path)
+        return
+
+    # pylint: disable-next=import-outside-toplevel
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    chunks = load_chunks(source=args.source, count=args.chunks)
+    print(f"{len(chunks)} chunks, batch size {args.batch_size}")
+
+    torch_vectors = run(
+        name="pytorch",
+        embedder=HuggingFaceEmbeddings(model_name=args.model, encode_kwargs={"batch_size": args.batch_size}),
+        chunks=chunks,
+    )
+    onnx_vectors = run(
+        name="onnx",
+        embedder=OnnxEmbeddings(model_path=args.onnx_path, batch_size=args.batch_size),
+        chunks=chunks,
+    )
+
+    torch_vectors /= np.linalg.norm(torch_vectors, axis=1, keepdims=True)
+    onnx_vectors /= np.linalg.norm(onnx_vectors, axis=1, keepdims=True)
+    cosine = (torch_vectors * onnx_vectors).sum(axis=1)
+    print(f"  cosine agreement: mean {cosine.mean():.4f}  p1 {np.percentile(cosine, 1):.4f}  min {cosine.min():.4f}")
+
+
+if __name__ == "__main__":
+    main()
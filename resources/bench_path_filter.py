@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the repository path filter.
+
+Compares the compiled `PathFilter` against the previous substring based `_filter_files` on a synthetic list of
+repository paths.
+
+    python resources/bench_path_filter.py --paths 100000
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# pylint: disable-next=wrong-import-position
+from shapeandshare.agents.core.framework.common.utils.path_filter import PathFilter
+
+EXTENSIONS = {".py", ".md", ".txt", ".yaml", ".yml", ".sh", ".toml", ".env"}
+INCLUDED_FILES = {"Makefile"}
+EXCLUDED_DIRS = {".git", "__pycache__", "node_modules", "venv", ".env", ".idea"}
+GITIGNORE = ["*.log", "build/", "dist/", "/coverage", "**/generated/**", "!important.log"]
+
+
+def generate_paths(count: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    dirs = ["src", "lib", "docs", "tests", "environment", "node_modules", "build", "pkg", "internal", "generated"]
+    names = ["main", "util", "index", "README", "config", "service", "model", "handler", "test_api", "Makefile"]
+    suffixes = [".py", ".md", ".js", ".ts", ".json", ".yaml", ".log", ".png", ""]
+
+    paths: list[str] = []
+    for _ in range(count):
+        depth = rng.randint(0, 6)
+        parts = [rng.choice(dirs) + (str(rng.randint(0, 20)) if rng.random() < 0.5 else "") for _ in range(depth)]
+        name = rng.choice(names)
+        if name != "Makefile":
+            name += rng.choice(suffixes)
+        paths.append("/".join(parts + [name]))
+    return paths
+
+
+def legacy_filter(paths: list[str]) -> list[str]:
+    """The substring filter `AnalysisService._filter_files` used before `PathFilter`"""
+    filtered = []
+    for file_path in paths:
+        path = Path(file_path)
+        if any(excluded in str(path.parent) for excluded in EXCLUDED_DIRS):
+            continue
+        if path.name in INCLUDED_FILES or path.suffix.lower() in EXTENSIONS:
+            filtered.append(file_path)
+    return filtered
+
+
+def compiled_filter(paths: list[str], gitignore: bool) -> list[str]:
+    path_filter = PathFilter(extensions=EXTENSIONS, included_files=INCLUDED_FILES, excluded_dirs=EXCLUDED_DIRS)
+    if gitignore:
+        path_filter.add_gitignore(GITIGNORE)
+    return path_filter.filter(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the repository path filter")
+    parser.add_argument("--paths", type=int, default=100_000, help="Number of synthetic paths")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs (best is reported)")
+    args = parser.parse_args()
+
+    paths = generate_paths(count=args.paths)
+    candidates = {
+        "legacy substring filter": lambda: legacy_filter(paths),
+        "PathFilter": lambda: compiled_filter(paths, gitignore=False),
+        "PathFilter + .gitignore": lambda: compiled_filter(paths, gitignore=True),
+    }
+
+    print(f"{len(paths)} paths, best of {args.repeat} runs")
+    for name, candidate in candidates.items():
+        best = min(timeit.repeat(candidate, number=1, repeat=args.repeat))
+        kept = len(candidate())
+        print(f"  {name:<26} {best * 1000:8.1f} ms  {len(paths) / best:12,.0f} paths/s  kept {kept}")
+
+    # the substring test also drops directories which merely contain an excluded name (e.g. `environment/`)
+    legacy_kept = set(legacy_filter(paths))
+    wrongly_excluded = [path for path in compiled_filter(paths, gitignore=False) if path not in legacy_kept]
+    print(f"  paths wrongly excluded by the substring filter: {len(wrongly_excluded)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import os
 from pathlib import Path
-import fnmatch
 import sys
 import argparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shapeandshare.agents.core.framework.common.utils.path_filter import PathFilter
+
 
 def detect_language(filename):
     """Simple file extension to language mapping."""
@@ -28,31 +31,21 @@ def detect_language(filename):
     return ext_map.get(Path(filename).suffix.lower(), 'text')
 
 
-def should_skip(path, excluded_patterns, excluded_dirs, excluded_extensions):
+def should_skip(path, path_filter, excluded_extensions):
     """
-    Check if a file or directory should be skipped based on exclusion rules.
+    Check if a file should be skipped based on exclusion rules.
 
     Args:
-        path: Path to check
-        excluded_patterns: List of glob patterns to exclude
-        excluded_dirs: List of directory names to exclude
-        excluded_extensions: List of file extensions to exclude
+        path: Path to check, relative to the root directory
+        path_filter: PathFilter compiled from the excluded directories and patterns
+        excluded_extensions: Set of file extensions to exclude
     """
-    # Convert path to Path object for easier handling
-    path_obj = Path(path)
-
-    # Check if path matches any excluded pattern
-    for pattern in excluded_patterns:
-        if fnmatch.fnmatch(str(path_obj), pattern):
-            return True
-
-    # Check if any parent directory should be excluded
-    for parent in path_obj.parents:
-        if parent.name in excluded_dirs:
-            return True
+    # Excluded directories and patterns (gitignore syntax) are decided by the shared filter
+    if not path_filter.matches(path.replace(os.sep, '/')):
+        return True
 
     # Check file extension
-    if path_obj.suffix.lower() in excluded_extensions:
+    if Path(path).suffix.lower() in excluded_extensions:
         return True
 
     return False
@@ -73,7 +66,7 @@ def generate_claude_context(
         root_dir (str): Root directory to scan
         max_file_size_mb (float): Maximum file size in MB to process
         allowed_extensions (set): Set of allowed extensions (e.g., {'.py', '.txt'})
-        excluded_patterns (list): List of glob patterns to exclude (e.g., ['*.log', '*.tmp'])
+        excluded_patterns (list): List of gitignore style patterns to exclude (e.g., ['*.log', '*.tmp'])
         excluded_dirs (list): List of directory names to exclude (e.g., ['node_modules', '.git'])
         excluded_extensions (list): List of file extensions to exclude (e.g., ['.pyc', '.class'])
     """
@@ -85,17 +78,22 @@ def generate_claude_context(
     excluded_dirs = excluded_dirs or []
     excluded_extensions = set(ext.lower() for ext in (excluded_extensions or []))
 
+    # Compile the exclusion rules once, the root .gitignore is honoured as well
+    path_filter = PathFilter(excluded_dirs=excluded_dirs)
+    gitignore = os.path.join(root_dir, '.gitignore')
+    if os.path.isfile(gitignore):
+        with open(gitignore, 'r', encoding='utf-8') as f:
+            path_filter.add_gitignore(f.read().splitlines())
+    path_filter.add_gitignore(excluded_patterns)
+
     # Start with project structure overview
     output.append("<project_structure>")
     for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Skip excluded directories
-        dirnames[:] = [d for d in dirnames if d not in excluded_dirs]
-
         rel_path = os.path.relpath(dirpath, root_dir)
+        rel_dir = '' if rel_path == '.' else rel_path.replace(os.sep, '/')
 
-        # Skip if this directory matches exclusion patterns
-        if should_skip(rel_path, excluded_patterns, excluded_dirs, excluded_extensions):
-            continue
+        # Skip excluded directories
+        dirnames[:] = [d for d in dirnames if not path_filter.excludes_dir(f"{rel_dir}/{d}".lstrip('/'))]
 
         if rel_path == '.':
             output.append(f"Root directory: {os.path.basename(os.path.abspath(root_dir))}")
@@ -103,28 +101,30 @@ def generate_claude_context(
             output.append(f"Directory: {rel_path}")
 
         for file in filenames:
-            filepath = os.path.join(rel_path, file)
-            if not should_skip(filepath, excluded_patterns, excluded_dirs, excluded_extensions):
+            filepath = f"{rel_dir}/{file}".lstrip('/')
+            if not should_skip(filepath, path_filter, excluded_extensions):
                 output.append(f"  - {file}")
 
     output.append("</project_structure>\n")
 
     # Process each file
     for dirpath, dirnames, filenames in os.walk(root_dir):
+        rel_dir = os.path.relpath(dirpath, root_dir).replace(os.sep, '/')
+        rel_dir = '' if rel_dir == '.' else rel_dir
+
         # Skip excluded directories
-        dirnames[:] = [d for d in dirnames if d not in excluded_dirs]
+        dirnames[:] = [d for d in dirnames if not path_filter.excludes_dir(f"{rel_dir}/{d}".lstrip('/'))]
 
         for filename in filenames:
             filepath = os.path.join(dirpath, filename)
             relative_path = os.path.relpath(filepath, root_dir)
-            file_extension = os.path.splitext(filename)[1].lower()
 
             # Skip if file matches exclusion criteria
-            if should_skip(relative_path, excluded_patterns, excluded_dirs, excluded_extensions):
+            if should_skip(relative_path, path_filter, excluded_extensions):
                 continue
 
             # Skip if not in allowed extensions (if specified)
-            if allowed_extensions and file_extension not in allowed_extensions:
+            if allowed_extensions and Path(filename).suffix.lower() not in allowed_extensions:
                 continue
 
             try:
@@ -171,7 +171,8 @@ if __name__ == "__main__":
     parser.add_argument('--max-size', type=float, default=5, help='Maximum file size in MB')
     parser.add_argument('--extensions', type=str,
                         help='Comma-separated list of allowed extensions (e.g., .py,.txt,.md)')
-    parser.add_argument('--exclude-patterns', type=str, help='Comma-separated list of glob patterns to exclude')
+    parser.add_argument('--exclude-patterns', type=str,
+                        help='Comma-separated list of gitignore style patterns to exclude')
     parser.add_argument('--exclude-dirs', type=str, help='Comma-separated list of directory names to exclude')
     parser.add_argument('--exclude-extensions', type=str, help='Comma-separated list of file extensions to exclude')
 
@@ -97,3 +97,68 @@ def demand_env_var_as_bool(name: str) -> bool:
     if value_str in ("false", "0"):
         return False
     raise EnvironmentVariableNotFoundError(f"Environment variable ({name}) not boolean and can not be loaded")
+
+
+def get_env_var_as_int(name: str, default: int) -> int:
+    """
+    Returns an environment variable as an int, otherwise the provided default if it does not exist.
+
+    Parameters
+    ----------
+    name: str
+        The name of the environment variable.
+    default: int
+        The value to return when the environment variable is not set.
+
+    Returns
+    -------
+        The environment variables value as an int, or the default.
+    """
+
+    value: str | None = get_env_var(name=name)
+    if value is None:
+        return default
+    return int(value)
+
+
+def get_env_var_as_float(name: str, default: float) -> float:
+    """
+    Returns an environment variable as a float, otherwise the provided default if it does not exist.
+
+    Parameters
+    ----------
+    name: str
+        The name of the environment variable.
+    default: float
+        The value to return when the environment variable is not set.
+
+    Returns
+    -------
+        The environment variables value as a float, or the default.
+    """
+
+    value: str | None = get_env_var(name=name)
+    if value is None:
+        return default
+    return float(value)
+
+
+def get_env_var_as_bool(name: str, default: bool) -> bool:
+    """
+    Returns an environment variable as a bool, otherwise the provided default if it does not exist.
+
+    Parameters
+    ----------
+    name: str
+        The name of the environment variable.
+    default: bool
+        The value to return when the environment variable is not set.
+
+    Returns
+    -------
+        The environment variables value as a bool, or the default.
+    """
+
+    if get_env_var(name=name) is None:
+        return default
+    return demand_env_var_as_bool(name=name)
@@ -0,0 +1,188 @@
+""" Compiled repository path filter. """
+
+import re
+from typing import Iterable
+
+
+class IgnoreRule:
+    """A single compiled `.gitignore` pattern"""
+
+    __slots__ = ("regex", "negate", "dir_only")
+
+    def __init__(self, regex: re.Pattern, negate: bool, dir_only: bool):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+
+    @staticmethod
+    def parse(line: str, base: str = "") -> "IgnoreRule | None":
+        """
+        Compiles a `.gitignore` line, returns `None` for blank lines and comments.
+
+        Parameters
+        ----------
+        line: str
+            The pattern line.
+        base: str
+            The directory (relative to the repository root) containing the `.gitignore` file.
+
+        Returns
+        -------
+            The compiled rule, or `None`.
+        """
+
+        line = line.rstrip("\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            return None
+
+        negate: bool = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+
+        dir_only: bool = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        # a slash anywhere but the end anchors the pattern to the directory of the .gitignore file
+        anchored: bool = "/" in line
+        line = line.lstrip("/")
+
+        prefix: str = re.escape(base.strip("/") + "/") if base.strip("/") else ""
+        if not anchored:
+            prefix += "(?:.*/)?"
+        return IgnoreRule(
+            regex=re.compile(f"^{prefix}{IgnoreRule._translate(line)}$"), negate=negate, dir_only=dir_only
+        )
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        parts: list[str] = []
+        i: int = 0
+        size: int = len(pattern)
+        while i < size:
+            char: str = pattern[i]
+            if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+                parts.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("**", i) and i + 2 == size and (i == 0 or pattern[i - 1] == "/"):
+                parts.append(".*")
+                i += 2
+            elif char == "*":
+                parts.append("[^/]*")
+                i += 1
+            elif char == "?":
+                parts.append("[^/]")
+                i += 1
+            elif char == "[":
+                end: int = pattern.find("]", i + 2)
+                if end == -1:
+                    parts.append(re.escape(char))
+                    i += 1
+                else:
+                    body: str = pattern[i + 1 : end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    parts.append(f"[{body}]")
+                    i = end + 1
+            elif char == "\\" and i + 1 < size:
+                parts.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                parts.append(re.escape(char))
+                i += 1
+        return "".join(parts)
+
+
+class PathFilter:
+    """
+    Decides which repository paths should be read.
+
+    Paths are split into components once; excluded directories, file names and extensions are set lookups, and
+    the decision for each directory (excluded name or `.gitignore` match) is made once and reused for every file
+    beneath it. `.gitignore` rules follow git's precedence, the last matching rule wins and a file can not be
+    re-included when one of its parent directories is ignored.
+
+    Methods
+    -------
+    add_gitignore(self, lines: Iterable[str], base: str = "") -> None
+        Adds the rules of a `.gitignore` file located in the `base` directory.
+    matches(self, path: str) -> bool
+        Whether the path (relative to the repository root, `/` separated) passes the filter.
+    filter(self, paths: Iterable[str]) -> list[str]
+        The paths which pass the filter, in order.
+    excludes_dir(self, directory: str) -> bool
+        Whether nothing beneath the directory passes the filter, used to prune directory walks.
+    """
+
+    def __init__(
+        self,
+        extensions: Iterable[str] | None = None,
+        included_files: Iterable[str] | None = None,
+        excluded_dirs: Iterable[str] | None = None,
+    ):
+        # `None` extensions allows every file which is not excluded
+        self.extensions: frozenset[str] | None = (
+            frozenset(extension.lower() for extension in extensions) if extensions is not None else None
+        )
+        self.included_files: frozenset[str] = frozenset(included_files or ())
+        self.excluded_dirs: frozenset[str] = frozenset(excluded_dirs or ())
+        self.rules: list[IgnoreRule] = []
+        self._dirs: dict[str, bool] = {}
+
+    def add_gitignore(self, lines: Iterable[str], base: str = "") -> None:
+        for line in lines:
+            rule: IgnoreRule | None = IgnoreRule.parse(line=line, base=base)
+            if rule is not None:
+                self.rules.append(rule)
+        # earlier directory decisions may no longer hold
+        self._dirs.clear()
+
+    def matches(self, path: str) -> bool:
+        directory, _, name = path.rpartition("/")
+        if directory and self.excludes_dir(directory=directory):
+            return False
+
+        if name not in self.included_files:
+            if self.extensions is not None and self._suffix(name=name) not in self.extensions:
+                return False
+
+        return not (self.rules and self._ignored(path=path, is_dir=False))
+
+    def filter(self, paths: Iterable[str]) -> list[str]:
+        return [path for path in paths if self.matches(path=path)]
+
+    def excludes_dir(self, directory: str) -> bool:
+        if not directory:
+            return False
+
+        excluded: bool | None = self._dirs.get(directory)
+        if excluded is None:
+            parent, _, name = directory.rpartition("/")
+            excluded = (
+                name in self.excluded_dirs
+                or self.excludes_dir(directory=parent)
+                or bool(self.rules and self._ignored(path=directory, is_dir=True))
+            )
+            self._dirs[directory] = excluded
+        return excluded
+
+    @staticmethod
+    def _suffix(name: str) -> str:
+        # same as `os.path.splitext`, leading dots do not start an extension (`.env` has none)
+        dot: int = name.rfind(".")
+        if dot <= 0 or not name[:dot].strip("."):
+            return ""
+        return name[dot:].lower()
+
+    def _ignored(self, path: str, is_dir: bool) -> bool:
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(path):
+                return not rule.negate
+        return False
@@ -0,0 +1,194 @@
+""" Staged, bounded-queue processing pipeline. """
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger()
+
+# marks the end of a stage's input
+_END = object()
+
+
+class StageStats(BaseModel):
+    """Live counters of a pipeline stage"""
+
+    name: str
+    workers: int
+    queue_size: int
+    queue_depth: int = 0  # items waiting in the stage's input queue
+    received: int = 0  # items taken from the input queue
+    emitted: int = 0  # items handed to the next stage
+    busy_seconds: float = 0.0  # summed over the stage's workers
+    throughput: float = 0.0  # received items per second since the pipeline started
+    utilization: float = 0.0  # busy fraction of the stage's workers
+
+
+class Stage(BaseModel):
+    """
+    A step of a `Pipeline`.
+
+    `process` maps one input item to any number of output items (none drops it). `workers` threads run it
+    concurrently, reading from an input queue bounded to `queue_size` items, so a slow stage blocks the ones
+    before it instead of letting work pile up in memory. An `ordered` stage emits outputs in input order whatever
+    order its workers finish in. `flush` is called once after the last input, for stages which hold state (e.g. a
+    pending batch), and requires a single worker.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    name: str
+    process: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+    queue_size: int = 8
+    ordered: bool = False
+    flush: Callable[[], Iterable[Any]] | None = None
+
+    stats: StageStats | None = None
+    input: queue.Queue | None = None
+    lock: threading.Condition = Field(default_factory=threading.Condition)
+    next_in: int = 0  # sequence number of the next input to emit, for ordered stages
+    next_out: int = 0  # sequence number of the next output
+    running: int = 0  # workers which have not seen the end of the input
+
+
+class Pipeline(BaseModel):
+    """
+    Runs items through stages connected by bounded queues, each stage with its own worker threads.
+
+    I/O bound and CPU bound stages overlap, and at most `queue_size` items wait in front of each stage. The outputs
+    of the last stage are discarded. The first exception raised by a stage stops the pipeline: remaining items are
+    drained without being processed and `run` re-raises it.
+
+    Methods
+    -------
+    run(self, source: Iterable[Any]) -> None
+        Feeds the source through every stage, returns once all items went through the last stage.
+    stats(self) -> list[StageStats]
+        A snapshot of the per stage counters, safe to call from other threads while running.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    stages: list[Stage]
+
+    started: float | None = None
+    error: BaseException | None = None
+    aborted: threading.Event = Field(default_factory=threading.Event)
+
+    def run(self, source: Iterable[Any]) -> None:
+        for stage in self.stages:
+            if stage.flush is not None and stage.workers != 1:
+                raise ValueError(f"stage {stage.name} has a flush and {stage.workers} workers")
+            stage.stats = StageStats(name=stage.name, workers=stage.workers, queue_size=stage.queue_size)
+            stage.input = queue.Queue(maxsize=stage.queue_size)
+            stage.next_in, stage.next_out, stage.running = 0, 0, stage.workers
+        self.started = time.perf_counter()
+        self.error = None
+        self.aborted.clear()
+
+        threads: list[threading.Thread] = [
+            threading.Thread(target=self._work, args=(index,), name=f"pipeline-{stage.name}-{worker}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for worker in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for sequence, item in enumerate(source):
+                if self.aborted.is_set():
+                    break
+                self.stages[0].input.put((sequence, item))
+        except BaseException as error:  # pylint: disable=broad-except
+            self._abort(error=error)
+        finally:
+            self.stages[0].input.put(_END)
+            for thread in threads:
+                thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+    def stats(self) -> list[StageStats]:
+        elapsed: float = max(time.perf_counter() - self.started, 1e-9) if self.started else 0.0
+        snapshots: list[StageStats] = []
+        for stage in self.stages:
+            if stage.stats is None:
+                continue
+            snapshot: StageStats = stage.stats.model_copy()
+            snapshot.queue_depth = stage.input.qsize()
+            if elapsed:
+                snapshot.throughput = snapshot.received / elapsed
+                snapshot.utilization = snapshot.busy_seconds / (elapsed * stage.workers)
+            snapshots.append(snapshot)
+        return snapshots
+
+    def _work(self, stage_index: int) -> None:
+        stage: Stage = self.stages[stage_index]
+        while True:
+            entry = stage.input.get()
+            if entry is _END:
+                # every worker sees the end, the last one to stop flushes and ends the next stage's input
+                with stage.lock:
+                    stage.running -= 1
+                    last: bool = stage.running == 0
+                if last:
+                    self._finish(stage_index=stage_index)
+                else:
+                    stage.input.put(_END)
+                return
+
+            sequence, item = entry
+            outputs: list[Any] = []
+            started: float = time.perf_counter()
+            try:
+                if not self.aborted.is_set():
+                    outputs = list(stage.process(item))
+            except BaseException as error:  # pylint: disable=broad-except
+                self._abort(error=error)
+            finally:
+                busy: float = time.perf_counter() - started
+                with stage.lock:
+                    stage.stats.received += 1
+                    stage.stats.busy_seconds += busy
+                    # an ordered stage releases outputs in input order, a failed item still releases its turn
+                    while stage.ordered and stage.next_in != sequence:
+                        stage.lock.wait()
+                    for output in outputs:
+                        self._emit(stage_index=stage_index, item=output)
+                    stage.next_in += 1
+                    stage.lock.notify_all()
+
+    def _finish(self, stage_index: int) -> None:
+        stage: Stage = self.stages[stage_index]
+        try:
+            if stage.flush is not None and not self.aborted.is_set():
+                with stage.lock:
+                    for output in stage.flush():
+                        self._emit(stage_index=stage_index, item=output)
+        except BaseException as error:  # pylint: disable=broad-except
+            self._abort(error=error)
+        finally:
+            if stage_index + 1 < len(self.stages):
+                self.stages[stage_index + 1].input.put(_END)
+
+    def _emit(self, stage_index: int, item: Any) -> None:
+        # called with the emitting stage's lock held, so sequence numbers follow emit order
+        stage: Stage = self.stages[stage_index]
+        stage.stats.emitted += 1
+        if stage_index + 1 < len(self.stages):
+            self.stages[stage_index + 1].input.put((stage.next_out, item))
+        stage.next_out += 1
+
+    def _abort(self, error: BaseException) -> None:
+        if not self.aborted.is_set():
+            logger.error(f"pipeline stopped: {error}")
+            self.error = error
+            self.aborted.set()
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class ExtractionReport(BaseModel):
+    """What happened to the files of a repository while its content was extracted"""
+
+    files_listed: int = 0  # in the working tree
+    files_filtered: int = 0  # left to read after the path filters
+    files_read: int = 0
+    bytes_read: int = 0  # utf-8 encoded size of the text which was read
+    errors: dict[str, str] = {}  # path -> reason the file could not be read
+    skipped: dict[str, int] = {}  # SkipReason -> number of files which were not read for it
+    truncated: int = 0  # files of which only the beginning was read
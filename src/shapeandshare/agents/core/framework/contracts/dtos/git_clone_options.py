@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class GitCloneOptions(BaseModel):
+    """How much of a repository is transferred and checked out when cloning"""
+
+    depth: int | None = None  # shallow clone depth, full history when None
+    blobless: bool = False  # --filter=blob:none, only the blobs which are checked out are fetched
+    sparse_patterns: list[str] | None = None  # non-cone sparse-checkout patterns, full checkout when None
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class IngestionCheckpoint(BaseModel):
+    """Progress of an ingestion job, so a redelivered job resumes instead of starting over"""
+
+    id: str  # the collection id, one ingestion runs per collection at a time
+    repository_id: str
+    commit: str | None = None
+    base_commit: str | None = None  # set for refreshes
+    model_name: str  # vectors of a job are never mixed across embedding models
+    paths: list[str] | None = None  # files (re-)written by a refresh, None when the whole repository is ingested
+    stale: list[str] = []  # files whose vectors a refresh drops before writing
+    rebuild_id: str | None = None  # the new collection a refresh re-ingesting every file writes, it replaces `id`
+    files_committed: int = 0  # leading files (in listing order) whose chunks are all written
+    chunks_written: int = 0
+    updated: datetime | None = None
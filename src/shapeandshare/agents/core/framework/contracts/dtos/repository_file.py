@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class RepositoryFile(BaseModel):
+    """A file in a repository working tree"""
+
+    path: str  # relative to the working tree
+    size: int  # bytes
+    sha: str | None = None  # git blob sha, None when the file was not enumerated from the git index
@@ -18,4 +18,8 @@ class RepositoryEvent(BaseEvent):
     repository_id: str
     collection_id: str | None = None
     url: str | None = None
+    commit: str | None = None
+    base_commit: str | None = None  # previously indexed commit, set when refreshing
+    refresh: bool = False  # the repository is indexed and queryable, set even when `base_commit` is unavailable
+    clone_seconds: float | None = None  # set on REPOSITORY_CLONED
     error_details: str | None = None
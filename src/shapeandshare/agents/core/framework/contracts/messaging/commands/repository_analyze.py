@@ -7,3 +7,6 @@ class RepositoryAnalyzeCommand(BaseCommand):
     repository_id: str
     collection_id: str
     analysis_config: dict
+    commit: str | None = None
+    base_commit: str | None = None
+    refresh: bool = False  # the collection is live, a full re-ingest goes into a new collection
@@ -7,3 +7,4 @@ class RepositoryCloneCommand(BaseCommand):
     url: str
     repository_id: str
     collection_id: str
+    base_commit: str | None = None
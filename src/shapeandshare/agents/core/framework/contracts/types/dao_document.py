@@ -3,3 +3,5 @@ from enum import Enum
 
 class DaoDocumentType(str, Enum):
     METADATA = "metadata"
+    EMBEDDING = "embedding"
+    CHECKPOINT = "checkpoint"
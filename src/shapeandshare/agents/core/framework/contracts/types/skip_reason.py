@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class SkipReason(str, Enum):
+    """Why a repository file was not ingested"""
+
+    TOO_LARGE = "too_large"
+    BINARY = "binary"
+    LOCKFILE = "lockfile"
+    GENERATED = "generated"
+    MINIFIED = "minified"
+    VENDORED = "vendored"
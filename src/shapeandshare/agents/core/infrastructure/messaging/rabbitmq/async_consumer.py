@@ -0,0 +1,272 @@
+import asyncio
+import inspect
+import json
+import logging
+from functools import partial
+from typing import Any, Callable
+
+import pika
+from pika.adapters.asyncio_connection import AsyncioConnection
+from pika.channel import Channel
+from pika.exceptions import AMQPConnectionError
+from pydantic import BaseModel, Field
+
+from ....framework.contracts.dtos.rabbitmq_config import RabbitMQConfig
+
+logger = logging.getLogger()
+
+
+class Subscription(BaseModel):
+    """
+    A queue consumed by a `ConsumerHost`, with up to `concurrency` of its messages handled at once.
+
+    `message_handler` is either a coroutine function, awaited on the host's event loop, or a plain function, run in
+    a thread of the loop's default executor.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    message_handler: Callable
+    exchange_name: str
+    routing_key: str
+    queue_name: str
+    concurrency: int = 1
+
+    delivered: int = 0  # messages received
+    redelivered: int = 0  # messages received again, e.g. after a connection was lost while processing them
+    retried: int = 0  # failed messages republished for another attempt
+    dead_lettered: int = 0  # failed messages rejected after their last attempt
+
+    channel: Channel | None = None
+    consumer_tag: str | None = None
+    tasks: set[asyncio.Task] = Field(default_factory=set)
+
+
+class ConsumerHost(BaseModel):
+    """
+    Consumes several queues over one connection on an asyncio event loop.
+
+    Every subscription gets its own channel with the broker's prefetch set to its `concurrency`, so the broker never
+    delivers more of its messages than it has handler slots, and a busy queue cannot starve the others. Acks,
+    retries and dead-lettering follow `MessageConsumer`. Consuming stops when the connection or one of the channels
+    is lost, handlers which are still running are then awaited (for at most `shutdown_timeout` seconds) and their
+    messages are redelivered.
+
+    Methods
+    -------
+    consume(self) -> None
+        Connects and consumes until `stop_consuming` is called or the connection is lost.
+    start_consuming(self) -> None
+        Runs `consume` on a new event loop, blocks until it returns.
+    stop_consuming(self) -> None
+        Stops consuming, safe to call from any thread.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    config: RabbitMQConfig
+    subscriptions: list[Subscription] = Field(default_factory=list)
+    shutdown_timeout: float = 30.0
+
+    loop: asyncio.AbstractEventLoop | None = None
+    connection: AsyncioConnection | None = None
+    closed: asyncio.Future | None = None  # done when consuming should stop, failed when the connection was lost
+    disconnected: asyncio.Future | None = None
+
+    def start_consuming(self):
+        asyncio.run(self.consume())
+
+    def stop_consuming(self):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stop)
+
+    async def consume(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.closed = self.loop.create_future()
+        self.disconnected = self.loop.create_future()
+        try:
+            await self._setup_connection()
+            for subscription in self.subscriptions:
+                await self._subscribe(subscription=subscription)
+            await self.closed
+        finally:
+            await self._shutdown()
+
+    async def _setup_connection(self):
+        credentials = pika.PlainCredentials(username=self.config.username, password=self.config.password)
+        opened: asyncio.Future = self.loop.create_future()
+
+        def on_open_error(_connection, error):
+            if not opened.done():
+                opened.set_exception(error if isinstance(error, Exception) else AMQPConnectionError(error))
+
+        def on_close(_connection, reason):
+            if not self.closed.done():
+                self.closed.set_exception(AMQPConnectionError(reason))
+            if not self.disconnected.done():
+                self.disconnected.set_result(None)
+
+        self.connection = AsyncioConnection(
+            pika.ConnectionParameters(host=self.config.hostname, port=self.config.port, credentials=credentials),
+            on_open_callback=lambda connection: opened.done() or opened.set_result(connection),
+            on_open_error_callback=on_open_error,
+            on_close_callback=on_close,
+            custom_ioloop=self.loop,
+        )
+        await opened
+
+    async def _subscribe(self, subscription: Subscription):
+        """Opens the subscription's channel, declares and binds its queue and starts consuming it"""
+
+        def on_channel_close(_channel, reason):
+            if not self.closed.done():
+                self.closed.set_exception(AMQPConnectionError(reason))
+
+        channel: Channel = await self._call(self.connection.channel, callback_name="on_open_callback")
+        channel.add_on_close_callback(on_channel_close)
+        subscription.channel = channel
+
+        # Main exchange
+        await self._call(
+            channel.exchange_declare, exchange=subscription.exchange_name, exchange_type="topic", durable=True
+        )
+
+        # DLQ exchange
+        await self._call(
+            channel.exchange_declare,
+            exchange=f"{subscription.exchange_name}.dlq",
+            exchange_type="topic",
+            durable=True,
+        )
+
+        # Main queue, bound to the routing key
+        await self._call(channel.queue_declare, queue=subscription.queue_name, durable=True)
+        await self._call(
+            channel.queue_bind,
+            queue=subscription.queue_name,
+            exchange=subscription.exchange_name,
+            routing_key=subscription.routing_key,
+        )
+
+        subscription.concurrency = max(1, subscription.concurrency)
+        await self._call(channel.basic_qos, prefetch_count=subscription.concurrency)
+        subscription.consumer_tag = channel.basic_consume(
+            queue=subscription.queue_name,
+            on_message_callback=partial(self._on_message, subscription),
+        )
+
+        msg: str = (
+            f"Starting to consume from queue: {subscription.queue_name} "
+            f"({subscription.concurrency} concurrent messages)"
+        )
+        logger.info(msg)
+
+    async def _call(self, method: Callable, callback_name: str = "callback", **kwargs) -> Any:
+        """Calls a pika method taking a completion callback, returns what the callback received"""
+        done: asyncio.Future = self.loop.create_future()
+        kwargs[callback_name] = lambda result: done.done() or done.set_result(result)
+        method(**kwargs)
+        # a channel or connection closing while waiting fails the call instead of hanging
+        await asyncio.wait([done, self.closed], return_when=asyncio.FIRST_COMPLETED)
+        if not done.done():
+            raise self.closed.exception() or AMQPConnectionError("consumer stopped")
+        return done.result()
+
+    def _on_message(self, subscription: Subscription, channel: Channel, method, properties, body: bytes):
+        subscription.delivered += 1
+        if method.redelivered:
+            subscription.redelivered += 1
+            msg: str = (
+                f"message {properties.message_id} of queue {subscription.queue_name} was redelivered "
+                f"({subscription.redelivered} of {subscription.delivered} deliveries)"
+            )
+            logger.warning(msg)
+
+        task: asyncio.Task = self.loop.create_task(
+            self._process_message(subscription, channel, method, properties, body)
+        )
+        subscription.tasks.add(task)
+        task.add_done_callback(subscription.tasks.discard)
+
+    async def _process_message(self, subscription: Subscription, channel: Channel, method, properties, body: bytes):
+        """Process message with retry logic"""
+
+        headers = properties.headers or {}
+        retry_count = headers.get("retry_count", 0)
+
+        try:
+            # Process message
+            message = json.loads(body)
+            if inspect.iscoroutinefunction(subscription.message_handler):
+                await subscription.message_handler(message)
+            else:
+                await asyncio.to_thread(subscription.message_handler, message)
+            if channel.is_closed:
+                # the broker redelivers the message, it can no longer be acknowledged
+                return
+
+            # Acknowledge successful processing
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}")
+            if channel.is_closed:
+                return
+
+            # Handle retry logic
+            if retry_count < headers.get("max_retries", 3):
+                headers["retry_count"] = retry_count + 1
+
+                # Republish with incremented retry count
+                channel.basic_publish(
+                    exchange=subscription.exchange_name,
+                    routing_key=headers.get("original_routing_key"),
+                    body=body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,
+                        message_id=properties.message_id,
+                        correlation_id=properties.correlation_id,
+                        headers=headers,
+                    ),
+                )
+
+                # Acknowledge the original message
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+                subscription.retried += 1
+            else:
+                # Move to DLQ
+                channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+                subscription.dead_lettered += 1
+
+    def _stop(self):
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+    async def _shutdown(self):
+        # no new deliveries, handlers which are running get to finish and acknowledge their message
+        tasks: set[asyncio.Task] = set()
+        for subscription in self.subscriptions:
+            if subscription.channel is not None and subscription.channel.is_open and subscription.consumer_tag:
+                subscription.channel.basic_cancel(consumer_tag=subscription.consumer_tag)
+            tasks |= subscription.tasks
+        if tasks:
+            msg: str = f"waiting for {len(tasks)} messages to be processed"
+            logger.info(msg)
+            _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+            for task in pending:
+                task.cancel()
+
+        if self.connection is not None and not (self.connection.is_closed or self.connection.is_closing):
+            self.connection.close()
+        if self.connection is not None:
+            await asyncio.wait([self.disconnected], timeout=self.shutdown_timeout)
+
+        for subscription in self.subscriptions:
+            msg: str = (
+                f"queue {subscription.queue_name}: {subscription.delivered} messages delivered, "
+                f"{subscription.redelivered} redelivered, {subscription.retried} retried, "
+                f"{subscription.dead_lettered} dead-lettered"
+            )
+            logger.info(msg)
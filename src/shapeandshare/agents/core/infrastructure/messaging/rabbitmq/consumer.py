@@ -1,5 +1,7 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Callable
 
 import pika
@@ -12,6 +14,23 @@ logger = logging.getLogger()
 
 
 class MessageConsumer(BaseModel):
+    """
+    Consumes a queue over a blocking connection.
+
+    By default the handler runs inside pika's callback, which blocks the connection's I/O (heartbeats included)
+    until it returns. With `handler_workers` > 0 handlers run on that many threads instead, the broker's prefetch
+    matches, and acks, retries and rejects are handed back to the connection's thread with
+    `add_callback_threadsafe`, so long handlers no longer cost the connection and a redelivery of their message.
+    Redelivered messages are counted and logged.
+
+    Methods
+    -------
+    start_consuming(self) -> None
+        Consumes until `stop_consuming` is called or the connection is lost.
+    stop_consuming(self) -> None
+        Stops consuming and closes the connection.
+    """
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -20,9 +39,17 @@ class MessageConsumer(BaseModel):
     exchange_name: str
     routing_key: str
     queue_name: str
+    handler_workers: int = 0  # threads running the handler, 0 runs it in the connection's thread
+
+    # counters are only updated on the connection's thread
+    delivered: int = 0  # messages received
+    redelivered: int = 0  # messages received again, e.g. after a connection was lost while processing them
+    retried: int = 0  # failed messages republished for another attempt
+    dead_lettered: int = 0  # failed messages rejected after their last attempt
 
     connection: pika.BlockingConnection | None = None
     channel: BlockingChannel | None = None
+    executor: ThreadPoolExecutor | None = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -69,7 +96,9 @@ class MessageConsumer(BaseModel):
         # )
 
     def start_consuming(self):
-        self.channel.basic_qos(prefetch_count=1)
+        if self.handler_workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=self.handler_workers, thread_name_prefix="consumer")
+        self.channel.basic_qos(prefetch_count=max(1, self.handler_workers))
         self.channel.basic_consume(queue=self.queue_name, on_message_callback=self._process_message)
 
         logger.info(f"Starting to consume from queue: {self.queue_name}")
@@ -79,9 +108,19 @@ class MessageConsumer(BaseModel):
         if self.channel and not self.channel.is_closed:
             self.channel.stop_consuming()
 
+        if self.executor is not None:
+            # unacknowledged messages are redelivered once the connection is closed
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
         if self.connection and not self.connection.is_closed:
             self.connection.close()
 
+        msg: str = (
+            f"queue {self.queue_name}: {self.delivered} messages delivered, {self.redelivered} redelivered, "
+            f"{self.retried} retried, {self.dead_lettered} dead-lettered"
+        )
+        logger.info(msg)
+
     def _process_message(
         self,
         channel: BlockingChannel,
@@ -93,39 +132,76 @@ class MessageConsumer(BaseModel):
     ):
         """Process message with retry logic"""
 
-        headers = properties.headers or {}
-        retry_count = headers.get("retry_count", 0)
+        self.delivered += 1
+        if method.redelivered:
+            self.redelivered += 1
+            msg: str = (
+                f"message {properties.message_id} of queue {self.queue_name} was redelivered "
+                f"({self.redelivered} of {self.delivered} deliveries)"
+            )
+            logger.warning(msg)
+
+        if self.executor is not None:
+            self.executor.submit(self._handle, channel, method, properties, body)
+            return
 
         try:
             # Process message
-            message = json.loads(body)
-            self.message_handler(message)
+            self.message_handler(json.loads(body))
+            self._settle(channel, method, properties, body)
+        except Exception as e:
+            self._settle(channel, method, properties, body, error=e)
 
-            # Acknowledge successful processing
-            channel.basic_ack(delivery_tag=method.delivery_tag)
+    def _handle(self, channel: BlockingChannel, method, properties, body: bytes):
+        """Runs the handler on a worker thread, the outcome is settled on the connection's thread"""
+        error: Exception | None = None
+        try:
+            self.message_handler(json.loads(body))
+        except Exception as e:
+            error = e
 
+        try:
+            self.connection.add_callback_threadsafe(
+                partial(self._settle, channel, method, properties, body, error=error)
+            )
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-
-            # Handle retry logic
-            if retry_count < headers.get("max_retries", 3):
-                headers["retry_count"] = retry_count + 1
-
-                # Republish with incremented retry count
-                channel.basic_publish(
-                    exchange=self.exchange_name,
-                    routing_key=headers.get("original_routing_key"),
-                    body=body,
-                    properties=pika.BasicProperties(
-                        delivery_mode=2,
-                        message_id=properties.message_id,
-                        correlation_id=properties.correlation_id,
-                        headers=headers,
-                    ),
-                )
-
-                # Acknowledge the original message
-                channel.basic_ack(delivery_tag=method.delivery_tag)
-            else:
-                # Move to DLQ
-                channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+            # the connection is gone, the broker redelivers the message
+            logger.error(f"Could not settle message {properties.message_id}: {str(e)}")
+
+    def _settle(self, channel: BlockingChannel, method, properties, body: bytes, error: Exception | None = None):
+        """Acknowledges a processed message, or retries or dead-letters a failed one"""
+
+        headers = properties.headers or {}
+        retry_count = headers.get("retry_count", 0)
+
+        if error is None:
+            # Acknowledge successful processing
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+            return
+
+        logger.error(f"Error processing message: {str(error)}")
+
+        # Handle retry logic
+        if retry_count < headers.get("max_retries", 3):
+            headers["retry_count"] = retry_count + 1
+
+            # Republish with incremented retry count
+            channel.basic_publish(
+                exchange=self.exchange_name,
+                routing_key=headers.get("original_routing_key"),
+                body=body,
+                properties=pika.BasicProperties(
+                    delivery_mode=2,
+                    message_id=properties.message_id,
+                    correlation_id=properties.correlation_id,
+                    headers=headers,
+                ),
+            )
+
+            # Acknowledge the original message
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+            self.retried += 1
+        else:
+            # Move to DLQ
+            channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+            self.dead_lettered += 1
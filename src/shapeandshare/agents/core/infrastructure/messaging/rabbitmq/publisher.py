@@ -1,9 +1,16 @@
+import asyncio
+import concurrent.futures
 import logging
+import random
+import threading
+from typing import Any, Callable
 from uuid import uuid4
 
 import pika
-from pika.adapters.blocking_connection import BlockingChannel
-from pydantic import BaseModel
+from pika.adapters.asyncio_connection import AsyncioConnection
+from pika.channel import Channel
+from pika.exceptions import AMQPChannelError, AMQPConnectionError, AMQPError
+from pydantic import BaseModel, Field
 
 from ....framework.contracts.dtos.rabbitmq_config import RabbitMQConfig
 
@@ -11,83 +18,271 @@ logger = logging.getLogger()
 
 
 class MessagePublisher(BaseModel):
+    """
+    Publishes messages to a topic exchange, with broker confirms when `confirm` is set.
+
+    The connection is served by an I/O thread running its own event loop: heartbeats are answered however long
+    callers go without publishing, and every channel operation happens on that thread, so the publisher can be
+    shared by threads. The `_async` variants let coroutines (e.g. FastAPI endpoints) publish without blocking their
+    event loop; concurrent publishes share the channel without waiting on each other's confirms. With confirms,
+    `publish_many` sends all of its messages before awaiting their confirms, and a message the broker did not
+    confirm within `confirm_timeout` seconds is published again. A lost connection is re-established up to
+    `reconnect_retries` times, waiting `reconnect_backoff` seconds (doubled per attempt, with jitter, up to
+    `max_reconnect_backoff`) in between; after that the publish fails.
+
+    Methods
+    -------
+    publish_message(self, routing_key: str, message: BaseModel, correlation_id: str | None = None) -> None
+        Publishes a message, returns once the broker confirmed it (with confirms) or it was sent.
+    publish_many(self, routing_key: str, messages: list[BaseModel], correlation_id: str | None = None) -> None
+        Publishes messages, returns once the broker confirmed all of them (with confirms) or they were sent.
+    publish_message_async(self, routing_key: str, message: BaseModel, correlation_id: str | None = None) -> None
+        `publish_message` for event loops, awaits the I/O thread instead of blocking the caller's loop.
+    publish_many_async(self, routing_key: str, messages: list[BaseModel], correlation_id: str | None = None) -> None
+        `publish_many` for event loops, awaits the I/O thread instead of blocking the caller's loop.
+    close(self) -> None
+        Closes the connection and stops the I/O thread.
+    """
+
     class Config:
         arbitrary_types_allowed = True
 
     config: RabbitMQConfig
     exchange_name: str
-    max_retries: int = 3
+    max_retries: int = 3  # consumer side attempts of a failed message, sent in the message headers
     retry_delay: int = 5000
+    confirm: bool = False
+    confirm_timeout: float = 30.0
+    reconnect_retries: int = 5
+    reconnect_backoff: float = 0.5
+    max_reconnect_backoff: float = 30.0
 
-    channel: BlockingChannel | None = None
-    connection: pika.BlockingConnection | None = None
+    loop: asyncio.AbstractEventLoop | None = None
+    thread: threading.Thread | None = None
+    connection: AsyncioConnection | None = None
+    channel: Channel | None = None
+    connecting: asyncio.Lock = Field(default_factory=asyncio.Lock)
+    delivery_tag: int = 0  # of the last message published on the channel
+    confirms: dict[int, asyncio.Future] = Field(default_factory=dict)  # delivery tag -> pending confirm
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._setup_connection()
-        self._setup_exchanges()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="publisher", daemon=True)
+        self.thread.start()
+        self._submit(self._reconnect()).result()
+
+    def publish_message(self, routing_key: str, message: BaseModel, correlation_id: str | None = None) -> None:
+        """Publish message with headers and DLQ support"""
+        self.publish_many(routing_key=routing_key, messages=[message], correlation_id=correlation_id)
 
-    def on_connection_close(self):
-        msg: str = "Connection closed, reconnecting ..."
-        logger.warning(msg)
-        self._setup_connection()
+    def publish_many(self, routing_key: str, messages: list[BaseModel], correlation_id: str | None = None) -> None:
+        """Publish messages with headers and DLQ support, their confirms are awaited together"""
+        try:
+            prepared: list[tuple[str, bytes, pika.BasicProperties]] = self._prepare(
+                routing_key=routing_key, messages=messages, correlation_id=correlation_id
+            )
+            self._submit(self._publish(messages=prepared)).result()
+            self._log_published(messages=prepared)
+
+        except Exception as error:
+            logger.error(f"Error publishing message: {error!r}")
+            raise error
 
-    def _setup_connection(self):
-        logger.info("Setting up connection to RabbitMQ")
-        credentials = pika.PlainCredentials(username=self.config.username, password=self.config.password)
+    async def publish_message_async(
+        self, routing_key: str, message: BaseModel, correlation_id: str | None = None
+    ) -> None:
+        """Publish message with headers and DLQ support, without blocking the caller's event loop"""
+        await self.publish_many_async(routing_key=routing_key, messages=[message], correlation_id=correlation_id)
 
-        self.connection = pika.BlockingConnection(
-            pika.ConnectionParameters(
-                host=self.config.hostname, port=self.config.port, credentials=credentials, heartbeat=60
+    async def publish_many_async(
+        self, routing_key: str, messages: list[BaseModel], correlation_id: str | None = None
+    ) -> None:
+        """Publish messages with headers and DLQ support, without blocking the caller's event loop"""
+        try:
+            prepared: list[tuple[str, bytes, pika.BasicProperties]] = self._prepare(
+                routing_key=routing_key, messages=messages, correlation_id=correlation_id
             )
+            await asyncio.wrap_future(self._submit(self._publish(messages=prepared)))
+            self._log_published(messages=prepared)
+
+        except Exception as error:
+            logger.error(f"Error publishing message: {error!r}")
+            raise error
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self._submit(self._close()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def _submit(self, coroutine) -> concurrent.futures.Future:
+        """Runs a coroutine on the I/O thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def _prepare(
+        self, routing_key: str, messages: list[BaseModel], correlation_id: str | None
+    ) -> list[tuple[str, bytes, pika.BasicProperties]]:
+        prepared: list[tuple[str, bytes, pika.BasicProperties]] = []
+        for message in messages:
+            message_id = str(uuid4())
+            headers = {"retry_count": 0, "max_retries": self.max_retries, "original_routing_key": routing_key}
+            properties = pika.BasicProperties(
+                delivery_mode=2,  # Make message persistent
+                message_id=message_id,
+                correlation_id=correlation_id or message_id,
+                content_type="application/json",
+                headers=headers,
+            )
+            prepared.append((routing_key, message.model_dump_json().encode("utf-8"), properties))
+        return prepared
+
+    @staticmethod
+    def _log_published(messages: list[tuple[str, bytes, pika.BasicProperties]]) -> None:
+        for routing_key, _, properties in messages:
+            logger.info(f"Published message {properties.message_id} to {routing_key}")
+
+    async def _publish(self, messages: list[tuple[str, bytes, pika.BasicProperties]]) -> None:
+        unconfirmed: list[tuple[str, bytes, pika.BasicProperties]] = messages
+        for attempt in range(self.reconnect_retries + 1):
+            if self.channel is None or not self.channel.is_open:
+                # already retried with backoff, a failure here is final
+                await self._reconnect()
+            try:
+                # every message goes out before any confirm is awaited
+                sent: list[tuple[tuple[str, bytes, pika.BasicProperties], asyncio.Future | None]] = [
+                    (message, self._send(*message)) for message in unconfirmed
+                ]
+                if not self.confirm:
+                    return
+                await asyncio.wait([future for _, future in sent], timeout=self.confirm_timeout)
+                unconfirmed = [
+                    message for message, future in sent if not future.done() or future.exception() is not None
+                ]
+                if not unconfirmed:
+                    return
+                error: Exception = AMQPError(f"{len(unconfirmed)} of {len(sent)} messages were not confirmed")
+            except AMQPError as channel_error:
+                error = channel_error
+
+            if attempt == self.reconnect_retries:
+                raise error
+            msg: str = f"{error}, publishing {len(unconfirmed)} messages again"
+            logger.warning(msg)
+
+    def _send(self, routing_key: str, body: bytes, properties: pika.BasicProperties) -> asyncio.Future | None:
+        self.channel.basic_publish(
+            exchange=self.exchange_name, routing_key=routing_key, body=body, properties=properties
+        )
+        if not self.confirm:
+            return None
+        self.delivery_tag += 1
+        confirmed: asyncio.Future = self.loop.create_future()
+        self.confirms[self.delivery_tag] = confirmed
+        return confirmed
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        tags: list[int] = (
+            [tag for tag in self.confirms if tag <= method.delivery_tag] if method.multiple else [method.delivery_tag]
         )
+        for tag in tags:
+            confirmed: asyncio.Future | None = self.confirms.pop(tag, None)
+            if confirmed is None or confirmed.done():
+                continue
+            if isinstance(method, pika.spec.Basic.Ack):
+                confirmed.set_result(None)
+            else:
+                confirmed.set_exception(AMQPChannelError(f"message {tag} was rejected by the broker"))
 
-        self.channel = self.connection.channel()
+    def _on_channel_close(self, channel: Channel, reason):
+        if channel is not self.channel:
+            return
+        logger.warning(f"Channel closed: {reason}")
+        # messages waiting for a confirm are published again on the next channel
+        for confirmed in self.confirms.values():
+            if not confirmed.done():
+                confirmed.set_exception(AMQPConnectionError(reason))
+        self.confirms.clear()
+        self.channel = None
 
-        # Declare exchange
-        self.channel.exchange_declare(exchange=self.exchange_name, exchange_type="topic", durable=True)
+    async def _reconnect(self):
+        async with self.connecting:
+            for attempt in range(self.reconnect_retries + 1):
+                if self.channel is not None and self.channel.is_open:
+                    return
+                if attempt > 0:
+                    delay: float = min(self.max_reconnect_backoff, self.reconnect_backoff * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    msg: str = f"Connecting to RabbitMQ again in {delay:.1f}s ..."
+                    logger.warning(msg)
+                    await asyncio.sleep(delay)
+                try:
+                    await self._setup_connection()
+                    await self._setup_exchanges()
+                    return
+                except AMQPError as error:
+                    if attempt == self.reconnect_retries:
+                        raise error
+                    logger.warning(f"Connecting to RabbitMQ failed: {error!r}")
+
+    async def _setup_connection(self):
+        if self.connection is None or self.connection.is_closed:
+            logger.info("Setting up connection to RabbitMQ")
+            credentials = pika.PlainCredentials(username=self.config.username, password=self.config.password)
+            opened: asyncio.Future = self.loop.create_future()
+
+            def on_open_error(_connection, error):
+                if not opened.done():
+                    opened.set_exception(error if isinstance(error, Exception) else AMQPConnectionError(error))
+
+            self.connection = AsyncioConnection(
+                pika.ConnectionParameters(
+                    host=self.config.hostname, port=self.config.port, credentials=credentials, heartbeat=60
+                ),
+                on_open_callback=lambda connection: opened.done() or opened.set_result(connection),
+                on_open_error_callback=on_open_error,
+                custom_ioloop=self.loop,
+            )
+            await opened
+
+        channel: Channel = await self._call(self.connection.channel, callback_name="on_open_callback")
+        channel.add_on_close_callback(self._on_channel_close)
+        if self.confirm:
+            await self._call(channel.confirm_delivery, ack_nack_callback=self._on_confirm)
+        self.channel, self.delivery_tag = channel, 0
         logger.info("Connected to RabbitMQ")
 
-    def _setup_exchanges(self):
+    async def _setup_exchanges(self):
         """Setup main exchange and DLQ exchange"""
         # Main exchange
-        self.channel.exchange_declare(exchange=self.exchange_name, exchange_type="topic", durable=True)
+        await self._call(
+            self.channel.exchange_declare, exchange=self.exchange_name, exchange_type="topic", durable=True
+        )
 
         # DLQ exchange
-        self.channel.exchange_declare(exchange=f"{self.exchange_name}.dlq", exchange_type="topic", durable=True)
+        await self._call(
+            self.channel.exchange_declare, exchange=f"{self.exchange_name}.dlq", exchange_type="topic", durable=True
+        )
 
-    def publish_message(self, routing_key: str, message: BaseModel, correlation_id: str | None = None) -> None:
-        """Publish message with headers and DLQ support"""
+    async def _call(self, method: Callable, callback_name: str = "callback", **kwargs) -> Any:
+        """Calls a pika method taking a completion callback, returns what the callback received"""
+        done: asyncio.Future = self.loop.create_future()
+        kwargs[callback_name] = lambda result: done.done() or done.set_result(result)
+        method(**kwargs)
         try:
-            message_id = str(uuid4())
-            headers = {"retry_count": 0, "max_retries": self.max_retries, "original_routing_key": routing_key}
+            return await asyncio.wait_for(done, timeout=self.confirm_timeout)
+        except asyncio.TimeoutError as error:
+            raise AMQPConnectionError(f"no reply from RabbitMQ within {self.confirm_timeout}s") from error
 
-            try:
-                # if self.channel.is_open:
-                self.channel.basic_publish(
-                    exchange=self.exchange_name,
-                    routing_key=routing_key,
-                    body=message.model_dump_json(),
-                    properties=pika.BasicProperties(
-                        delivery_mode=2,  # Make message persistent
-                        message_id=message_id,
-                        correlation_id=correlation_id or message_id,
-                        content_type="application/json",
-                        headers=headers,
-                    ),
-                )
-                logger.info(f"Published message {message_id} to {routing_key}")
-            # else:
-            except Exception as error:
-                logger.warning("Channel is closed")
-                logger.warning(str(error))
-                self.on_connection_close()
-                self.publish_message(routing_key=routing_key, message=message, correlation_id=correlation_id)
-
-        except Exception as error:
-            logger.error(f"Error publishing message: {str(error)}")
-            raise error
-
-    def close(self):
-        if self.connection and not self.connection.is_closed:
+    async def _close(self):
+        if self.connection is None or self.connection.is_closed:
+            return
+        self.channel = None  # closed on purpose, not worth a warning
+        closed: asyncio.Future = self.loop.create_future()
+        self.connection.add_on_close_callback(lambda _connection, _reason: closed.done() or closed.set_result(None))
+        if not self.connection.is_closing:
             self.connection.close()
+        await asyncio.wait([closed], timeout=self.confirm_timeout)
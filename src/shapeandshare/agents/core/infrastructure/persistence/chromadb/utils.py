@@ -4,6 +4,7 @@ from typing import Sequence
 import chromadb
 from chromadb import ClientAPI
 from chromadb.api.models.Collection import Collection
+from chromadb.config import Settings
 
 from .....git.sdk.contracts.dtos.chat import BaseChatRequest
 from .....git.sdk.contracts.dtos.git_metadata import GitMetadata
@@ -29,6 +30,14 @@ class ChromaUtils:
 
 
 def get_chroma_client() -> ClientAPI:
+    # one pooled HTTP client is shared by every request; idle connections are kept alive between ingestion batches
+    # for 60 seconds (chroma's default is 40), and up to 20 of them (httpx's default) for concurrent writers
+    settings: Settings = Settings(
+        chroma_http_keepalive_secs=float(os.environ.get("CHROMADB_HTTP_KEEPALIVE_SECONDS", 60)),
+        chroma_http_max_keepalive_connections=int(os.environ.get("CHROMADB_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)),
+    )
     return chromadb.HttpClient(
-        host=os.environ.get("CHROMADB_HOSTNAME", "localhost"), port=int(os.environ.get("CHROMADB_PORT", 8000))
+        host=os.environ.get("CHROMADB_HOSTNAME", "localhost"),
+        port=int(os.environ.get("CHROMADB_PORT", 8000)),
+        settings=settings,
     )
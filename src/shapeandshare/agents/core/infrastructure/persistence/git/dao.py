@@ -1,20 +1,165 @@
 import os
 
-from git import Repo
+from git import GitCommandError, Repo
+
+from ....framework.contracts.dtos.git_clone_options import GitCloneOptions
+from ....framework.contracts.dtos.repository_file import RepositoryFile
 
 
 class GitDao:
-    def clone_repository(self, git_url: str, local_path: str) -> Repo:
+    def clone_repository(
+        self, git_url: str, local_path: str, options: GitCloneOptions | None = None, mirror_path: str | None = None
+    ) -> Repo:
         """
         Clone a git repository to local storage.
 
         Args:
             git_url (str): URL of the git repository
             local_path (str): Local path to clone the repository
+            options (GitCloneOptions): Shallow, blobless and sparse clone settings, a full clone when None
+            mirror_path (str): Local mirror of `git_url` to clone from instead of the remote
 
         Returns:
             Repo: The cloned git repository object
         """
         if os.path.exists(local_path):
             return Repo(local_path)
-        return Repo.clone_from(git_url, local_path)
+
+        if options is None:
+            options = GitCloneOptions()
+
+        kwargs: dict = {}
+        if mirror_path is None:
+            # depth and filters are ignored by local clones, which hard link the mirror's objects instead
+            if options.depth:
+                kwargs["depth"] = options.depth
+            if options.blobless:
+                kwargs["filter"] = "blob:none"
+        if options.sparse_patterns is not None:
+            # check out only once the sparse patterns are in place, so excluded blobs are never fetched or written
+            kwargs["no_checkout"] = True
+
+        repo: Repo = Repo.clone_from(mirror_path or git_url, local_path, **kwargs)
+        if mirror_path is not None:
+            # later fetches (e.g. of a base commit) go to the remote, not the shared mirror
+            repo.remote("origin").set_url(git_url)
+        if options.sparse_patterns is not None:
+            repo.git.sparse_checkout("set", "--no-cone", *options.sparse_patterns)
+            repo.git.checkout()
+        return repo
+
+    @staticmethod
+    def sparse_patterns(extensions: set[str], included_files: set[str], excluded_dirs: set[str]) -> list[str]:
+        """
+        Build non-cone sparse-checkout patterns equivalent to an extension / file name / excluded directory filter.
+
+        Args:
+            extensions (set[str]): File extensions to check out (e.g. `.py`)
+            included_files (set[str]): File names to check out regardless of their extension (e.g. `Makefile`)
+            excluded_dirs (set[str]): Directory names which are never checked out, at any depth
+
+        Returns:
+            list[str]: The sparse-checkout patterns
+        """
+        patterns: list[str] = [f"*{extension}" for extension in sorted(extensions)]
+        patterns.extend(f"**/{name}" for name in sorted(included_files))
+        # .gitignore files are read to filter the checked out files
+        patterns.append("**/.gitignore")
+        # negations come last so they win over the inclusions above
+        patterns.extend(f"!**/{name}/**" for name in sorted(excluded_dirs))
+        return patterns
+
+    def tracked_files(self, local_path: str) -> list[RepositoryFile]:
+        """
+        List the files tracked by the git index which are checked out, without walking the working tree.
+
+        Entries outside a sparse checkout, symlinks and submodules are left out.
+
+        Args:
+            local_path (str): Local path of the repository
+
+        Returns:
+            list[RepositoryFile]: Tracked files with their size (from the index stat data) and blob sha
+        """
+        repo: Repo = Repo(local_path)
+        sizes: dict[str, int] = {entry.path: entry.size for entry in repo.index.entries.values()}
+
+        files: list[RepositoryFile] = []
+        # records are `<tag> <mode> <sha> <stage>\t<path>`, tag `S` marks skip-worktree (not checked out) entries
+        for record in repo.git.ls_files("--stage", "-t", "-z").split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            tag, mode, sha, stage = meta.split(" ")
+            if tag == "S" or mode in ("120000", "160000") or stage != "0":
+                continue
+            files.append(RepositoryFile(path=path, size=sizes.get(path, 0), sha=sha))
+        return files
+
+    def head_commit(self, local_path: str) -> str:
+        """
+        Get the commit sha currently checked out.
+
+        Args:
+            local_path (str): Local path of the repository
+
+        Returns:
+            str: The hex sha of HEAD
+        """
+        return Repo(local_path).head.commit.hexsha
+
+    def fetch_commit(self, local_path: str, commit: str) -> bool:
+        """
+        Make sure a commit is available locally, fetching it from origin when missing.
+
+        Args:
+            local_path (str): Local path of the repository
+            commit (str): The commit sha to make available
+
+        Returns:
+            bool: True if the commit is available, False if it could not be found (e.g. after a force push)
+        """
+        repo: Repo = Repo(local_path)
+        try:
+            repo.git.cat_file("-e", f"{commit}^{{commit}}")
+            return True
+        except GitCommandError:
+            pass
+
+        try:
+            if repo.git.rev_parse("--is-shallow-repository") == "true":
+                # only the commit itself is needed for diffing, not its history
+                repo.git.fetch("origin", commit, depth=1)
+            else:
+                repo.git.fetch("origin", commit)
+            repo.git.cat_file("-e", f"{commit}^{{commit}}")
+            return True
+        except GitCommandError:
+            return False
+
+    def diff(self, local_path: str, base_commit: str, commit: str) -> dict[str, list[str]]:
+        """
+        List the files changed between two commits.
+
+        Args:
+            local_path (str): Local path of the repository
+            base_commit (str): The older commit sha
+            commit (str): The newer commit sha
+
+        Returns:
+            dict[str, list[str]]: Paths keyed by change type (`added`, `modified`, `deleted`)
+        """
+        changes: dict[str, list[str]] = {"added": [], "modified": [], "deleted": []}
+
+        # renames are reported as a delete and an add so both sides of the index are updated
+        output: str = Repo(local_path).git.diff("--name-status", "--no-renames", "-z", base_commit, commit)
+        fields: list[str] = [field for field in output.split("\0") if field]
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if status.startswith("A"):
+                changes["added"].append(path)
+            elif status.startswith("D"):
+                changes["deleted"].append(path)
+            else:
+                # modified, type changed, etc.
+                changes["modified"].append(path)
+        return changes
@@ -0,0 +1,123 @@
+import fcntl
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, TextIO
+
+from git import Repo
+from pydantic import BaseModel
+
+from ....framework.common.utils.hash import hash_it
+
+logger = logging.getLogger()
+
+
+class GitMirrorCache(BaseModel):
+    """
+    On-disk cache of bare mirrors keyed by repository URL.
+
+    Clones are made from the local mirror (hard linked objects) after the mirror has been brought up to date,
+    so only new objects are pulled from the remote. Mirrors are evicted least recently used first once their total
+    size exceeds `quota_bytes`. Locks are file based so several workers can share the cache on one volume; an
+    evicted mirror's lock file is removed with it, so locks are only honoured while their file is still in place.
+
+    Methods
+    -------
+    checkout(self, url: str) -> Iterator[Path]
+        Context manager which updates (or creates) the mirror of `url` and holds it while the caller clones from it.
+    """
+
+    root: Path
+    quota_bytes: int
+
+    @contextmanager
+    def checkout(self, url: str) -> Iterator[Path]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        key: str = hash_it(payload=url)
+        mirror_path: Path = self.root / f"{key}.git"
+
+        # exclusive while fetching, then shared so concurrent clones of the same url can proceed
+        with self._lock(path=self.root / f"{key}.lock") as lock:
+            self._update(url=url, mirror_path=mirror_path)
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            try:
+                yield mirror_path
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        self.evict()
+
+    def evict(self) -> None:
+        mirrors: list[tuple[float, int, Path]] = [
+            (path.stat().st_mtime, self._size(path=path), path) for path in self.root.glob("*.git") if path.is_dir()
+        ]
+        total: int = sum(size for _, size, _ in mirrors)
+
+        # least recently used first
+        for _, size, path in sorted(mirrors):
+            if total <= self.quota_bytes:
+                break
+
+            lock: TextIO | None = self._lock(path=path.with_suffix(".lock"), blocking=False)
+            if lock is None:
+                # in use by another clone
+                continue
+            with lock:
+                msg: str = f"evicting git mirror {path} ({size} bytes)"
+                logger.info(msg)
+                shutil.rmtree(path, ignore_errors=True)
+                # removed while held, a checkout waiting on it locks a new file once this one is released
+                path.with_suffix(".lock").unlink(missing_ok=True)
+                total -= size
+
+        # lock files left by mirrors which were never created (e.g. a failed clone)
+        for path in self.root.glob("*.lock"):
+            if path.with_suffix(".git").exists():
+                continue
+            lock: TextIO | None = self._lock(path=path, blocking=False)
+            if lock is not None:
+                with lock:
+                    path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _lock(path: Path, blocking: bool = True) -> TextIO | None:
+        """Opens and exclusively locks `path`, returns None when it is locked elsewhere and `blocking` is not set"""
+        while True:
+            lock: TextIO = open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                return None
+            # a file evicted while waiting for it no longer excludes anyone, the lock is taken on its replacement
+            try:
+                if os.stat(path).st_ino == os.fstat(lock.fileno()).st_ino:
+                    return lock
+            except FileNotFoundError:
+                pass
+            lock.close()
+
+    @staticmethod
+    def _update(url: str, mirror_path: Path) -> None:
+        if mirror_path.exists():
+            logger.info("updating git mirror")
+            Repo(mirror_path).git.fetch("--prune", "origin")
+        else:
+            logger.info("creating git mirror")
+            Repo.clone_from(url, mirror_path, mirror=True)
+
+        # the mirror's mtime tracks when it was last used
+        os.utime(mirror_path)
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        size: int = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    size += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return size
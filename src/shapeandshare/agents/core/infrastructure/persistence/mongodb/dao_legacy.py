@@ -2,10 +2,10 @@ import os
 from urllib.parse import quote_plus
 
 from pydantic import BaseModel
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
-from pymongo.results import InsertOneResult, UpdateResult
+from pymongo.results import BulkWriteResult, DeleteResult, InsertOneResult, UpdateResult
 
 from ....framework.contracts.errors.dao.conflict import DaoConflictError
 from ....framework.contracts.types.dao_document import DaoDocumentType
@@ -56,3 +56,41 @@ class MongoDaoLegacy(BaseModel):
         return self.collections[document_type].update_one(
             filter={"id": document["id"]}, update={"$set": document}, upsert=upsert
         )
+
+    def update_if(
+        self, document_type: DaoDocumentType, document_id: str, condition: dict, partial: dict
+    ) -> UpdateResult:
+        """Sets the fields of the document only if it also matches `condition`, atomically"""
+        return self.collections[document_type].update_one(
+            filter={**condition, "id": document_id}, update={"$set": partial}
+        )
+
+    def get_many(self, document_type: DaoDocumentType, document_ids: list[str]) -> list[dict]:
+        return list(self.collections[document_type].find({"id": {"$in": document_ids}}))
+
+    def upsert_many(self, document_type: DaoDocumentType, documents: list[dict]) -> BulkWriteResult | None:
+        if not documents:
+            return None
+        requests: list[UpdateOne] = [
+            UpdateOne(filter={"id": document["id"]}, update={"$set": document}, upsert=True) for document in documents
+        ]
+        return self.collections[document_type].bulk_write(requests, ordered=False)
+
+    def update_many(self, document_type: DaoDocumentType, document_ids: list[str], partial: dict) -> UpdateResult:
+        return self.collections[document_type].update_many(
+            filter={"id": {"$in": document_ids}}, update={"$set": partial}
+        )
+
+    def delete_many(self, document_type: DaoDocumentType, document_ids: list[str]) -> DeleteResult:
+        return self.collections[document_type].delete_many({"id": {"$in": document_ids}})
+
+    def count(self, document_type: DaoDocumentType) -> int:
+        return self.collections[document_type].estimated_document_count()
+
+    def index(self, document_type: DaoDocumentType, field: str) -> None:
+        self.collections[document_type].create_index({field: 1})
+
+    def ids_sorted(self, document_type: DaoDocumentType, field: str, limit: int) -> list[str]:
+        """Returns the ids of the first `limit` documents in ascending order of `field`"""
+        cursor = self.collections[document_type].find({}, {"id": 1}).sort(field, ASCENDING).limit(limit)
+        return [document["id"] for document in cursor]
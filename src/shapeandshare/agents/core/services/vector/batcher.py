@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+
+
+class ChunkBatch(BaseModel):
+    """A group of chunks written to the vector store in a single call"""
+
+    ids: list[str] = Field(default_factory=list)
+    texts: list[str] = Field(default_factory=list)  # what is embedded, identical content shares cached vectors
+    documents: list[str] = Field(default_factory=list)  # what is stored and shown to the model
+    metadatas: list[dict] = Field(default_factory=list)
+    size: int = 0  # total document size in bytes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class ChunkBatcher(BaseModel):
+    """
+    Collects chunks across files and releases them in batches bounded by a chunk count and a byte budget.
+
+    Methods
+    -------
+    add(self, chunk_id: str, text: str, document: str, metadata: dict) -> ChunkBatch | None
+        Adds a chunk embedded as `text` and stored as `document`, returning the previous batch when the new chunk would not fit into it.
+    flush(self) -> ChunkBatch | None
+        Returns the pending batch (if any) and starts a new one.
+    """
+
+    max_chunks: int = 256
+    max_bytes: int = 4 * 1024 * 1024
+    batch: ChunkBatch = Field(default_factory=ChunkBatch)
+
+    def add(self, chunk_id: str, text: str, document: str, metadata: dict) -> ChunkBatch | None:
+        size: int = len(document.encode(encoding="utf-8"))
+
+        full: ChunkBatch | None = None
+        if len(self.batch) > 0 and (len(self.batch) >= self.max_chunks or self.batch.size + size > self.max_bytes):
+            full = self.flush()
+
+        self.batch.ids.append(chunk_id)
+        self.batch.texts.append(text)
+        self.batch.documents.append(document)
+        self.batch.metadatas.append(metadata)
+        self.batch.size += size
+        return full
+
+    def flush(self) -> ChunkBatch | None:
+        if len(self.batch) == 0:
+            return None
+        batch: ChunkBatch = self.batch
+        self.batch = ChunkBatch()
+        return batch
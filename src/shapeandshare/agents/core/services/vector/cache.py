@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Sequence
+
+from pydantic import BaseModel, Field
+
+from ...framework.common.utils.hash import hash_it
+from ...framework.contracts.types.dao_document import DaoDocumentType
+from ...infrastructure.persistence.mongodb.dao_legacy import MongoDaoLegacy
+
+logger = logging.getLogger()
+
+
+class EmbeddingCache(BaseModel):
+    """
+    Content-addressed embedding cache shared by every repository and user.
+
+    Vectors are keyed by a hash of the embedding model name and the chunk text, so identical chunks (forks,
+    vendored files, the same repository ingested by many users) are only embedded once. The cache is bounded to
+    `max_entries` documents and evicts the least recently used entries.
+
+    Methods
+    -------
+    embed(self, texts: list[str], embed: Callable) -> list[list[float]]
+        Returns a vector per text, only calling `embed` for the texts which are not cached.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    dao: MongoDaoLegacy
+    model_name: str
+    max_entries: int = 500_000
+    eviction_slack: float = 0.1  # fraction of `max_entries` evicted at once, so eviction does not run every batch
+
+    hits: int = 0
+    misses: int = 0
+    counters_lock: Any = Field(default_factory=threading.Lock)  # batches may be embedded from several threads
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.dao.index(document_type=DaoDocumentType.EMBEDDING, field="last_accessed")
+
+    def embed(self, texts: list[str], embed: Callable[[list[str]], Sequence[Sequence[float]]]) -> list[list[float]]:
+        keys: list[str] = [self._key(text=text) for text in texts]
+
+        vectors: dict[str, list[float]] = {
+            document["id"]: document["embedding"]
+            for document in self.dao.get_many(document_type=DaoDocumentType.EMBEDDING, document_ids=list(set(keys)))
+        }
+        hit_keys: list[str] = list(vectors.keys())
+
+        # texts repeated within the batch are only embedded once
+        missing: dict[str, str] = {}
+        hits: int = 0
+        for key, text in zip(keys, texts):
+            if key in vectors:
+                hits += 1
+            else:
+                missing.setdefault(key, text)
+        with self.counters_lock:
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        now: float = time.time()
+        if hit_keys:
+            self.dao.update_many(
+                document_type=DaoDocumentType.EMBEDDING, document_ids=hit_keys, partial={"last_accessed": now}
+            )
+
+        if missing:
+            computed: Sequence[Sequence[float]] = embed(list(missing.values()))
+            documents: list[dict] = []
+            for key, vector in zip(missing.keys(), computed):
+                vectors[key] = [float(value) for value in vector]
+                documents.append({"id": key, "model": self.model_name, "embedding": vectors[key], "last_accessed": now})
+            self.dao.upsert_many(document_type=DaoDocumentType.EMBEDDING, documents=documents)
+            self._evict()
+
+        return [vectors[key] for key in keys]
+
+    def _evict(self) -> None:
+        count: int = self.dao.count(document_type=DaoDocumentType.EMBEDDING)
+        if count <= self.max_entries:
+            return
+
+        limit: int = count - self.max_entries + int(self.max_entries * self.eviction_slack)
+        ids: list[str] = self.dao.ids_sorted(
+            document_type=DaoDocumentType.EMBEDDING, field="last_accessed", limit=limit
+        )
+        self.dao.delete_many(document_type=DaoDocumentType.EMBEDDING, document_ids=ids)
+        msg: str = f"evicted {len(ids)} cached embeddings"
+        logger.info(msg)
+
+    def _key(self, text: str) -> str:
+        return hash_it(payload=f"{self.model_name}:{text}")
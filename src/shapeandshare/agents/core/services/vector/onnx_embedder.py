@@ -0,0 +1,91 @@
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import onnxruntime
+from langchain_core.embeddings.embeddings import Embeddings
+from pydantic import BaseModel
+from tokenizers import Tokenizer
+
+logger = logging.getLogger()
+
+
+class OnnxEmbeddings(BaseModel, Embeddings):
+    """
+    Embeds with an (int8 quantized) ONNX export of a sentence-transformers model on the CPU.
+
+    `model_path` is a local directory holding the exported model and its `tokenizer.json`, e.g.
+
+        optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 <model_path>
+        python resources/bench_embedder.py --onnx-path <model_path> --quantize
+
+    `model_quantized.onnx` is preferred over `model.onnx` when both exist. Token embeddings are mean pooled over
+    the attention mask and L2 normalized, as the sentence-transformers pipeline of the model does, so vectors are
+    comparable with the PyTorch backend. Nothing is downloaded, the session is created once when the model loads.
+
+    Methods
+    -------
+    embed_documents(self, texts: list[str]) -> list[list[float]]
+        Embeds the texts, `batch_size` texts per inference.
+    embed_query(self, text: str) -> list[float]
+        Embeds a single text.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    model_path: Path
+    batch_size: int = 32
+    max_length: int = 256  # max_seq_length of all-MiniLM-L6-v2, longer texts are truncated
+    threads: int = 0  # intra op threads, 0 lets onnxruntime use every core
+
+    model_file: Path | None = None  # the loaded export
+    session: onnxruntime.InferenceSession | None = None
+    tokenizer: Tokenizer | None = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.model_file = self.model_path / "model_quantized.onnx"
+        if not self.model_file.exists():
+            self.model_file = self.model_path / "model.onnx"
+
+        options: onnxruntime.SessionOptions = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        self.session = onnxruntime.InferenceSession(
+            str(self.model_file), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_path / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        self.tokenizer.enable_padding()
+
+        msg: str = f"loaded onnx embedding model {self.model_file} ({os.path.getsize(self.model_file)} bytes)"
+        logger.info(msg)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed(texts=texts[i : i + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids: np.ndarray = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask: np.ndarray = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        inputs: dict[str, np.ndarray] = {"input_ids": input_ids, "attention_mask": attention_mask}
+        input_names: set[str] = {model_input.name for model_input in self.session.get_inputs()}
+        if "token_type_ids" in input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        # last hidden state, (batch, tokens, dimensions)
+        token_embeddings: np.ndarray = self.session.run(None, inputs)[0]
+
+        mask: np.ndarray = attention_mask[..., np.newaxis].astype(token_embeddings.dtype)
+        pooled: np.ndarray = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
@@ -0,0 +1,93 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from langchain_core.embeddings.embeddings import Embeddings
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger()
+
+# the model loaded by `_initialize`, one per pool process
+_model = None
+
+
+def _initialize(model_name: str, threads: int) -> None:
+    # pylint: disable=global-statement,import-outside-toplevel
+    global _model
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # the pool provides the parallelism, each process keeps to its share of the cores
+    torch.set_num_threads(threads)
+    _model = SentenceTransformer(model_name, device="cpu")
+
+
+def _embed(texts: list[str]) -> list[list[float]]:
+    return _model.encode(texts, convert_to_numpy=True).tolist()
+
+
+class ProcessPoolEmbedder(BaseModel, Embeddings):
+    """
+    Embeds with a sentence-transformers model on a pool of processes.
+
+    Each process loads the model once when the pool starts, texts are split into batches of `batch_size` which are
+    embedded in parallel, and the vectors are returned in the order of the texts. Processes are spawned rather than
+    forked so the pool is safe to start from a process which already runs other threads (e.g. a pika consumer).
+    The embedder is shared by threads (e.g. the embed stage's workers), the first of them to embed starts the pool.
+
+    Methods
+    -------
+    embed_documents(self, texts: list[str]) -> list[list[float]]
+        Embeds the texts, in parallel batches.
+    embed_query(self, text: str) -> list[float]
+        Embeds a single text.
+    close(self) -> None
+        Stops the pool processes.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    model_name: str
+    workers: int = 4
+    batch_size: int = 32
+    threads: int = 1  # torch threads per process
+
+    executor: ProcessPoolExecutor | None = None
+    lock: Any = Field(default_factory=threading.Lock)  # guards starting and stopping the pool
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        batches: list[list[str]] = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        vectors: list[list[float]] = []
+        for batch in self._executor().map(_embed, batches):
+            vectors.extend(batch)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    def close(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # started on first use so processes which never embed do not load the model
+        with self.lock:
+            if self.executor is None:
+                msg: str = f"starting {self.workers} embedding processes ({self.model_name})"
+                logger.info(msg)
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize,
+                    initargs=(self.model_name, self.threads),
+                )
+            return self.executor
@@ -1,15 +1,73 @@
+import logging
+
 from chromadb import ClientAPI
+from chromadb.api.models.Collection import Collection
 from langchain_chroma.vectorstores import Chroma
 from langchain_core.embeddings.embeddings import Embeddings
 from pydantic import BaseModel
 
+logger = logging.getLogger()
+
 
 class VectorService(BaseModel):
+    """
+    Chroma collections embedded with a single model.
+
+    Ingestion and queries both embed with `embedder`; vectors are computed here and handed to Chroma, so the
+    collection never embeds on its own. Each collection records the model which produced its vectors under the
+    `embedding_model` metadata key.
+
+    Methods
+    -------
+    get_vectorstore(self, collection_id: str) -> Chroma
+        The langchain vector store of a collection, queried with `embedder`.
+    create_collection(self, collection_id: str) -> Collection
+        Creates an empty collection, replacing an existing one.
+    get_collection(self, collection_id: str) -> Collection
+        An existing collection.
+    is_current(self, collection: Collection) -> bool
+        Whether the collection's vectors were produced by `model_name`.
+    embed(self, texts: list[str]) -> list[list[float]]
+        Embeds the texts with `embedder`, `batch_size` texts per call.
+    """
+
     class Config:
         arbitrary_types_allowed = True
 
     client: ClientAPI
     embedder: Embeddings
+    model_name: str  # recorded on each collection, identifies the vectors `embedder` produces
+    batch_size: int = 64
 
     def get_vectorstore(self, collection_id: str) -> Chroma:
-        return Chroma(client=self.client, collection_name=collection_id, embedding_function=self.embedder)
+        vectorstore: Chroma = Chroma(
+            client=self.client, collection_name=collection_id, embedding_function=self.embedder
+        )
+        if not self.is_current(collection=vectorstore._collection):  # pylint: disable=protected-access
+            msg: str = f"collection {collection_id} was not embedded with {self.model_name}, it should be re-ingested"
+            logger.warning(msg)
+        return vectorstore
+
+    def create_collection(self, collection_id: str) -> Collection:
+        # no embedding function, vectors are always computed by `embed` and passed in
+        collection: Collection = self.client.get_or_create_collection(
+            name=collection_id, metadata={"embedding_model": self.model_name}, embedding_function=None
+        )
+        if collection.count() > 0 or not self.is_current(collection=collection):
+            self.client.delete_collection(name=collection_id)
+            collection = self.client.create_collection(
+                name=collection_id, metadata={"embedding_model": self.model_name}, embedding_function=None
+            )
+        return collection
+
+    def get_collection(self, collection_id: str) -> Collection:
+        return self.client.get_collection(name=collection_id, embedding_function=None)
+
+    def is_current(self, collection: Collection) -> bool:
+        return (collection.metadata or {}).get("embedding_model") == self.model_name
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            vectors.extend(self.embedder.embed_documents(texts[i : i + self.batch_size]))
+        return vectors
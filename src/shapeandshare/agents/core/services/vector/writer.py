@@ -0,0 +1,122 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from chromadb.api.models.Collection import Collection
+from pydantic import BaseModel, Field
+
+from .batcher import ChunkBatch
+
+logger = logging.getLogger()
+
+
+class VectorWriter(BaseModel):
+    """
+    Upserts batches into a Chroma collection with up to `in_flight` writes running concurrently.
+
+    `submit` returns as soon as a write slot is free, so callers keep embedding while earlier batches are written,
+    and blocks while all slots are taken. Writes share the collection's client and its pool of HTTP connections.
+    A failed write is retried `retries` times, waiting `backoff` seconds (doubled per attempt, with jitter, up to
+    `max_backoff`) in between; validation errors (`ValueError`, `TypeError`) are not retried. `flush` is the barrier
+    after which every submitted batch is durable, or the first write which failed for good is raised.
+
+    Methods
+    -------
+    submit(self, batch: ChunkBatch, embeddings: list[list[float]], on_written: Callable | None = None) -> None
+        Queues the upsert of a batch, `on_written` is called from the writing thread once it succeeded.
+    flush(self) -> None
+        Waits for every submitted write, raises the first failure.
+    close(self) -> None
+        Flushes and stops the writer threads.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    collection: Collection
+    in_flight: int = 4
+    retries: int = 5
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+
+    written: int = 0  # batches
+    retried: int = 0  # write attempts which failed and were retried
+    busy_seconds: float = 0.0  # summed over the concurrent writes, retries and backoff included
+
+    executor: ThreadPoolExecutor | None = None
+    slots: threading.BoundedSemaphore | None = None
+    pending: set[Future] = Field(default_factory=set)
+    error: BaseException | None = None
+    lock: threading.Condition = Field(default_factory=threading.Condition)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = max(1, self.in_flight)
+        self.executor = ThreadPoolExecutor(max_workers=self.in_flight, thread_name_prefix="vector-writer")
+        self.slots = threading.BoundedSemaphore(self.in_flight)
+
+    def submit(
+        self, batch: ChunkBatch, embeddings: list[list[float]], on_written: Callable[[], None] | None = None
+    ) -> None:
+        # a failed write fails the ingestion, there is no point in writing more
+        if self.error is not None:
+            raise self.error
+
+        self.slots.acquire()
+        future: Future = self.executor.submit(self._write, batch=batch, embeddings=embeddings, on_written=on_written)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._done)
+
+    def flush(self) -> None:
+        with self.lock:
+            pending: set[Future] = set(self.pending)
+        wait(pending)
+        if self.error is not None:
+            raise self.error
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown(wait=True)
+
+    def _write(self, batch: ChunkBatch, embeddings: list[list[float]], on_written: Callable[[], None] | None) -> None:
+        started: float = time.perf_counter()
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    self.collection.upsert(
+                        ids=batch.ids, documents=batch.documents, metadatas=batch.metadatas, embeddings=embeddings
+                    )
+                    break
+                except (ValueError, TypeError):
+                    raise
+                except Exception as error:  # pylint: disable=broad-except
+                    if attempt == self.retries:
+                        raise
+                    delay: float = min(self.max_backoff, self.backoff * 2**attempt) * random.uniform(0.5, 1.0)
+                    msg: str = f"writing batch of {len(batch)} chunks failed ({error}), retrying in {delay:.1f}s"
+                    logger.warning(msg)
+                    with self.lock:
+                        self.retried += 1
+                    time.sleep(delay)
+        finally:
+            with self.lock:
+                self.busy_seconds += time.perf_counter() - started
+
+        with self.lock:
+            self.written += 1
+        if on_written is not None:
+            on_written()
+
+    def _done(self, future: Future) -> None:
+        with self.lock:
+            self.pending.discard(future)
+            if future.exception() is not None and self.error is None:
+                self.error = future.exception()
+                logger.error(f"writing to collection {self.collection.name} failed: {self.error}")
+        self.slots.release()
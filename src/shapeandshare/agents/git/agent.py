@@ -63,14 +63,55 @@ class GitAgent(BaseAgent):
                 collection_id=metadata.col_id,
                 url=request.url,
             )
-            self.publisher.publish_message(message=event, routing_key="repository.process")
+            await self.publisher.publish_message_async(message=event, routing_key="repository.process")
             # finally:
             #     self.publisher.close()
             return metadata
 
+    async def refresh_repository(self, request: BaseChatRequest) -> GitMetadata:
+        """Re-index only the files changed since the indexed commit"""
+        metadata: GitMetadata | None = self.metadata_service.get(request=request)
+        if metadata is None:
+            raise Exception("Context does not exist")
+        if metadata.status not in [ProcessingStatus.COMPLETED, ProcessingStatus.FAILED] or metadata.refreshing:
+            msg: str = f"Context can not be refreshed, current state is ({metadata.status})"
+            if metadata.refreshing:
+                msg = "Context can not be refreshed, a refresh is already running"
+            raise Exception(msg)
+
+        logger.info("beginning repository refresh")
+        # an incremental refresh keeps the indexed repository queryable (its status is left as is) until the
+        # workers report the outcome, without an indexed commit the collection is rebuilt from scratch
+        metadata_partial: dict = {"refreshing": True}
+        if metadata.commit is None:
+            metadata_partial["status"] = ProcessingStatus.PROCESSING
+        # only the refresh's fields are written, and only if no other refresh started since the check above
+        metadata = self.metadata_service.update_by_id_if(
+            storage_id=metadata.id,
+            condition={"status": metadata.status.value, "commit": metadata.commit, "refreshing": {"$ne": True}},
+            metadata_partial=metadata_partial,
+        )
+        if metadata is None:
+            raise Exception("Context can not be refreshed, its state changed meanwhile")
+
+        event_id: str = str(uuid4())
+        event = RepositoryEvent(
+            event_id=event_id,
+            event_type="REPOSITORY_PROCESS",
+            timestamp=datetime.now(),
+            correlation_id=event_id,
+            source_service="git_agent",
+            repository_id=metadata.id,
+            collection_id=metadata.col_id,
+            url=request.url,
+            base_commit=metadata.commit,  # without an indexed commit the repository is fully re-ingested
+        )
+        await self.publisher.publish_message_async(message=event, routing_key="repository.process")
+        return metadata
+
     async def generate_chat_response(self, request: ChatRequest) -> dict:
         metadata: GitMetadata | None = self.metadata_service.get(request=BaseChatRequest.model_validate((request)))
-        if metadata and metadata.status in [ProcessingStatus.COMPLETED] and metadata.col_id:
+        if metadata and metadata.status in [ProcessingStatus.COMPLETED, ProcessingStatus.PARTIAL] and metadata.col_id:
             vectorstore: Chroma = self._load_context(collection_id=metadata.col_id)
 
             # add conversation id to request
@@ -78,6 +119,10 @@ class GitAgent(BaseAgent):
 
             # Generate response
             response = await self.generate_response(vectorstore=vectorstore, request=request)
+            if metadata.status == ProcessingStatus.PARTIAL:
+                # the answer is based on the part of the repository indexed so far
+                response["pending"] = metadata.pending or []
+                response["answer"] = f"{response['answer']}\n\n{self._partial_note(metadata=metadata)}"
             return response
 
         if metadata is None:
@@ -98,5 +143,12 @@ class GitAgent(BaseAgent):
                 conversation_id=metadata.conversation_id, user_id=metadata.id
             )
 
+    @staticmethod
+    def _partial_note(metadata: GitMetadata) -> str:
+        note: str = f"Note: the repository is still being indexed ({metadata.indexed_fraction or 0:.0%} of the files)"
+        if metadata.pending:
+            return f"{note}, not indexed yet: {', '.join(metadata.pending)}."
+        return f"{note}."
+
     def _load_context(self, collection_id: str) -> Chroma:
         return self.vector_service.get_vectorstore(collection_id=collection_id)
@@ -2,11 +2,14 @@ import logging
 
 from fastapi import APIRouter, BackgroundTasks, Depends, status
 
+from ....core.framework.contracts.errors.dao.doesnotexist import DaoDoesNotExistError
 from ....sdk.contracts.dtos.response import Response
 from ...agent import GitAgent
 from ...context import context
 from ...sdk.contracts.dtos.chat import BaseChatRequest, ChatRequest
 from ...sdk.contracts.dtos.git_metadata import GitMetadata
+from ...sdk.contracts.dtos.ingestion_stats import IngestionStats
+from ...sdk.contracts.dtos.stats_update import RepositoryStatsUpdateRequest
 from ...sdk.contracts.dtos.status_update import RepositoryStatusUpdateRequest
 from ...services.metadata.service import MetadataService
 from ..middleware.error import error_handler
@@ -52,6 +55,13 @@ async def ingest_repository(request: BaseChatRequest, agent: GitAgent = Depends(
     return Response[GitMetadata](data=metadata)
 
 
+@router.post("/refresh", status_code=status.HTTP_202_ACCEPTED)
+@error_handler
+async def refresh_repository(request: BaseChatRequest, agent: GitAgent = Depends(get_agent)) -> Response[GitMetadata]:
+    metadata: GitMetadata = await agent.refresh_repository(request)
+    return Response[GitMetadata](data=metadata)
+
+
 @router.delete("", status_code=status.HTTP_202_ACCEPTED)
 @error_handler
 async def delete_repository(
@@ -64,8 +74,40 @@ async def delete_repository(
 @error_handler
 async def update_repository_status(
     request: RepositoryStatusUpdateRequest, service: MetadataService = Depends(get_metadata_service)
+) -> Response[GitMetadata]:
+    # progress is only reported while PARTIAL, other statuses clear it; workers only report a status while a
+    # repository is (re-)ingested or once it is done, so any update ends a refresh
+    metadata_partial: dict = {"refreshing": False}
+    if request.status:
+        metadata_partial.update(
+            {"status": request.status, "indexed_fraction": request.indexed_fraction, "pending": request.pending}
+        )
+    if request.commit:
+        metadata_partial["commit"] = request.commit
+    if request.col_id:
+        # a refresh re-ingested the repository into a new collection, queries move over to it
+        metadata_partial["col_id"] = request.col_id
+    metadata: GitMetadata = service.update_by_id(storage_id=request.repository_id, metadata_partial=metadata_partial)
+    return Response[GitMetadata](data=metadata)
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK)
+@error_handler
+async def get_repository_stats(
+    id: str, url: str, service: MetadataService = Depends(get_metadata_service)  # pylint: disable=redefined-builtin
+) -> Response[IngestionStats | None]:
+    metadata: GitMetadata | None = service.get(request=BaseChatRequest(id=id, url=url))
+    if metadata is None:
+        raise DaoDoesNotExistError("Context does not exist")
+    return Response[IngestionStats | None](data=metadata.ingestion)
+
+
+@router.put("/stats", status_code=status.HTTP_200_OK)
+@error_handler
+async def update_repository_stats(
+    request: RepositoryStatsUpdateRequest, service: MetadataService = Depends(get_metadata_service)
 ) -> Response[GitMetadata]:
     metadata: GitMetadata = service.update_by_id(
-        storage_id=request.repository_id, metadata_partial={"status": request.status}
+        storage_id=request.repository_id, metadata_partial={"ingestion": request.stats.model_dump()}
     )
     return Response[GitMetadata](data=metadata)
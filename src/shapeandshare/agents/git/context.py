@@ -1,20 +1,38 @@
+from pathlib import Path
+
 from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.embeddings.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from ..core.framework.common.config.environment import demand_env_var, demand_env_var_as_float, demand_env_var_as_int
+from ..core.framework.common.config.environment import (
+    demand_env_var,
+    demand_env_var_as_float,
+    demand_env_var_as_int,
+    get_env_var,
+    get_env_var_as_bool,
+    get_env_var_as_float,
+    get_env_var_as_int,
+)
+from ..core.framework.contracts.dtos.git_clone_options import GitCloneOptions
 from ..core.framework.contracts.dtos.llm_hyperparameters import LLMHyperParameters
 from ..core.framework.contracts.dtos.rabbitmq_config import RabbitMQConfig
 from ..core.infrastructure.messaging.rabbitmq.publisher import MessagePublisher
 from ..core.infrastructure.persistence.chromadb.utils import get_chroma_client
 from ..core.infrastructure.persistence.git.dao import GitDao
+from ..core.infrastructure.persistence.git.mirror import GitMirrorCache
 from ..core.infrastructure.persistence.mongodb.dao_legacy import MongoDaoLegacy, get_mongodb
 from ..core.services.chathistory.sdk.client.chathistory import ChatHistoryClient
+from ..core.services.vector.cache import EmbeddingCache
+from ..core.services.vector.onnx_embedder import OnnxEmbeddings
+from ..core.services.vector.pool import ProcessPoolEmbedder
 from ..core.services.vector.service import VectorService
 from .agent import GitAgent
 from .prompts import question_answering_prompt
 from .sdk.client.git import GitAgentClient
+from .services.analysis.chunker import Chunker
+from .services.analysis.classifier import ContentClassifier
 from .services.analysis.service import AnalysisService
 from .services.metadata.service import MetadataService
 from .services.repository.service import RepositoryService
@@ -31,7 +49,12 @@ def build_runtime_context() -> None:
         password=demand_env_var(name="RABBITMQ_PASSWORD"),
     )
 
-    context["publisher"] = MessagePublisher(config=context["rabbitmq_config"], exchange_name="git_agent")
+    # with confirms a publish returns once the broker has the message, batches are confirmed together
+    context["publisher"] = MessagePublisher(
+        config=context["rabbitmq_config"],
+        exchange_name="git_agent",
+        confirm=get_env_var_as_bool(name="RABBITMQ_PUBLISHER_CONFIRMS", default=True),
+    )
 
     params: LLMHyperParameters = LLMHyperParameters(
         model=demand_env_var(name="LLM_HYPERPARAMETER_MODEL"),
@@ -41,20 +64,117 @@ def build_runtime_context() -> None:
         max_retries=demand_env_var_as_int(name="LLM_HYPERPARAMETER_RETRIES"),
     )
     context["llm"] = ChatOpenAI(**params.model_dump())
+
+    # Ingestion and queries embed with the same model, the API and the analysis worker must use the same backend.
+    # - torch: sentence-transformers, on a pool of processes (each loads the model once) when EMBEDDING_WORKERS > 0
+    # - onnx: the (int8 quantized) ONNX export of the model in EMBEDDING_ONNX_PATH, on the CPU
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: str = get_env_var(name="EMBEDDING_BACKEND") or "torch"
+    embedding_workers: int = get_env_var_as_int(name="EMBEDDING_WORKERS", default=0)
+    embedding_batch_size: int = get_env_var_as_int(name="EMBEDDING_BATCH_SIZE", default=32)
+    if embedding_backend == "onnx":
+        embedder: Embeddings = OnnxEmbeddings(
+            model_path=Path(demand_env_var(name="EMBEDDING_ONNX_PATH")), batch_size=embedding_batch_size
+        )
+        # quantized vectors are close to, but not the same as, the PyTorch ones
+        embedding_model = f"{embedding_model}:{embedder.model_file.stem}"
+    elif embedding_backend == "torch":
+        embedder: Embeddings = (
+            ProcessPoolEmbedder(model_name=embedding_model, workers=embedding_workers, batch_size=embedding_batch_size)
+            if embedding_workers > 0
+            else HuggingFaceEmbeddings(model_name=embedding_model)
+        )
+    else:
+        raise ValueError(f"unknown EMBEDDING_BACKEND {embedding_backend}, expected torch or onnx")
     context["vector_service"] = VectorService(
         client=get_chroma_client(),
-        embedder=HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"),
+        embedder=embedder,
+        model_name=embedding_model,
+        batch_size=embedding_batch_size * max(1, embedding_workers),
+    )
+
+    # Repository file filters, shared by sparse clones and content extraction
+    default_extensions: set[str] = {".py", ".md", ".txt", ".yaml", ".yml", ".sh", ".toml", ".env"}
+    default_included_files: set[str] = {"Makefile"}
+    default_excluded_dirs: set[str] = {".git", "__pycache__", "node_modules", "venv", ".env", ".idea"}
+
+    # Clone modes (0 / false keeps the full clone behaviour)
+    clone_depth: int = get_env_var_as_int(name="GIT_CLONE_DEPTH", default=0)
+    context["clone_options"] = GitCloneOptions(
+        depth=clone_depth if clone_depth > 0 else None,
+        blobless=get_env_var_as_bool(name="GIT_CLONE_BLOBLESS", default=False),
+        sparse_patterns=(
+            GitDao.sparse_patterns(
+                extensions=default_extensions,
+                included_files=default_included_files,
+                excluded_dirs=default_excluded_dirs,
+            )
+            if get_env_var_as_bool(name="GIT_CLONE_SPARSE", default=False)
+            else None
+        ),
+    )
+
+    # Shared mirror cache of repeatedly cloned urls, bounded by a disk quota (0 disables it)
+    mirror_cache_quota: int = get_env_var_as_int(name="GIT_MIRROR_CACHE_QUOTA_BYTES", default=0)
+    context["mirror_cache"] = (
+        GitMirrorCache(
+            root=Path(demand_env_var(name="DATA_BASE_DIR")) / "cache" / "mirrors", quota_bytes=mirror_cache_quota
+        )
+        if mirror_cache_quota > 0
+        else None
+    )
+
+    # Clone and delete jobs run concurrently by a repository worker (the broker's prefetch matches)
+    context["repository_clone_concurrency"] = get_env_var_as_int(name="REPOSITORY_CLONE_CONCURRENCY", default=4)
+    context["repository_delete_concurrency"] = get_env_var_as_int(name="REPOSITORY_DELETE_CONCURRENCY", default=2)
+
+    context["repository_service"] = RepositoryService(
+        git=GitDao(), clone_options=context["clone_options"], mirror_cache=context["mirror_cache"]
     )
-    context["repository_service"] = RepositoryService(git=GitDao())
     context["chathistory_client"] = ChatHistoryClient()
-    context["metadata_service"] = MetadataService(dao=MongoDaoLegacy(database=get_mongodb()))
+    context["dao"] = MongoDaoLegacy(database=get_mongodb())
+    context["metadata_service"] = MetadataService(dao=context["dao"])
     context["analysis_service"] = AnalysisService(
         repository_service=context["repository_service"],
-        default_extensions={".py", ".md", ".txt", ".yaml", ".yml", ".sh", ".toml", ".env"},
-        default_included_files={"Makefile"},
-        default_excluded_dirs={".git", "__pycache__", "node_modules", "venv", ".env", ".idea"},
+        default_extensions=default_extensions,
+        default_included_files=default_included_files,
+        default_excluded_dirs=default_excluded_dirs,
+        read_workers=get_env_var_as_int(name="ANALYSIS_READ_WORKERS", default=8),
+        # binary, generated, minified, vendored and oversized files are skipped, long files truncated
+        classifier=ContentClassifier(
+            max_bytes=get_env_var_as_int(name="ANALYSIS_MAX_FILE_BYTES", default=4 * 1024 * 1024),
+            max_chars=get_env_var_as_int(name="ANALYSIS_MAX_FILE_CHARS", default=512 * 1024),
+        ),
     )
     context["text_splitter"] = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
+    context["chunker"] = Chunker(max_chars=get_env_var_as_int(name="INGEST_CHUNK_MAX_CHARS", default=1500))
+    context["ingest_deduplication"] = get_env_var(name="INGEST_DEDUPLICATION") or "collapse"
+
+    # Ingestion batching (chunks are embedded and written to chroma per batch)
+    context["ingest_batch_max_chunks"] = get_env_var_as_int(name="INGEST_BATCH_MAX_CHUNKS", default=256)
+    context["ingest_batch_max_bytes"] = get_env_var_as_int(name="INGEST_BATCH_MAX_BYTES", default=4 * 1024 * 1024)
+
+    # Ingestion pipeline (classify, read, chunk, embed and upsert stages connected by bounded queues)
+    context["ingest_embed_workers"] = get_env_var_as_int(name="INGEST_EMBED_WORKERS", default=1)
+    context["ingest_upsert_workers"] = get_env_var_as_int(name="INGEST_UPSERT_WORKERS", default=2)
+    context["ingest_upsert_retries"] = get_env_var_as_int(name="INGEST_UPSERT_RETRIES", default=5)
+    context["ingest_upsert_backoff"] = get_env_var_as_float(name="INGEST_UPSERT_BACKOFF_SECONDS", default=0.5)
+    context["ingest_queue_batches"] = get_env_var_as_int(name="INGEST_QUEUE_BATCHES", default=2)
+    context["ingest_stats_interval"] = get_env_var_as_int(name="INGEST_STATS_INTERVAL_SECONDS", default=30)
+    # the repository is queryable (PARTIAL) once this fraction of its files is indexed, 1 waits for all of them
+    context["ingest_ready_fraction"] = get_env_var_as_float(name="INGEST_READY_FRACTION", default=0.5)
+
+    # Embedding cache (shared across repositories and users, 0 disables it)
+    embedding_cache_max_entries: int = get_env_var_as_int(name="EMBEDDING_CACHE_MAX_ENTRIES", default=500_000)
+    context["embedding_cache"] = (
+        EmbeddingCache(
+            dao=context["dao"],
+            model_name=context["vector_service"].model_name,
+            max_entries=embedding_cache_max_entries,
+        )
+        if embedding_cache_max_entries > 0
+        else None
+    )
 
     context["agent"] = GitAgent(
         repository_service=context["repository_service"],
@@ -0,0 +1,30 @@
+from ......sdk.contracts.dtos.request_status_codes import RequestStatusCodes
+from ......sdk.contracts.dtos.response import Response
+from ......sdk.contracts.dtos.wrapped_request import WrappedRequest
+from ......sdk.contracts.types.request_verb import RequestVerbType
+from ....contracts.dtos.chat import BaseChatRequest
+from ....contracts.dtos.ingestion_stats import IngestionStats
+from ..abstract import AbstractCommand
+
+
+class RepositoryStatsGetCommand(AbstractCommand):
+    """
+    Methods
+    -------
+    execute(self)
+        Executes the command.
+    """
+
+    async def execute(self, request: BaseChatRequest) -> IngestionStats | None:
+        """
+        Executes the command.
+        """
+
+        wrapped_request: WrappedRequest = WrappedRequest(
+            verb=RequestVerbType.GET,
+            statuses=RequestStatusCodes(allow=[200], retry=[501, 503], reauth=[401]),
+            url="git/stats",
+            params=request.model_dump(),
+        )
+        response = await self.wrapped_request(request=wrapped_request)
+        return Response[IngestionStats | None].model_validate(response).data
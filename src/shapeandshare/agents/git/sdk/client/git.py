@@ -1,6 +1,10 @@
+import asyncio
+
 from ....sdk.contracts.dtos.command_options import CommandOptions
 from ..contracts.dtos.chat import BaseChatRequest, ChatRequest
 from ..contracts.dtos.git_metadata import GitMetadata
+from ..contracts.dtos.ingestion_stats import IngestionStats
+from ..contracts.dtos.stats_update import RepositoryStatsUpdateRequest
 from ..contracts.dtos.status_update import RepositoryStatusUpdateRequest
 from ..contracts.types.processing_status import ProcessingStatus
 from .commands.chat.post import ChatCommand
@@ -8,6 +12,9 @@ from .commands.metrics.health.get import HealthGetCommand
 from .commands.repository.delete import RepositoryDeleteCommand
 from .commands.repository.post import RepositoryPostCommand
 from .commands.repository.put import RepositoryPutCommand
+from .commands.repository.refresh import RepositoryRefreshCommand
+from .commands.repository.stats_get import RepositoryStatsGetCommand
+from .commands.repository.stats_put import RepositoryStatsPutCommand
 
 
 class GitAgentClient:
@@ -20,6 +27,9 @@ class GitAgentClient:
     repository_put_command: RepositoryPutCommand
     repository_post_command: RepositoryPostCommand
     repository_delete_command: RepositoryDeleteCommand
+    repository_refresh_command: RepositoryRefreshCommand
+    repository_stats_get_command: RepositoryStatsGetCommand
+    repository_stats_put_command: RepositoryStatsPutCommand
 
     # chat
     chat_command: ChatCommand
@@ -36,6 +46,9 @@ class GitAgentClient:
         self.repository_put_command = RepositoryPutCommand.model_validate(command_dict)
         self.repository_post_command = RepositoryPostCommand.model_validate(command_dict)
         self.repository_delete_command = RepositoryDeleteCommand.model_validate(command_dict)
+        self.repository_refresh_command = RepositoryRefreshCommand.model_validate(command_dict)
+        self.repository_stats_get_command = RepositoryStatsGetCommand.model_validate(command_dict)
+        self.repository_stats_put_command = RepositoryStatsPutCommand.model_validate(command_dict)
 
         # chat
         self.chat_command = ChatCommand.model_validate(command_dict)
@@ -52,16 +65,62 @@ class GitAgentClient:
 
         return await self.health_get_command.execute()
 
-    async def status_update(self, repository_id: str, status: ProcessingStatus) -> GitMetadata:
+    async def status_update(
+        self,
+        repository_id: str,
+        status: ProcessingStatus | None,
+        commit: str | None = None,
+        col_id: str | None = None,
+        indexed_fraction: float | None = None,
+        pending: list[str] | None = None,
+    ) -> GitMetadata:
         request: RepositoryStatusUpdateRequest = RepositoryStatusUpdateRequest(
-            repository_id=repository_id, status=status
+            repository_id=repository_id,
+            status=status,
+            commit=commit,
+            col_id=col_id,
+            indexed_fraction=indexed_fraction,
+            pending=pending,
         )
         return await self.repository_put_command.execute(request=request)
 
+    def status_update_sync(
+        self,
+        repository_id: str,
+        status: ProcessingStatus | None,
+        commit: str | None = None,
+        col_id: str | None = None,
+        indexed_fraction: float | None = None,
+        pending: list[str] | None = None,
+    ) -> GitMetadata:
+        """`status_update` for threads without an event loop, e.g. run with `asyncio.to_thread` (the requests block)"""
+        return asyncio.run(
+            self.status_update(
+                repository_id=repository_id,
+                status=status,
+                commit=commit,
+                col_id=col_id,
+                indexed_fraction=indexed_fraction,
+                pending=pending,
+            )
+        )
+
+    async def stats_update(self, repository_id: str, stats: IngestionStats) -> GitMetadata:
+        request: RepositoryStatsUpdateRequest = RepositoryStatsUpdateRequest(repository_id=repository_id, stats=stats)
+        return await self.repository_stats_put_command.execute(request=request)
+
+    async def repository_stats(self, user_id: str, repository_url: str) -> IngestionStats | None:
+        request: BaseChatRequest = BaseChatRequest(id=user_id, url=repository_url)
+        return await self.repository_stats_get_command.execute(request=request)
+
     async def repository_delete(self, user_id: str, repository_url: str) -> None:
         request: BaseChatRequest = BaseChatRequest(id=user_id, url=repository_url)
         await self.repository_delete_command.execute(request=request)
 
+    async def repository_refresh(self, user_id: str, repository_url: str) -> GitMetadata:
+        request: BaseChatRequest = BaseChatRequest(id=user_id, url=repository_url)
+        return await self.repository_refresh_command.execute(request=request)
+
     async def repository_ingest(self, user_id: str, repository_url: str) -> GitMetadata:
         request: BaseChatRequest = BaseChatRequest(id=user_id, url=repository_url)
         return await self.repository_post_command.execute(request=request)
@@ -1,6 +1,12 @@
 from .....core.framework.contracts.models.metadata import Metadata
 from ..types.processing_status import ProcessingStatus
+from .ingestion_stats import IngestionStats
 
 
 class GitMetadata(Metadata):
     status: ProcessingStatus | None = None
+    commit: str | None = None  # the commit sha the collection was built from
+    refreshing: bool | None = None  # an incremental refresh is running, the indexed commit stays queryable
+    indexed_fraction: float | None = None  # fraction of the files indexed while the repository is PARTIAL
+    pending: list[str] | None = None  # top-level areas not indexed yet while the repository is PARTIAL
+    ingestion: IngestionStats | None = None  # statistics of the latest (or running) ingestion
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class IngestionStats(BaseModel):
+    """Where the time of the latest ingestion of a repository went, updated while it runs"""
+
+    started: datetime | None = None
+    updated: datetime | None = None
+    finished: bool = False
+    elapsed_seconds: float = 0.0  # since the analysis worker picked the job up
+    clone_seconds: float | None = None
+
+    files_seen: int = 0  # in the working tree listing
+    files_filtered: int = 0  # left after the extension, directory and .gitignore filters
+    files_skipped: dict[str, int] = {}  # SkipReason -> files not read for it
+    files_failed: int = 0  # unreadable
+    files_read: int = 0
+    bytes_read: int = 0
+    chunks_produced: int = 0
+    duplicates: int = 0  # near-duplicate chunks which were not embedded
+    chunks_written: int = 0
+
+    embedding_seconds: float = 0.0  # summed over the embedding workers
+    upsert_seconds: float = 0.0  # summed over the upsert workers
+    files_per_second: float = 0.0
+    chunks_per_second: float = 0.0
+    peak_memory_bytes: int = 0  # peak resident memory of the analysis worker process
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+from .ingestion_stats import IngestionStats
+
+
+class RepositoryStatsUpdateRequest(BaseModel):
+    repository_id: str
+    stats: IngestionStats
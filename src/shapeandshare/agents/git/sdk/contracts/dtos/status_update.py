@@ -9,4 +9,8 @@ class RepositoryStatusUpdateRequest(BaseModel):
         use_enum_values = True
 
     repository_id: str
-    status: ProcessingStatus
+    status: ProcessingStatus | None = None  # None only ends a refresh, the status is left as is
+    commit: str | None = None
+    col_id: str | None = None  # set when the repository was re-ingested into a new collection
+    indexed_fraction: float | None = None
+    pending: list[str] | None = None
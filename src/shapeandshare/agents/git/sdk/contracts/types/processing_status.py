@@ -4,5 +4,6 @@ from enum import Enum
 class ProcessingStatus(str, Enum):
     SUBMITTED = "submitted"
     PROCESSING = "processing"
+    PARTIAL = "partial"  # still processing, enough of the repository is indexed to answer questions
     COMPLETED = "completed"
     FAILED = "failed"
@@ -0,0 +1,221 @@
+import ast
+import os
+import re
+from itertools import accumulate
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pydantic import BaseModel
+
+# ATX headings, setext headings are rare in repositories and are left to the size based packing
+MARKDOWN_HEADING = re.compile(r"^ {0,3}#{1,6}(?:[ \t]|$)")
+MARKDOWN_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+class Chunk(BaseModel):
+    """A contiguous range of lines of a repository file"""
+
+    path: str
+    start_line: int  # 1-based, inclusive
+    end_line: int  # inclusive
+    text: str
+
+    def document(self) -> str:
+        """The chunk as stored and shown to the model, every chunk names its file and lines (only `text` is embedded)"""
+        return (
+            "<document>\n"
+            f"<source>{self.path}</source>\n"
+            f"<lines>{self.start_line}-{self.end_line}</lines>\n"
+            "<document_content>\n"
+            f"{self.text}"
+            "</document_content>\n"
+            "</document>"
+        )
+
+    def metadata(self) -> dict:
+        return {"source": self.path, "start_line": self.start_line, "end_line": self.end_line}
+
+
+class Chunker(BaseModel):
+    """
+    Splits files into chunks along their structure.
+
+    Python is split on AST boundaries (module level statements, classes, functions, and the members of a class or
+    function too large for one chunk), Markdown on headings, everything else (and Python which does not parse)
+    with the character splitter. Adjacent units are packed into chunks of up to `max_chars` characters, comments
+    and blank lines preceding a unit stay with it, and units which are still too large are split by characters. A
+    Markdown section keeps its heading in its first chunk, which exceeds `max_chars` by at most the heading when
+    the section's first line does not fit next to it. Chunks never share a line, unless a single line longer than
+    `max_chars` is cut into several chunks.
+
+    Methods
+    -------
+    split(self, path: str, text: str) -> list[Chunk]
+        Chunks a file, in line order.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    max_chars: int = 1500
+    splitter: RecursiveCharacterTextSplitter | None = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.splitter is None:
+            self.splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.max_chars, chunk_overlap=0, add_start_index=True, strip_whitespace=False
+            )
+
+    def split(self, path: str, text: str) -> list[Chunk]:
+        # only newlines end a line (as for `ast` line numbers), `str.splitlines` also splits on e.g. form feeds
+        lines: list[str] = [f"{line}\n" for line in text.split("\n")]
+        lines[-1] = lines[-1][:-1]
+        if not lines[-1]:
+            lines.pop()
+        if not lines:
+            return []
+        # offsets[n] is the number of characters in the first n lines
+        offsets: list[int] = [0, *accumulate(len(line) for line in lines)]
+
+        extension: str = os.path.splitext(path)[1].lower()
+        ranges: list[tuple[int, int]] | None = None
+        if extension in {".py", ".pyi"}:
+            ranges = self._python_ranges(text=text, offsets=offsets)
+        elif extension in {".md", ".markdown"}:
+            ranges = self._markdown_ranges(lines=lines)
+        if ranges is None:
+            return self._split_characters(path=path, lines=lines, start_line=1, end_line=len(lines))
+
+        chunks: list[Chunk] = []
+        for start_line, end_line in self._pack(ranges=ranges, offsets=offsets):
+            # a range too large for one chunk is a single unit, e.g. a Markdown section led by its heading
+            lead: int = 1 if extension in {".md", ".markdown"} and MARKDOWN_HEADING.match(lines[start_line - 1]) else 0
+            chunks.extend(
+                self._range_chunks(
+                    path=path, lines=lines, offsets=offsets, start_line=start_line, end_line=end_line, lead=lead
+                )
+            )
+        return chunks
+
+    def _python_ranges(self, text: str, offsets: list[int]) -> list[tuple[int, int]] | None:
+        try:
+            module: ast.Module = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return None
+        if not module.body:
+            return [(1, len(offsets) - 1)]
+        return self._node_ranges(nodes=module.body, offsets=offsets, start_line=1, end_line=len(offsets) - 1)
+
+    def _node_ranges(
+        self, nodes: list[ast.AST], offsets: list[int], start_line: int, end_line: int
+    ) -> list[tuple[int, int]]:
+        # each statement owns the lines since the previous one (its comments and decorators), the last one also
+        # owns the trailing lines
+        ranges: list[tuple[int, int]] = []
+        start: int = start_line
+        for i, node in enumerate(nodes):
+            end: int = end_line if i == len(nodes) - 1 else node.end_lineno
+            children: list[ast.AST] = self._children(node=node)
+            if children and self._size(offsets=offsets, start_line=start, end_line=end) > self.max_chars:
+                # the header of a class, function or block (e.g. its signature) leads its first member
+                ranges.extend(self._node_ranges(nodes=children, offsets=offsets, start_line=start, end_line=end))
+            else:
+                ranges.append((start, end))
+            start = end + 1
+        return ranges
+
+    @staticmethod
+    def _children(node: ast.AST) -> list[ast.AST]:
+        # the statements (and except handlers) nested in a compound statement, in line order
+        children: list[ast.AST] = []
+        for field in ("body", "handlers", "orelse", "finalbody"):
+            children.extend(child for child in getattr(node, field, None) or () if hasattr(child, "end_lineno"))
+        return sorted(children, key=lambda child: child.lineno)
+
+    @staticmethod
+    def _markdown_ranges(lines: list[str]) -> list[tuple[int, int]]:
+        starts: list[int] = [1]
+        fence: str | None = None
+        for number, line in enumerate(lines, start=1):
+            match: re.Match | None = MARKDOWN_FENCE.match(line)
+            if match:
+                marker: str = match.group(1)
+                if fence is None:
+                    fence = marker
+                elif marker[0] == fence[0] and len(marker) >= len(fence):
+                    fence = None
+            elif fence is None and number > 1 and MARKDOWN_HEADING.match(line):
+                starts.append(number)
+        ends: list[int] = [start - 1 for start in starts[1:]] + [len(lines)]
+        return list(zip(starts, ends))
+
+    def _pack(self, ranges: list[tuple[int, int]], offsets: list[int]) -> list[tuple[int, int]]:
+        packed: list[tuple[int, int]] = []
+        for start_line, end_line in ranges:
+            if packed and (self._size(offsets=offsets, start_line=packed[-1][0], end_line=end_line) <= self.max_chars):
+                packed[-1] = (packed[-1][0], end_line)
+            else:
+                packed.append((start_line, end_line))
+        return packed
+
+    def _range_chunks(
+        self, path: str, lines: list[str], offsets: list[int], start_line: int, end_line: int, lead: int = 0
+    ) -> list[Chunk]:
+        if self._size(offsets=offsets, start_line=start_line, end_line=end_line) > self.max_chars:
+            return self._split_characters(path=path, lines=lines, start_line=start_line, end_line=end_line, lead=lead)
+
+        text: str = "".join(lines[start_line - 1 : end_line])
+        if not text.strip():
+            return []
+        return [Chunk(path=path, start_line=start_line, end_line=end_line, text=text)]
+
+    def _split_characters(
+        self, path: str, lines: list[str], start_line: int, end_line: int, lead: int = 0
+    ) -> list[Chunk]:
+        """Splits lines by characters, the first `lead` lines (e.g. a heading) stay whole at the start"""
+        text: str = "".join(lines[start_line - 1 : end_line])
+        head: int = len("".join(lines[start_line - 1 : start_line - 1 + lead]))
+
+        # pieces keep the splitter's separators, so they are consecutive (offset, content) ranges of `text`
+        pieces: list[tuple[int, str]] = []
+        if 0 < head < self.max_chars:
+            # the first piece of the body is cut to fit next to the heading
+            splitter: RecursiveCharacterTextSplitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.max_chars - head, chunk_overlap=0, add_start_index=True, strip_whitespace=False
+            )
+            body: Document = splitter.create_documents([text[head:]])[0]
+            cut: int = head + body.metadata["start_index"] + len(body.page_content)
+            if cut < len(text) and "\n" not in (text[cut - 1], text[cut]):
+                # the smaller budget cut a line, it moves to the next chunk (or stays here whole if it fits a chunk)
+                line_start: int = text.rfind("\n", head, cut) + 1
+                line_end: int = text.find("\n", cut) + 1 or len(text)
+                if line_start > head and text[head:line_start].strip():
+                    cut = line_start
+                elif line_end - line_start <= self.max_chars:
+                    cut = line_end
+            pieces.append((0, text[:cut]))
+            rest: str = text[cut:]
+        else:
+            cut, rest = 0, text
+        pieces.extend(
+            (cut + document.metadata["start_index"], document.page_content)
+            for document in self.splitter.create_documents([rest])
+        )
+
+        chunks: list[Chunk] = []
+        for offset, content in pieces:
+            if not content.strip():
+                continue
+            # a separator newline leading a piece ends the line of the previous piece, so both line numbers are
+            # taken from the offsets of the piece's first and last characters within its lines
+            leading: int = len(content) - len(content.lstrip("\n"))
+            content = content.strip("\n")
+            first: int = start_line + text.count("\n", 0, offset + leading)
+            last: int = first + content.count("\n")
+            chunks.append(Chunk(path=path, start_line=first, end_line=last, text=f"{content}\n"))
+        return chunks
+
+    @staticmethod
+    def _size(offsets: list[int], start_line: int, end_line: int) -> int:
+        return offsets[end_line] - offsets[start_line - 1]
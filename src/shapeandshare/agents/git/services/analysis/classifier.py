@@ -0,0 +1,107 @@
+import codecs
+import os
+
+from pydantic import BaseModel
+
+from ....core.framework.common.utils.path_filter import PathFilter
+from ....core.framework.contracts.types.skip_reason import SkipReason
+
+
+class ContentClassifier(BaseModel):
+    """
+    Decides from cheap signals whether a repository file is worth reading before it is read completely.
+
+    Files are skipped by name (lockfiles, generated and minified artifacts), by location (vendored directories),
+    by size, and from the first `sniff_bytes` of their content: NUL bytes or invalid UTF-8 (binary), generator
+    markers near the top (generated) and line length statistics (minified). Files which pass are read up to
+    `max_chars` characters, the rest is truncated.
+
+    Methods
+    -------
+    classify_path(self, path: str, size: int | None) -> SkipReason | None
+        Why the file is skipped without reading it, `None` when its head should be sniffed.
+    classify_head(self, head: bytes, complete: bool) -> SkipReason | None
+        Why the file is skipped given its first bytes, `None` when it should be read.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    sniff_bytes: int = 8192
+    max_bytes: int = 4 * 1024 * 1024  # larger files are skipped without being opened
+    max_chars: int = 512 * 1024  # larger files are truncated
+    max_line_length: int = 5000  # a longer line in the head marks a minified file
+    max_mean_line_length: int = 500
+
+    lockfiles: frozenset[str] = frozenset(
+        {
+            "package-lock.json",
+            "npm-shrinkwrap.json",
+            "yarn.lock",
+            "pnpm-lock.yaml",
+            "poetry.lock",
+            "Pipfile.lock",
+            "uv.lock",
+            "Cargo.lock",
+            "go.sum",
+            "composer.lock",
+            "Gemfile.lock",
+            "mix.lock",
+            "flake.lock",
+        }
+    )
+    generated_suffixes: tuple[str, ...] = ("_pb2.py", "_pb2_grpc.py", "_pb2.pyi", ".pb.go", ".g.dart", ".designer.cs")
+    minified_suffixes: tuple[str, ...] = (".min.js", ".min.css", ".min.mjs", ".js.map", ".css.map")
+    vendored_dirs: frozenset[str] = frozenset(
+        {"vendor", "vendored", "third_party", "third-party", "thirdparty", "bower_components", "site-packages"}
+    )
+    generated_markers: tuple[bytes, ...] = (
+        b"@generated",
+        b"do not edit",
+        b"code generated by",
+        b"autogenerated",
+        b"auto-generated",
+        b"generated by the protocol buffer compiler",
+    )
+
+    vendored: PathFilter | None = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # directory decisions are memoized, so each vendored directory is recognized once
+        self.vendored = PathFilter(excluded_dirs=self.vendored_dirs)
+
+    def classify_path(self, path: str, size: int | None) -> SkipReason | None:
+        name: str = os.path.basename(path)
+        if name in self.lockfiles:
+            return SkipReason.LOCKFILE
+        if name.endswith(self.generated_suffixes):
+            return SkipReason.GENERATED
+        if name.endswith(self.minified_suffixes):
+            return SkipReason.MINIFIED
+        if self.vendored.excludes_dir(directory=os.path.dirname(path)):
+            return SkipReason.VENDORED
+        if size is not None and size > self.max_bytes:
+            return SkipReason.TOO_LARGE
+        return None
+
+    def classify_head(self, head: bytes, complete: bool) -> SkipReason | None:
+        """`complete` is whether `head` is the whole file, otherwise it may end within a character or line"""
+        if b"\x00" in head:
+            return SkipReason.BINARY
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=complete)
+        except UnicodeDecodeError:
+            return SkipReason.BINARY
+
+        top: bytes = head[:1024].lower()
+        if any(marker in top for marker in self.generated_markers):
+            return SkipReason.GENERATED
+
+        lines: list[bytes] = head.split(b"\n")
+        if max(len(line) for line in lines) > self.max_line_length:
+            return SkipReason.MINIFIED
+        # a partial head of a single long line says little about the mean, the longest line decides then
+        if len(lines) > 1 and len(head) / len(lines) > self.max_mean_line_length:
+            return SkipReason.MINIFIED
+        return None
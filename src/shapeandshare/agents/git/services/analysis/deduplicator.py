@@ -0,0 +1,93 @@
+import hashlib
+import re
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+TOKEN = re.compile(r"\w+")
+PRIME: int = 4294967291  # largest prime below 2**32, permuted hashes stay below it
+
+
+class ChunkDeduplicator(BaseModel):
+    """
+    Finds chunks which are identical or nearly identical to a chunk seen earlier in the same ingestion.
+
+    Chunks are compared by the Jaccard similarity of their word 3-shingles, estimated from a MinHash signature of
+    `permutations` values. Two chunks are near-duplicates when the estimate reaches `threshold`; candidates are
+    looked up by splitting signatures into bands of `rows` values, one of which has to match exactly. With 16 bands
+    of 4 rows a pair at the threshold of 0.6 becomes a candidate with 89% probability, a pair at 0.8 almost surely;
+    in a chunk of 100 words a handful of changed words (e.g. a licence header's version or copyright holder) keep
+    it above the threshold. Chunks with fewer than `min_tokens` words are only matched exactly, their shingles are
+    too few.
+
+    Methods
+    -------
+    check(self, chunk_id: str, text: str) -> str | None
+        The id of the chunk `text` duplicates, or `None` after registering it as a new chunk.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    threshold: float = 0.6
+    permutations: int = 64
+    rows: int = 4
+    min_tokens: int = 8
+    seed: int = 1
+
+    exact: dict[str, str] = Field(default_factory=dict)  # text digest -> chunk id
+    ids: list[str] = Field(default_factory=list)  # chunk ids of the signatures, in registration order
+    signatures: list[np.ndarray] = Field(default_factory=list)
+    bands: list[dict[bytes, list[int]]] = Field(default_factory=list)  # band -> {rows: [signature index]}
+    coefficients: np.ndarray | None = None  # (2, permutations) of the hash family (a * hash + b) % PRIME
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        rng: np.random.Generator = np.random.default_rng(self.seed)
+        self.coefficients = np.stack(
+            [
+                rng.integers(1, PRIME, size=self.permutations, dtype=np.uint64),
+                rng.integers(0, PRIME, size=self.permutations, dtype=np.uint64),
+            ]
+        )
+        self.bands = [{} for _ in range(self.permutations // self.rows)]
+
+    def check(self, chunk_id: str, text: str) -> str | None:
+        digest: str = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        original: str | None = self.exact.get(digest)
+        if original is not None:
+            return original
+        self.exact[digest] = chunk_id
+
+        tokens: list[str] = TOKEN.findall(text.lower())
+        if len(tokens) < self.min_tokens:
+            return None
+
+        signature: np.ndarray = self._minhash(tokens=tokens)
+        keys: list[bytes] = [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes() for band in range(len(self.bands))
+        ]
+        candidates: set[int] = set()
+        for band, key in zip(self.bands, keys):
+            candidates.update(band.get(key, ()))
+        # the earliest chunk which is similar enough is the original, so the choice does not depend on set order
+        for candidate in sorted(candidates):
+            if np.count_nonzero(self.signatures[candidate] == signature) >= self.threshold * self.permutations:
+                return self.ids[candidate]
+
+        index: int = len(self.signatures)
+        self.ids.append(chunk_id)
+        self.signatures.append(signature)
+        for band, key in zip(self.bands, keys):
+            band.setdefault(key, []).append(index)
+        return None
+
+    def _minhash(self, tokens: list[str]) -> np.ndarray:
+        shingles: set[str] = {" ".join(tokens[i : i + 3]) for i in range(max(1, len(tokens) - 2))}
+        hashes: np.ndarray = np.array(
+            [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest()) for shingle in shingles],
+            dtype=np.uint64,
+        )
+        # both factors are below 2**32, so the products can not overflow 64 bits
+        permuted: np.ndarray = (hashes[:, None] * self.coefficients[0] + self.coefficients[1]) % PRIME
+        return permuted.min(axis=0).astype(np.uint32)
@@ -0,0 +1,214 @@
+import logging
+import queue
+import threading
+from functools import partial
+from typing import Any, Callable, Iterator
+
+from pydantic import BaseModel, Field
+
+from ....core.framework.common.utils.pipeline import Pipeline, Stage
+from ....core.framework.contracts.dtos.extraction_report import ExtractionReport
+from ....core.framework.contracts.dtos.ingestion_checkpoint import IngestionCheckpoint
+from ....core.framework.contracts.dtos.repository_file import RepositoryFile
+from ....core.framework.contracts.dtos.service_response import ServiceResponse
+from ....core.services.vector.batcher import ChunkBatch, ChunkBatcher
+from ....core.services.vector.writer import VectorWriter
+from ...sdk.contracts.dtos.ingestion_stats import IngestionStats
+from ..metadata.service import MetadataService
+from .chunker import Chunker
+from .deduplicator import ChunkDeduplicator
+from .service import AnalysisService
+
+logger = logging.getLogger()
+
+
+class IngestionRun(BaseModel):
+    """
+    The stages of one ingestion of `files`, from classifying and reading them to writing their chunks' vectors.
+
+    Chunks are batched across files so each batch is embedded and written in a single call, near-duplicates of an
+    earlier chunk are not embedded (their paths are recorded in `duplicates` on the chunk they duplicate). Batches
+    are numbered as they are cut; once a batch and every batch before it are written, the checkpoint advances past
+    the files they complete. Progress of a first ingest is handed over to `progress` as (indexed fraction, pending
+    files), for another thread to report.
+
+    The deduplicator's state is not checkpointed: when a run resumes, `restore` reads and chunks the files written
+    before again (nothing is embedded) so their chunks are known and links to them recorded, as if the run had not
+    been interrupted.
+
+    Methods
+    -------
+    pipeline(self, read_workers: int, embed_workers: int, queue_batches: int) -> Pipeline
+        The pipeline running the stages, fed with (index, file) pairs of the files still to ingest.
+    restore(self, read_workers: int) -> None
+        Registers the chunks of the files committed by an earlier run with the deduplicator.
+    """
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    analysis_service: AnalysisService
+    chunker: Chunker
+    metadata_service: MetadataService
+    writer: VectorWriter
+    embed_batch: Callable[[ChunkBatch], list[list[float]]]
+    repository_id: str
+    files: list[RepositoryFile]
+    report: ExtractionReport
+    checkpoint: IngestionCheckpoint
+    stats: IngestionStats
+    batcher: ChunkBatcher
+    deduplicator: ChunkDeduplicator | None = None
+    ready_fraction: float = 1.0  # fraction of the files indexed before progress is handed over
+    progress: queue.Queue | None = None
+
+    duplicates: dict[str, set[str]] = Field(default_factory=dict)  # chunk id -> paths of its near-duplicates
+    dropped: int = 0  # near-duplicate chunks
+    batches: int = 0  # batches cut so far
+    written: dict[int, tuple[int, int]] = Field(default_factory=dict)  # batch number -> (files completed, chunks)
+    committed: int = 0  # batches up to this number are written
+    reported: float = 0.0  # indexed fraction last handed over
+    lock: Any = Field(default_factory=threading.Lock)  # guards the checkpoint, commits run concurrently
+
+    def pipeline(self, read_workers: int, embed_workers: int, queue_batches: int) -> Pipeline:
+        # reads run ahead of chunking, embedding and writing, each stage blocks once its bounded queue is full
+        read_queue: int = 2 * max(1, read_workers)
+        return Pipeline(
+            stages=[
+                Stage(
+                    name="classify",
+                    process=self.classify,
+                    workers=max(1, read_workers),
+                    queue_size=read_queue,
+                    ordered=True,
+                ),
+                Stage(
+                    name="read", process=self.read, workers=max(1, read_workers), queue_size=read_queue, ordered=True
+                ),
+                Stage(name="chunk", process=self.chunk, queue_size=read_queue, flush=self.flush),
+                Stage(name="embed", process=self.embed, workers=embed_workers, queue_size=queue_batches),
+                Stage(name="upsert", process=self.upsert, queue_size=queue_batches),
+            ]
+        )
+
+    def restore(self, read_workers: int) -> None:
+        if self.deduplicator is None or not self.checkpoint.files_committed:
+            return
+        msg: str = f"restoring the duplicate index from {self.checkpoint.files_committed} files written before"
+        logger.info(msg)
+        read_queue: int = 2 * max(1, read_workers)
+        Pipeline(
+            stages=[
+                Stage(
+                    name="classify",
+                    process=self.classify,
+                    workers=max(1, read_workers),
+                    queue_size=read_queue,
+                    ordered=True,
+                ),
+                Stage(
+                    name="read", process=self.read, workers=max(1, read_workers), queue_size=read_queue, ordered=True
+                ),
+                Stage(name="restore", process=self._register, queue_size=read_queue),
+            ]
+        ).run(source=list(enumerate(self.files))[: self.checkpoint.files_committed])
+
+    def classify(self, item: tuple[int, RepositoryFile]) -> Iterator[tuple[int, str, ServiceResponse]]:
+        index, file = item
+        yield index, file.path, self.analysis_service.classify_file(repository_id=self.repository_id, file=file)
+
+    def read(self, item: tuple[int, str, ServiceResponse]) -> Iterator[tuple[int, str, ServiceResponse]]:
+        index, file_path, response = item
+        if response.success and "head" in response.data:
+            response = self.analysis_service.read_file(repository_id=self.repository_id, file_path=file_path)
+        yield index, file_path, response
+
+    def chunk(self, item: tuple[int, str, ServiceResponse]) -> Iterator[tuple[int, int, ChunkBatch]]:
+        # a single worker, files arrive in listing order so chunk ids and duplicate originals are stable
+        index, file_path, response = item
+        content: str | None = self.analysis_service.record_read(
+            report=self.report, file_path=file_path, response=response
+        )
+        if content is None:
+            return
+
+        # every stored chunk carries its own <document><source> header and line range, only its text is embedded so
+        # code which moved (or is repeated elsewhere) reuses cached vectors
+        for i, file_chunk in enumerate(self.chunker.split(path=file_path, text=content)):
+            self.stats.chunks_produced += 1
+            chunk_id: str = f"{file_path}-{i}"
+            original: str | None = (
+                self.deduplicator.check(chunk_id=chunk_id, text=file_chunk.text) if self.deduplicator else None
+            )
+            if original:
+                self.dropped += 1
+                self.stats.duplicates += 1
+                # a refresh follows these links to re-write the files sharing the chunk
+                self.duplicates.setdefault(original, set()).add(file_path)
+                continue
+
+            batch: ChunkBatch | None = self.batcher.add(
+                chunk_id=chunk_id,
+                text=file_chunk.text,
+                document=file_chunk.document(),
+                metadata=file_chunk.metadata(),
+            )
+            if batch:
+                # the cut batch may hold earlier chunks of the current file, so only the files before it are complete
+                self.batches += 1
+                yield self.batches, index, batch
+
+    def flush(self) -> Iterator[tuple[int, int, ChunkBatch]]:
+        batch: ChunkBatch | None = self.batcher.flush()
+        if batch:
+            self.batches += 1
+            yield self.batches, len(self.files), batch
+
+    def embed(self, item: tuple[int, int, ChunkBatch]) -> Iterator[tuple[int, int, ChunkBatch, list[list[float]]]]:
+        number, files_done, batch = item
+        yield number, files_done, batch, self.embed_batch(batch)
+
+    def upsert(self, item: tuple[int, int, ChunkBatch, list[list[float]]]) -> Iterator[None]:
+        number, files_done, batch, embeddings = item
+        # upserts are idempotent, batches written after the last checkpoint are simply written again on resume
+        self.writer.submit(
+            batch=batch,
+            embeddings=embeddings,
+            on_written=partial(self.commit, number=number, files_done=files_done, chunks=len(batch)),
+        )
+        yield from ()
+
+    def _register(self, item: tuple[int, str, ServiceResponse]) -> Iterator[None]:
+        # the same decisions as `chunk`, the file's report and statistics were recorded by the earlier run
+        _, file_path, response = item
+        content: str | None = self.analysis_service.record_read(
+            report=ExtractionReport(), file_path=file_path, response=response
+        )
+        if content is None:
+            return
+        for i, file_chunk in enumerate(self.chunker.split(path=file_path, text=content)):
+            original: str | None = self.deduplicator.check(chunk_id=f"{file_path}-{i}", text=file_chunk.text)
+            if original:
+                self.duplicates.setdefault(original, set()).add(file_path)
+        yield from ()
+
+    def commit(self, number: int, files_done: int, chunks: int) -> None:
+        # called from the writer's threads once a batch is durable
+        with self.lock:
+            self.written[number] = (files_done, chunks)
+            self.stats.chunks_written += chunks
+            # batches are written concurrently, a later batch may finish before an earlier one
+            if self.committed + 1 in self.written:
+                while self.committed + 1 in self.written:
+                    self.committed += 1
+                    self.checkpoint.files_committed, committed_chunks = self.written.pop(self.committed)
+                    self.checkpoint.chunks_written += committed_chunks
+                self.metadata_service.checkpoint_save(checkpoint=self.checkpoint)
+
+            # the repository turns queryable once enough is indexed, progress is re-reported every 10%
+            fraction: float = self.checkpoint.files_committed / len(self.files)
+            if self.progress is None or not self.ready_fraction <= fraction < 1:
+                return
+            if not self.reported or fraction - self.reported >= 0.1:
+                self.reported = fraction
+                self.progress.put((fraction, self.files[self.checkpoint.files_committed :]))
@@ -0,0 +1,68 @@
+import os
+
+from pydantic import BaseModel
+
+from ....core.framework.contracts.dtos.repository_file import RepositoryFile
+
+
+class FilePrioritizer(BaseModel):
+    """
+    Orders repository files by how much they are expected to help answer questions about the repository.
+
+    READMEs come first, then entry points and project manifests, then documentation, then source files with
+    shallower (top-level) modules before deeper ones, and tests and examples last. Within a tier files are ordered
+    by depth and path, so the order is deterministic for a given listing.
+
+    Methods
+    -------
+    sort(self, files: list[RepositoryFile]) -> list[RepositoryFile]
+        The files in ingestion order.
+    """
+
+    entry_points: frozenset[str] = frozenset(
+        {
+            "__main__.py",
+            "main.py",
+            "app.py",
+            "cli.py",
+            "manage.py",
+            "wsgi.py",
+            "asgi.py",
+            "setup.py",
+            "pyproject.toml",
+            "setup.cfg",
+            "package.json",
+            "Cargo.toml",
+            "go.mod",
+            "pom.xml",
+            "build.gradle",
+            "Makefile",
+            "main.go",
+            "main.rs",
+            "lib.rs",
+            "index.js",
+            "index.ts",
+            "server.js",
+            "server.ts",
+        }
+    )
+    docs_dirs: frozenset[str] = frozenset({"docs", "doc", "documentation"})
+    docs_extensions: frozenset[str] = frozenset({".md", ".rst", ".txt", ".adoc"})
+    tests_dirs: frozenset[str] = frozenset({"test", "tests", "testing", "spec", "specs", "examples", "example"})
+
+    def sort(self, files: list[RepositoryFile]) -> list[RepositoryFile]:
+        return sorted(files, key=lambda file: (self._tier(path=file.path), file.path.count("/"), file.path))
+
+    def _tier(self, path: str) -> int:
+        directory, _, name = path.rpartition("/")
+        parts: list[str] = directory.split("/") if directory else []
+
+        if name.lower().startswith("readme"):
+            return 0
+        if any(part in self.tests_dirs for part in parts) or name.startswith("test_") or "_test." in name:
+            return 4
+        if name in self.entry_points:
+            return 1
+        if any(part in self.docs_dirs for part in parts) or os.path.splitext(name)[1].lower() in self.docs_extensions:
+            return 2
+        return 3
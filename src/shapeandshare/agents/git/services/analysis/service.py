@@ -1,10 +1,19 @@
 import logging
-from pathlib import Path
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from ....core.framework.common.utils.path_filter import PathFilter
+from ....core.framework.contracts.dtos.extraction_report import ExtractionReport
+from ....core.framework.contracts.dtos.repository_file import RepositoryFile
 from ....core.framework.contracts.dtos.service_response import ServiceResponse
+from ....core.framework.contracts.types.skip_reason import SkipReason
 from ..repository.service import RepositoryService
+from .classifier import ContentClassifier
+from .prioritizer import FilePrioritizer
 
 logger = logging.getLogger()
 
@@ -17,6 +26,9 @@ class AnalysisService(BaseModel):
     default_extensions: set[str]
     default_included_files: set[str]
     default_excluded_dirs: set[str]
+    read_workers: int = 8  # concurrent file reads, results are still yielded in listing order
+    classifier: ContentClassifier = Field(default_factory=ContentClassifier)
+    prioritizer: FilePrioritizer = Field(default_factory=FilePrioritizer)
 
     def extract_repository_content(
         self,
@@ -25,55 +37,227 @@ class AnalysisService(BaseModel):
         included_files: set[str] | None = None,
         excluded_dirs: set[str] | None = None,
     ) -> ServiceResponse:
+        """
+        Read the filtered repository content into a single dictionary.
+
+        This holds every file in memory at once; prefer `stream_repository_content` for ingestion.
+        Files which could not be read are returned under `errors` (path -> reason).
+        """
         logger.info("extracting repository content")
 
         try:
-            # Get all files from repository service
-            files_response: ServiceResponse = self.repository_service.files_list(repository_id=repository_id)
-            logger.info(f"found {len(files_response.data['files'])} files")
-            if not files_response.success:
-                return files_response
-
-            # Apply filters
-            filtered_files = self._filter_files(
-                files_response.data["files"],
-                allowed_extensions or self.default_extensions,
-                included_files or self.default_included_files,
-                excluded_dirs or self.default_excluded_dirs,
-            )
-            logger.info(f"filtered {len(filtered_files)} files")
-            # Read content of filtered files
-            content: dict = {}
-            for file_path in filtered_files:
-                logger.info(f"file {file_path}")
-                content_response = self.repository_service.file_content_read(
-                    repository_id=repository_id, file_path=file_path
+            report: ExtractionReport = ExtractionReport()
+            content: dict = dict(
+                self.stream_repository_content(
+                    repository_id=repository_id,
+                    allowed_extensions=allowed_extensions,
+                    included_files=included_files,
+                    excluded_dirs=excluded_dirs,
+                    report=report,
                 )
-                logger.info("content {}".format(content_response))
-                if content_response.success:
-                    content[file_path] = content_response.data["content"]
-
-            msg: str = f"extracted repository content {content}"
+            )
+            msg: str = f"extracted repository content ({len(content)} files, {len(report.errors)} errors)"
             logger.info(msg)
-            return ServiceResponse(success=True, data={"content": content})
+            return ServiceResponse(
+                success=True, data={"content": content, "errors": report.errors, "skipped": report.skipped}
+            )
         except Exception as error:
             logger.error(str(error))
             return ServiceResponse(success=False, error=str(error))
 
-    def _filter_files(
-        self, files: list[str], allowed_extensions: set[str], included_files: set[str], excluded_dirs: set[str]
-    ) -> list[str]:
-        """Filter files based on rules"""
-        filtered = []
-        for file_path in files:
-            path = Path(file_path)
+    def stream_repository_content(
+        self,
+        repository_id: str,
+        allowed_extensions: set[str] | None = None,
+        included_files: set[str] | None = None,
+        excluded_dirs: set[str] | None = None,
+        paths: list[str] | None = None,
+        report: ExtractionReport | None = None,
+    ) -> Iterator[tuple[str, str]]:
+        """
+        Lazily yield `(path, text)` for each filtered repository file.
 
-            # Check excluded directories
-            if any(excluded in str(path.parent) for excluded in excluded_dirs):
-                continue
+        Files are read by a pool of `read_workers` threads, at most twice as many reads as workers are in flight,
+        so only a bounded number of files are held in memory while callers consume them. Files are yielded in
+        listing order regardless of which read finishes first. When `paths` is given only those files (still
+        subject to the filters) are read, e.g. the files changed since the last ingest.
 
-            # Check if file should be included
-            if path.name in included_files or path.suffix.lower() in allowed_extensions:
-                filtered.append(file_path)
+        Files are classified before they are read completely: binary, generated, minified, vendored and oversized
+        files are skipped and counted per reason in `report.skipped`, long files are truncated. Files which can not
+        be read are not yielded, they are recorded in `report.errors` when a report is given.
 
-        return filtered
+        Raises
+        ------
+        Exception
+            If the repository files can not be listed.
+        """
+        logger.info("streaming repository content")
+
+        report = report if report is not None else ExtractionReport()
+        files: list[RepositoryFile] = self.list_repository_files(
+            repository_id=repository_id,
+            allowed_extensions=allowed_extensions,
+            included_files=included_files,
+            excluded_dirs=excluded_dirs,
+            paths=paths,
+            report=report,
+        )
+
+        # Read content of filtered files concurrently, yielding in order as the oldest read completes
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max(1, self.read_workers), thread_name_prefix="file-read"
+        )
+        pending: deque[tuple[str, Future]] = deque()
+        files_iter: Iterator[RepositoryFile] = iter(files)
+        try:
+            while True:
+                while len(pending) < 2 * max(1, self.read_workers):
+                    file: RepositoryFile | None = next(files_iter, None)
+                    if file is None:
+                        break
+                    pending.append(
+                        (file.path, executor.submit(self._read_file, repository_id=repository_id, file=file))
+                    )
+                if not pending:
+                    break
+
+                file_path, future = pending.popleft()
+                content: str | None = self.record_read(report=report, file_path=file_path, response=future.result())
+                if content is not None:
+                    yield file_path, content
+        finally:
+            # reads still queued are abandoned when the consumer stops early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def list_repository_files(
+        self,
+        repository_id: str,
+        allowed_extensions: set[str] | None = None,
+        included_files: set[str] | None = None,
+        excluded_dirs: set[str] | None = None,
+        paths: list[str] | None = None,
+        report: ExtractionReport | None = None,
+    ) -> list[RepositoryFile]:
+        """
+        The filtered repository files (restricted to `paths` when given), most valuable first.
+
+        READMEs, entry points and documentation are ordered before the bulk of the source, so an ingestion which
+        is still running can already answer general questions about the repository.
+
+        Raises
+        ------
+        Exception
+            If the repository files can not be listed.
+        """
+        # Get all files from repository service, excluded directories are pruned while listing
+        files_response: ServiceResponse = self.repository_service.files_list(
+            repository_id=repository_id, excluded_dirs=excluded_dirs or self.default_excluded_dirs
+        )
+        if not files_response.success:
+            raise Exception(files_response.error)
+        files: dict[str, RepositoryFile] = {file.path: file for file in files_response.data["files"]}
+        logger.info(f"found {len(files)} files")
+
+        # Apply filters (.gitignore files are discovered from the full listing even when only `paths` are read)
+        path_filter: PathFilter = self._build_filter(
+            repository_id=repository_id,
+            files=list(files.keys()),
+            allowed_extensions=allowed_extensions or self.default_extensions,
+            included_files=included_files or self.default_included_files,
+            excluded_dirs=excluded_dirs or self.default_excluded_dirs,
+        )
+        filtered_files: list[str] = path_filter.filter(paths if paths is not None else list(files.keys()))
+        logger.info(f"filtered {len(filtered_files)} files")
+        if report is not None:
+            report.files_listed += len(files)
+            report.files_filtered += len(filtered_files)
+
+        # requested paths missing from the listing are still attempted, their read error is reported
+        return self.prioritizer.sort(
+            files=[files.get(file_path) or RepositoryFile(path=file_path, size=0) for file_path in filtered_files]
+        )
+
+    def classify_file(self, repository_id: str, file: RepositoryFile) -> ServiceResponse:
+        """
+        Decide whether a file is read, reading no more than its head.
+
+        The response data holds `skipped` (the SkipReason) for skipped files, `content` and `truncated` for small
+        files which the head read completely, and `head` for files which still need `read_file`.
+        """
+        # name, location and size are known from the listing, no read is needed to skip on them
+        reason: SkipReason | None = self.classifier.classify_path(path=file.path, size=file.size)
+        if reason:
+            return ServiceResponse(success=True, data={"skipped": reason})
+
+        head_response: ServiceResponse = self.repository_service.file_head_read(
+            repository_id=repository_id, file_path=file.path, size=self.classifier.sniff_bytes
+        )
+        if not head_response.success:
+            return head_response
+        head: bytes = head_response.data["head"]
+        complete: bool = len(head) < self.classifier.sniff_bytes
+
+        reason = self.classifier.classify_head(head=head, complete=complete)
+        if reason:
+            return ServiceResponse(success=True, data={"skipped": reason})
+
+        if complete and len(head) <= self.classifier.max_chars:
+            # small files are fully read by the sniff, universal newlines as a text mode read would give
+            content: str = head.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            return ServiceResponse(success=True, data={"content": content, "truncated": False})
+        return ServiceResponse(success=True, data={"head": head})
+
+    def read_file(self, repository_id: str, file_path: str) -> ServiceResponse:
+        """Read a classified file completely, up to the classifier's `max_chars`"""
+        return self.repository_service.file_content_read(
+            repository_id=repository_id, file_path=file_path, max_chars=self.classifier.max_chars
+        )
+
+    def record_read(self, report: ExtractionReport, file_path: str, response: ServiceResponse) -> str | None:
+        """Count a classified or read file in the report, returns its content when it was read"""
+        if response.success and "skipped" in response.data:
+            reason: SkipReason = response.data["skipped"]
+            report.skipped[reason.value] = report.skipped.get(reason.value, 0) + 1
+            return None
+        if not response.success:
+            report.errors[file_path] = response.error
+            logger.warning(f"unable to read {file_path}: {response.error}")
+            return None
+        content: str = response.data["content"]
+        report.files_read += 1
+        report.bytes_read += len(content.encode("utf-8"))
+        report.truncated += 1 if response.data["truncated"] else 0
+        return content
+
+    def _read_file(self, repository_id: str, file: RepositoryFile) -> ServiceResponse:
+        # the head is sniffed first, so skipped files are never read beyond it
+        response: ServiceResponse = self.classify_file(repository_id=repository_id, file=file)
+        if response.success and "head" in response.data:
+            return self.read_file(repository_id=repository_id, file_path=file.path)
+        return response
+
+    def _build_filter(
+        self,
+        repository_id: str,
+        files: list[str],
+        allowed_extensions: set[str],
+        included_files: set[str],
+        excluded_dirs: set[str],
+    ) -> PathFilter:
+        """Build the path filter for a repository, honouring its .gitignore files"""
+        path_filter: PathFilter = PathFilter(
+            extensions=allowed_extensions, included_files=included_files, excluded_dirs=excluded_dirs
+        )
+
+        # deeper .gitignore files take precedence, so they are added last
+        gitignores: list[str] = sorted(
+            (file_path for file_path in files if os.path.basename(file_path) == ".gitignore"),
+            key=lambda file_path: file_path.count("/"),
+        )
+        for file_path in gitignores:
+            response: ServiceResponse = self.repository_service.file_content_read(
+                repository_id=repository_id, file_path=file_path
+            )
+            if response.success:
+                path_filter.add_gitignore(lines=response.data["content"].splitlines(), base=os.path.dirname(file_path))
+        return path_filter
@@ -1,9 +1,11 @@
 import secrets
 import string
+from datetime import datetime
 
 from pydantic import BaseModel
 
 from ....core.framework.common.utils.hash import hash_it
+from ....core.framework.contracts.dtos.ingestion_checkpoint import IngestionCheckpoint
 from ....core.framework.contracts.errors.dao.doesnotexist import DaoDoesNotExistError
 from ....core.framework.contracts.types.dao_document import DaoDocumentType
 from ....core.infrastructure.persistence.mongodb.dao_legacy import MongoDaoLegacy
@@ -39,10 +41,11 @@ class MetadataService(BaseModel):
         storage_id: str = hash_it(payload=f"{request.id}:{request.url}")
 
         ## store and return chroma id
-        alphabet = string.ascii_lowercase
-        new_id: str = "".join(secrets.choice(alphabet) for _ in range(32))
         metadata: GitMetadata = GitMetadata(
-            id=storage_id, col_id=new_id, conversation_id=request.conversation_id, status=ProcessingStatus.SUBMITTED
+            id=storage_id,
+            col_id=self.new_collection_id(),
+            conversation_id=request.conversation_id,
+            status=ProcessingStatus.SUBMITTED,
         )
         result = self.dao.insert(document_type=DaoDocumentType.METADATA, document=metadata.model_dump())
         print(result)
@@ -68,11 +71,44 @@ class MetadataService(BaseModel):
         if metadata is None:
             raise DaoDoesNotExistError(f"Document with id {storage_id} does not exist")
 
+        # the collection moves when a refresh re-ingests the repository into a new one
         new_document: dict = {
             **metadata.model_dump(),
             **metadata_partial,
-            **{"id": metadata.id, "col_id": metadata.col_id, "conversation_id": metadata.conversation_id},
+            **{"id": metadata.id, "conversation_id": metadata.conversation_id},
         }
         metadata: GitMetadata = GitMetadata.model_validate(new_document)
-        self.dao.update(document_type=DaoDocumentType.METADATA, document=new_document)
+        # only the updated fields are written, workers update status and statistics concurrently
+        partial: dict = {key: value for key, value in new_document.items() if key in metadata_partial}
+        self.dao.update(document_type=DaoDocumentType.METADATA, document={"id": metadata.id, **partial})
         return metadata
+
+    def update_by_id_if(self, storage_id: str, condition: dict, metadata_partial: dict) -> GitMetadata | None:
+        """Writes the fields only if the stored document matches `condition` (a query), None when it does not"""
+        result = self.dao.update_if(
+            document_type=DaoDocumentType.METADATA,
+            document_id=storage_id,
+            condition=condition,
+            partial=metadata_partial,
+        )
+        if result.matched_count == 0:
+            return None
+        return self.get_by_id(storage_id=storage_id)
+
+    @staticmethod
+    def new_collection_id() -> str:
+        alphabet = string.ascii_lowercase
+        return "".join(secrets.choice(alphabet) for _ in range(32))
+
+    def checkpoint_get(self, collection_id: str) -> IngestionCheckpoint | None:
+        document = self.dao.get(document_type=DaoDocumentType.CHECKPOINT, document_id=collection_id)
+        if document is None:
+            return None
+        return IngestionCheckpoint.model_validate(document)
+
+    def checkpoint_save(self, checkpoint: IngestionCheckpoint) -> None:
+        checkpoint.updated = datetime.now()
+        self.dao.update(document_type=DaoDocumentType.CHECKPOINT, document=checkpoint.model_dump(), upsert=True)
+
+    def checkpoint_delete(self, collection_id: str) -> None:
+        self.dao.delete(document_type=DaoDocumentType.CHECKPOINT, document_id=collection_id)
@@ -5,8 +5,12 @@ from pathlib import Path
 
 from pydantic import BaseModel
 
+from ....core.framework.common.utils.path_filter import PathFilter
+from ....core.framework.contracts.dtos.git_clone_options import GitCloneOptions
+from ....core.framework.contracts.dtos.repository_file import RepositoryFile
 from ....core.framework.contracts.dtos.service_response import ServiceResponse
 from ....core.infrastructure.persistence.git.dao import GitDao
+from ....core.infrastructure.persistence.git.mirror import GitMirrorCache
 
 logger = logging.getLogger()
 
@@ -18,24 +22,49 @@ class RepositoryService(BaseModel):
     """Handles repository operations"""
 
     git: GitDao
+    clone_options: GitCloneOptions | None = None
+    mirror_cache: GitMirrorCache | None = None
 
-    def clone(self, url: str, repository_id: str, retry: int = 10) -> ServiceResponse:
-        """Clone a repository"""
+    def clone(self, url: str, repository_id: str, base_commit: str | None = None, retry: int = 10) -> ServiceResponse:
+        """Clone a repository, making the previously indexed commit (if any) available for diffing"""
         count: int = 0
         try:
             if count >= retry:
                 return ServiceResponse(success=False, error="Exceeded maximum retries while cloning")
             # Create temporary directory for repository
             logger.info("cloning repository")
-            repo_metadata_dir: Path = Path(os.environ["DATA_BASE_DIR"]) / "repos" / repository_id
+            repo_metadata_dir: Path = self._repository_dir(repository_id=repository_id)
             if repo_metadata_dir.exists():
                 shutil.rmtree(repo_metadata_dir)
             repo_metadata_dir.mkdir(parents=True, exist_ok=True)
 
             # Clone repository
-            self.git.clone_repository(url, (repo_metadata_dir / "repo"))
+            repo_path: Path = self._worktree_dir(repository_id=repository_id)
+            if self.mirror_cache:
+                with self.mirror_cache.checkout(url=url) as mirror_path:
+                    self.git.clone_repository(url, repo_path, options=self.clone_options, mirror_path=str(mirror_path))
+            else:
+                self.git.clone_repository(url, repo_path, options=self.clone_options)
 
-            return ServiceResponse(success=True, data={"repository_id": repository_id})
+            data: dict = {"repository_id": repository_id, "commit": self.git.head_commit(local_path=str(repo_path))}
+            if base_commit:
+                # when the base commit is gone (e.g. force push) callers fall back to a full ingest
+                if self.git.fetch_commit(local_path=str(repo_path), commit=base_commit):
+                    data["base_commit"] = base_commit
+                else:
+                    msg: str = f"base commit {base_commit} is not available, a full ingest is required"
+                    logger.warning(msg)
+            return ServiceResponse(success=True, data=data)
+        except Exception as error:
+            return ServiceResponse(success=False, error=str(error))
+
+    def changes(self, repository_id: str, base_commit: str, commit: str) -> ServiceResponse:
+        """List the files added, modified and deleted between two commits"""
+        try:
+            changes: dict[str, list[str]] = self.git.diff(
+                local_path=str(self._worktree_dir(repository_id=repository_id)), base_commit=base_commit, commit=commit
+            )
+            return ServiceResponse(success=True, data=changes)
         except Exception as error:
             return ServiceResponse(success=False, error=str(error))
 
@@ -44,7 +73,7 @@ class RepositoryService(BaseModel):
         try:
             # Create temporary directory for repository
             logger.info("deleting repository")
-            repo_metadata_dir: Path = Path(os.environ["DATA_BASE_DIR"]) / "repos" / repository_id
+            repo_metadata_dir: Path = self._repository_dir(repository_id=repository_id)
 
             msg: str = f"cleaning up {repo_metadata_dir}"
             logger.info(msg)
@@ -54,25 +83,67 @@ class RepositoryService(BaseModel):
         except Exception as e:
             return ServiceResponse(success=False, error=str(e))
 
-    def files_list(self, repository_id: str) -> ServiceResponse:
-        """List all files in repository"""
-        repo_path: Path = Path(os.environ["DATA_BASE_DIR"]) / "repos" / repository_id
+    def files_list(self, repository_id: str, excluded_dirs: set[str] | None = None) -> ServiceResponse:
+        """List the files in repository (as `RepositoryFile`), skipping excluded directory names at any depth"""
+        repo_path: Path = self._worktree_dir(repository_id=repository_id)
+        excluded_dirs = excluded_dirs or set()
         try:
-            files = []
-            for item in Path(repo_path).glob("**/*"):
-                if item.is_file():
-                    files.append(str(item.relative_to(repo_path)))
+            if (repo_path / ".git").exists():
+                # the git index already lists the tracked files, so nothing under .git or untracked is visited
+                path_filter: PathFilter = PathFilter(excluded_dirs=excluded_dirs)
+                files: list[RepositoryFile] = [
+                    file
+                    for file in self.git.tracked_files(local_path=str(repo_path))
+                    if path_filter.matches(path=file.path)
+                ]
+            else:
+                files: list[RepositoryFile] = self._walk_files(repo_path=repo_path, excluded_dirs=excluded_dirs)
             return ServiceResponse(success=True, data={"files": files})
         except Exception as e:
             return ServiceResponse(success=False, error=str(e))
 
-    def file_content_read(self, repository_id: str, file_path: str) -> ServiceResponse:
-        """Read content of a specific file"""
-        repo_path: Path = Path(os.environ["DATA_BASE_DIR"]) / "repos" / repository_id
+    def file_content_read(self, repository_id: str, file_path: str, max_chars: int | None = None) -> ServiceResponse:
+        """Read content of a specific file, at most `max_chars` characters when given"""
+        repo_path: Path = self._worktree_dir(repository_id=repository_id)
         full_path: Path = repo_path / file_path
         try:
             with open(file=full_path, mode="r", encoding="utf-8") as file:
-                content = file.read()
-            return ServiceResponse(success=True, data={"content": content})
+                content = file.read(-1 if max_chars is None else max_chars)
+                truncated: bool = max_chars is not None and file.read(1) != ""
+            return ServiceResponse(success=True, data={"content": content, "truncated": truncated})
+        except Exception as e:
+            return ServiceResponse(success=False, error=str(e))
+
+    def file_head_read(self, repository_id: str, file_path: str, size: int) -> ServiceResponse:
+        """Read the first `size` bytes of a specific file"""
+        full_path: Path = self._worktree_dir(repository_id=repository_id) / file_path
+        try:
+            with open(file=full_path, mode="rb") as file:
+                head: bytes = file.read(size)
+            return ServiceResponse(success=True, data={"head": head})
         except Exception as e:
             return ServiceResponse(success=False, error=str(e))
+
+    @staticmethod
+    def _walk_files(repo_path: Path, excluded_dirs: set[str]) -> list[RepositoryFile]:
+        files: list[RepositoryFile] = []
+        for dirpath, dirnames, filenames in os.walk(repo_path):
+            # prune in place so excluded directories are never descended into, sorted so the listing is stable
+            dirnames[:] = sorted(name for name in dirnames if name not in excluded_dirs and name != ".git")
+            for filename in sorted(filenames):
+                full_path: str = os.path.join(dirpath, filename)
+                if os.path.islink(full_path):
+                    continue
+                files.append(
+                    RepositoryFile(path=os.path.relpath(full_path, repo_path), size=os.path.getsize(full_path))
+                )
+        return files
+
+    @staticmethod
+    def _repository_dir(repository_id: str) -> Path:
+        return Path(os.environ["DATA_BASE_DIR"]) / "repos" / repository_id
+
+    @staticmethod
+    def _worktree_dir(repository_id: str) -> Path:
+        # paths handed out by this service are relative to the git working tree, matching `git diff` output
+        return RepositoryService._repository_dir(repository_id=repository_id) / "repo"
@@ -1,23 +1,41 @@
 import asyncio
 import logging
+import os
+import queue
+import resource
+import threading
+from collections import Counter
 from datetime import datetime
+from typing import Literal
 from uuid import uuid4
 
+from chromadb.api.models.Collection import Collection
 from dotenv import load_dotenv
-from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pydantic import BaseModel
 
+from ...core.framework.common.utils.pipeline import Pipeline
+from ...core.framework.contracts.dtos.extraction_report import ExtractionReport
+from ...core.framework.contracts.dtos.ingestion_checkpoint import IngestionCheckpoint
+from ...core.framework.contracts.dtos.repository_file import RepositoryFile
 from ...core.framework.contracts.dtos.service_response import ServiceResponse
 from ...core.framework.contracts.events.repository import RepositoryEvent
 from ...core.framework.contracts.messaging.commands.repository_analyze import RepositoryAnalyzeCommand
 from ...core.infrastructure.messaging.rabbitmq.consumer import MessageConsumer
 from ...core.infrastructure.messaging.rabbitmq.publisher import MessagePublisher
+from ...core.services.vector.batcher import ChunkBatch, ChunkBatcher
+from ...core.services.vector.cache import EmbeddingCache
+from ...core.services.vector.pool import ProcessPoolEmbedder
 from ...core.services.vector.service import VectorService
+from ...core.services.vector.writer import VectorWriter
 from ..context import build_runtime_context, context
 from ..sdk.client.git import GitAgentClient
+from ..sdk.contracts.dtos.ingestion_stats import IngestionStats
 from ..sdk.contracts.types.processing_status import ProcessingStatus
+from ..services.analysis.chunker import Chunker
+from ..services.analysis.deduplicator import ChunkDeduplicator
+from ..services.analysis.ingestion import IngestionRun
 from ..services.analysis.service import AnalysisService
+from ..services.metadata.service import MetadataService
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger()
@@ -29,7 +47,20 @@ class AnalysisWorker(BaseModel):
 
     analysis_service: AnalysisService
     vector_service: VectorService
-    text_splitter: RecursiveCharacterTextSplitter
+    chunker: Chunker
+    deduplication: Literal["collapse", "drop", "off"] = "collapse"  # what happens to near-duplicate chunks
+    batch_max_chunks: int = 256
+    batch_max_bytes: int = 4 * 1024 * 1024
+    embed_workers: int = 1  # batches embedded concurrently
+    upsert_workers: int = 2  # batches written to chroma concurrently
+    upsert_retries: int = 5  # attempts after a failed write
+    upsert_backoff: float = 0.5  # seconds before the first retry, doubled per attempt
+    queue_batches: int = 2  # batches waiting in front of the embed and upsert stages
+    stats_interval: float = 30.0  # seconds between pipeline stats logs
+    ready_fraction: float = 0.5  # fraction of the files indexed before the repository is queryable (1 disables)
+    embedding_cache: EmbeddingCache | None = None
+
+    metadata_service: MetadataService
 
     publisher: MessagePublisher
     consumer: MessageConsumer | None = None
@@ -45,6 +76,8 @@ class AnalysisWorker(BaseModel):
             exchange_name="git_agent",
             routing_key="repository.cloned",
             queue_name="analysis_queue",
+            # ingestion runs for minutes, off the connection's thread so heartbeats keep being answered
+            handler_workers=1,
         )
 
     def handle_repository_clone(self, message: dict):
@@ -57,16 +90,61 @@ class AnalysisWorker(BaseModel):
             repository_id=event.repository_id,
             collection_id=event.collection_id,
             analysis_config={},
+            commit=event.commit,
+            base_commit=event.base_commit,
+            refresh=event.refresh or event.base_commit is not None,
         )
 
+        # statistics are published while the job runs and once it is done
+        stats: IngestionStats = IngestionStats(started=datetime.now(), clone_seconds=event.clone_seconds)
+        report: ExtractionReport = ExtractionReport()
+        checkpoint: IngestionCheckpoint | None = None
+
         try:
-            response: ServiceResponse = self.analysis_service.extract_repository_content(
-                repository_id=event.repository_id
+            self._publish_stats(repository_id=clone_command.repository_id, stats=stats, report=report)
+
+            # a redelivered job (e.g. after the worker died) resumes from its last checkpoint
+            checkpoint = self._checkpoint(command=clone_command)
+
+            # the collection replacing the live one, when a refresh had to re-ingest every file
+            rebuilt: str | None = None
+            if clone_command.base_commit:
+                # Refresh, only files changed since the indexed commit are re-processed
+                logger.info("refreshing content in vector database")
+                rebuilt = self._refresh_context(
+                    repository_id=clone_command.repository_id,
+                    col_id=clone_command.collection_id,
+                    base_commit=clone_command.base_commit,
+                    commit=clone_command.commit,
+                    report=report,
+                    checkpoint=checkpoint,
+                    stats=stats,
+                )
+            elif clone_command.refresh:
+                # the indexed commit could not be fetched, the repository is re-ingested next to its live collection
+                logger.info("rebuilding content in vector database")
+                rebuilt = self._rebuild_context(
+                    repository_id=clone_command.repository_id, report=report, checkpoint=checkpoint, stats=stats
+                )
+            else:
+                # Create context
+                logger.info("putting content into vector database")
+                self._create_context(
+                    repository_id=clone_command.repository_id,
+                    col_id=clone_command.collection_id,
+                    report=report,
+                    checkpoint=checkpoint,
+                    stats=stats,
+                )
+            self.metadata_service.checkpoint_delete(collection_id=clone_command.collection_id)
+            stats.finished = True
+            self._publish_stats(repository_id=clone_command.repository_id, stats=stats, report=report)
+
+            msg: str = (
+                f"read {report.files_read} files ({report.bytes_read} bytes, {report.truncated} truncated), "
+                f"{len(report.errors)} unreadable, skipped {report.skipped}"
             )
-            content: dict = response.data["content"]
-            # Create context
-            logger.info("putting content into vector database")
-            self._create_context(col_id=clone_command.collection_id, contents=content)
+            logger.info(msg)
 
             # Publish success event
             event = RepositoryEvent(
@@ -83,21 +161,36 @@ class AnalysisWorker(BaseModel):
                 routing_key="repository.analyzed", message=event, correlation_id=clone_command.correlation_id
             )
 
-            # update state
+            # update state, queries move over to a rebuilt collection before the old one is dropped
             async def update_status():
                 await self.git_agent_client.status_update(
-                    repository_id=clone_command.repository_id, status=ProcessingStatus.COMPLETED
+                    repository_id=clone_command.repository_id,
+                    status=ProcessingStatus.COMPLETED,
+                    commit=clone_command.commit,
+                    col_id=rebuilt,
                 )
 
             asyncio.run(update_status())
-
-            # alternate implenetation
-            # loop = asyncio.get_event_loop()
-            # future = asyncio.run_coroutine_threadsafe(update_status(), loop)
-            # future.result()
+            if rebuilt:
+                self._drop_collection(collection_id=clone_command.collection_id)
 
         except Exception as error:
             logger.error(f"Error handling repository clone event: {str(error)}")
+            stats.finished = True
+            self._publish_stats(repository_id=clone_command.repository_id, stats=stats, report=report)
+
+            # a failed repository can be refreshed (or ingested) again; a refresh which failed before dropping any
+            # vectors (rebuilds write a collection of their own) leaves the indexed commit queryable
+            untouched: bool = clone_command.refresh and (checkpoint is None or checkpoint.paths is None)
+            try:
+                asyncio.run(
+                    self.git_agent_client.status_update(
+                        repository_id=clone_command.repository_id,
+                        status=None if untouched else ProcessingStatus.FAILED,
+                    )
+                )
+            except Exception as status_error:
+                logger.error(f"unable to report the failure of {clone_command.repository_id}: {status_error}")
 
             # Publish failure event
             event = RepositoryEvent(
@@ -120,32 +213,442 @@ class AnalysisWorker(BaseModel):
 
     def stop(self):
         self.consumer.stop_consuming()
+        if isinstance(self.vector_service.embedder, ProcessPoolEmbedder):
+            self.vector_service.embedder.close()
+
+    def _checkpoint(self, command: RepositoryAnalyzeCommand) -> IngestionCheckpoint:
+        job: IngestionCheckpoint = IngestionCheckpoint(
+            id=command.collection_id,
+            repository_id=command.repository_id,
+            commit=command.commit,
+            base_commit=command.base_commit,
+            model_name=self.vector_service.model_name,
+        )
+        stored: IngestionCheckpoint | None = self.metadata_service.checkpoint_get(collection_id=command.collection_id)
+        if stored is None:
+            return job
+
+        # progress of another commit or model can not be built upon
+        keys: set[str] = {"repository_id", "commit", "base_commit", "model_name"}
+        if stored.model_dump(include=keys) != job.model_dump(include=keys):
+            msg: str = f"discarding the checkpoint of collection {command.collection_id}, it belongs to another job"
+            logger.info(msg)
+            if stored.rebuild_id:
+                self._drop_collection(collection_id=stored.rebuild_id)
+            return job
+        return stored
+
+    def _create_context(
+        self,
+        repository_id: str,
+        col_id: str,
+        report: ExtractionReport,
+        checkpoint: IngestionCheckpoint,
+        stats: IngestionStats,
+        report_progress: bool = True,
+    ) -> None:
+        # a checkpoint which was saved before belongs to an interrupted run of this job
+        if checkpoint.updated is not None and checkpoint.paths is None:
+            collection: Collection = self.vector_service.get_collection(collection_id=col_id)
+        else:
+            # a full ingest into an existing collection (e.g. a first ingest which failed before) starts over
+            collection: Collection = self.vector_service.create_collection(collection_id=col_id)
+            checkpoint.paths, checkpoint.stale, checkpoint.files_committed, checkpoint.chunks_written = None, [], 0, 0
+            self.metadata_service.checkpoint_save(checkpoint=checkpoint)
+
+        files: list[RepositoryFile] = self.analysis_service.list_repository_files(
+            repository_id=repository_id, report=report
+        )
+        self._write_contents(
+            collection=collection,
+            repository_id=repository_id,
+            files=files,
+            report=report,
+            checkpoint=checkpoint,
+            stats=stats,
+            report_progress=report_progress,
+        )
 
-    def _create_context(self, col_id: str, contents: dict) -> None:
-        # determine if we need to reload the data
-
-        # Create collection. get_collection, get_or_create_collection, delete_collection also available!
-        collection = self.vector_service.client.create_collection(name=col_id)
-
-        for key, value in contents.items():
-            doc: str = (
-                "<document>\n"
-                "<source>"
-                f"{key}"
-                "</source>\n"
-                "<document_content>\n"
-                f"{value}"
-                "</document_content>\n"
-                "</document>"
+    def _refresh_context(
+        self,
+        repository_id: str,
+        col_id: str,
+        base_commit: str,
+        commit: str,
+        report: ExtractionReport,
+        checkpoint: IngestionCheckpoint,
+        stats: IngestionStats,
+    ) -> str | None:
+        """Updates the collection in place, or returns the id of the new collection replacing it"""
+        if base_commit == commit:
+            logger.info("repository unchanged since the last ingest")
+            return None
+
+        if checkpoint.updated is not None:
+            # an interrupted refresh, the changed files were determined before any vectors were dropped
+            if checkpoint.paths is None:
+                return self._rebuild_context(
+                    repository_id=repository_id, report=report, checkpoint=checkpoint, stats=stats
+                )
+            self._write_changes(
+                collection=self.vector_service.get_collection(collection_id=col_id),
+                repository_id=repository_id,
+                report=report,
+                checkpoint=checkpoint,
+                stats=stats,
             )
-            new_doc: Document = Document(page_content=doc)
-            all_splits: list[Document] = self.text_splitter.split_documents([new_doc])
-            all_docs: list[str] = [str(doc) for doc in all_splits]
+            return None
 
-            # /Users/joshburt/.cache/chroma/onnx_models/all-MiniLM-L6-v2/onnx.tar.gz
-            # https://huggingface.co/sentence-transformers/all-MiniLM-L6-v2
-            # https://cookbook.chromadb.dev/faq/#valueerror-you-must-provide-an-embedding-function-to-compute-embeddings
-            collection.add(documents=all_docs, ids=[f"{key}-{i}" for i in range(len(all_splits))])
+        response: ServiceResponse = self.analysis_service.repository_service.changes(
+            repository_id=repository_id, base_commit=base_commit, commit=commit
+        )
+        if not response.success:
+            raise Exception(response.error)
+        changes: dict[str, list[str]] = response.data
+        msg: str = (
+            f"{len(changes['added'])} added, {len(changes['modified'])} modified, "
+            f"{len(changes['deleted'])} deleted files since {base_commit}"
+        )
+        logger.info(msg)
+
+        collection: Collection = self.vector_service.get_collection(collection_id=col_id)
+        if not self.vector_service.is_current(collection=collection):
+            # vectors of another model can not be mixed with new ones, the whole repository is re-embedded
+            msg: str = f"collection {col_id} was embedded with another model, re-ingesting all files"
+            logger.info(msg)
+            return self._rebuild_context(repository_id=repository_id, report=report, checkpoint=checkpoint, stats=stats)
+
+        # files whose duplicate chunks were collapsed into chunks of a stale file are re-written with it
+        stale: list[str] = changes["deleted"] + changes["modified"]
+        linked: list[str] = self._duplicate_sources(collection=collection, sources=stale)
+        if linked:
+            msg: str = f"re-writing {len(linked)} files which share collapsed chunks with changed files"
+            logger.info(msg)
+        stale.extend(linked)
+
+        # links are lost once stale vectors are dropped, so the files to write are recorded first
+        checkpoint.paths = changes["added"] + changes["modified"] + linked
+        checkpoint.stale = stale
+        self.metadata_service.checkpoint_save(checkpoint=checkpoint)
+        self._write_changes(
+            collection=collection, repository_id=repository_id, report=report, checkpoint=checkpoint, stats=stats
+        )
+        return None
+
+    def _rebuild_context(
+        self, repository_id: str, report: ExtractionReport, checkpoint: IngestionCheckpoint, stats: IngestionStats
+    ) -> str:
+        """Ingests every file into a new collection, the live one stays queryable until it is replaced"""
+        if checkpoint.rebuild_id is None:
+            # a fresh run, `_create_context` creates the collection and records it in the checkpoint before writing,
+            # so a resumed job goes on with the same collection
+            checkpoint.rebuild_id = MetadataService.new_collection_id()
+            checkpoint.updated = None
+        self._create_context(
+            repository_id=repository_id,
+            col_id=checkpoint.rebuild_id,
+            report=report,
+            checkpoint=checkpoint,
+            stats=stats,
+            report_progress=False,
+        )
+        return checkpoint.rebuild_id
+
+    def _drop_collection(self, collection_id: str) -> None:
+        try:
+            self.vector_service.client.delete_collection(name=collection_id)
+        except Exception as error:
+            # nothing refers to the collection anymore, it is only left behind
+            logger.warning(f"unable to delete collection {collection_id}: {error}")
+
+    def _write_changes(
+        self,
+        collection: Collection,
+        repository_id: str,
+        report: ExtractionReport,
+        checkpoint: IngestionCheckpoint,
+        stats: IngestionStats,
+    ) -> None:
+        files: list[RepositoryFile] = self.analysis_service.list_repository_files(
+            repository_id=repository_id, paths=checkpoint.paths, report=report
+        )
+
+        # drop the vectors of files which are gone or are about to be re-written, except files already re-written
+        committed: set[str] = {file.path for file in files[: checkpoint.files_committed]}
+        stale: list[str] = [path for path in checkpoint.stale if path not in committed]
+        for i in range(0, len(stale), self.batch_max_chunks):
+            collection.delete(where={"source": {"$in": stale[i : i + self.batch_max_chunks]}})
+
+        self._write_contents(
+            collection=collection,
+            repository_id=repository_id,
+            files=files,
+            report=report,
+            checkpoint=checkpoint,
+            stats=stats,
+            report_progress=False,
+        )
+
+    def _write_contents(
+        self,
+        collection: Collection,
+        repository_id: str,
+        files: list[RepositoryFile],
+        report: ExtractionReport,
+        checkpoint: IngestionCheckpoint,
+        stats: IngestionStats,
+        report_progress: bool = True,
+    ) -> None:
+        hits, misses = (self.embedding_cache.hits, self.embedding_cache.misses) if self.embedding_cache else (0, 0)
+        if checkpoint.files_committed:
+            msg: str = (
+                f"resuming after {checkpoint.files_committed} of {len(files)} files "
+                f"({checkpoint.chunks_written} chunks already written)"
+            )
+            logger.info(msg)
+
+        run: IngestionRun = IngestionRun(
+            analysis_service=self.analysis_service,
+            chunker=self.chunker,
+            metadata_service=self.metadata_service,
+            # several upserts are in flight, so chroma writes while the next batches are embedded
+            writer=VectorWriter(
+                collection=collection,
+                in_flight=self.upsert_workers,
+                retries=self.upsert_retries,
+                backoff=self.upsert_backoff,
+            ),
+            embed_batch=self._embed_batch,
+            repository_id=repository_id,
+            files=files,
+            report=report,
+            checkpoint=checkpoint,
+            stats=stats,
+            batcher=ChunkBatcher(max_chunks=self.batch_max_chunks, max_bytes=self.batch_max_bytes),
+            deduplicator=ChunkDeduplicator() if self.deduplication != "off" else None,
+            # a refresh keeps the repository's status, only a first ingest turns it queryable early (PARTIAL)
+            ready_fraction=self.ready_fraction,
+            progress=queue.Queue() if report_progress and self.ready_fraction < 1 else None,
+        )
+        run.restore(read_workers=self.analysis_service.read_workers)
+        pipeline: Pipeline = run.pipeline(
+            read_workers=self.analysis_service.read_workers,
+            embed_workers=self.embed_workers,
+            queue_batches=self.queue_batches,
+        )
+
+        msg: str = f"ingesting {len(files)} files"
+        logger.info(msg)
+        self._run_pipeline(run=run, pipeline=pipeline)
+
+        if run.duplicates:
+            self._collapse(collection=collection, duplicates=run.duplicates)
+        if run.deduplicator:
+            msg: str = f"suppressed {run.dropped} near-duplicate chunks ({self.deduplication})"
+            logger.info(msg)
+
+        if self.embedding_cache:
+            msg: str = (
+                f"embedding cache hits: {self.embedding_cache.hits - hits}, "
+                f"misses: {self.embedding_cache.misses - misses}"
+            )
+            logger.info(msg)
+
+    def _run_pipeline(self, run: IngestionRun, pipeline: Pipeline) -> None:
+        """Runs the pipeline until every batch is written, with the stats monitor and progress reporter alongside"""
+        # the stage seconds of earlier runs of the job (e.g. a refresh falling back to a full ingest) are kept
+        seconds: tuple[float, float] = (run.stats.embedding_seconds, run.stats.upsert_seconds)
+        stopped: threading.Event = threading.Event()
+        monitor: threading.Thread = threading.Thread(
+            target=self._monitor,
+            kwargs={
+                "repository_id": run.repository_id,
+                "pipeline": pipeline,
+                "writer": run.writer,
+                "stats": run.stats,
+                "seconds": seconds,
+                "report": run.report,
+                "stopped": stopped,
+            },
+            name="ingest-monitor",
+            daemon=True,
+        )
+        monitor.start()
+        # the status is reported by its own thread, the writer's threads only hand over the progress
+        reporter: threading.Thread | None = None
+        if run.progress is not None:
+            reporter = threading.Thread(
+                target=self._progress_reporter,
+                kwargs={"repository_id": run.repository_id, "progress": run.progress},
+                name="ingest-progress",
+                daemon=True,
+            )
+            reporter.start()
+        try:
+            pipeline.run(source=list(enumerate(run.files))[run.checkpoint.files_committed :])
+        finally:
+            try:
+                # the barrier: every batch is durable (or the ingestion fails) before the repository is reported
+                run.writer.close()
+            finally:
+                stopped.set()
+                monitor.join()
+                if reporter:
+                    # a PARTIAL status never lands after the final (COMPLETED or FAILED) one
+                    run.progress.put(None)
+                    reporter.join()
+                self._log_stats(pipeline=pipeline, writer=run.writer)
+                self._stage_seconds(pipeline=pipeline, writer=run.writer, stats=run.stats, seconds=seconds)
+
+    def _embed_batch(self, batch: ChunkBatch) -> list[list[float]]:
+        # https://huggingface.co/sentence-transformers/all-MiniLM-L6-v2
+        msg: str = f"embedding batch of {len(batch)} chunks ({batch.size} bytes)"
+        logger.info(msg)
+
+        # embedded with the same model queries use, the collection never embeds on its own
+        return (
+            self.embedding_cache.embed(texts=batch.texts, embed=self.vector_service.embed)
+            if self.embedding_cache
+            else self.vector_service.embed(texts=batch.texts)
+        )
+
+    def _progress_reporter(self, repository_id: str, progress: queue.Queue) -> None:
+        # reports until `None` is handed over, only the latest of the progress queued meanwhile is worth reporting
+        while True:
+            item: tuple[float, list[RepositoryFile]] | None = progress.get()
+            while item is not None and not progress.empty():
+                item = progress.get()
+            if item is None:
+                return
+            self._report_progress(repository_id=repository_id, fraction=item[0], pending=item[1])
+
+    def _report_progress(self, repository_id: str, fraction: float, pending: list[RepositoryFile]) -> None:
+        # the directories still missing, largest first, tell users what answers can not cover yet; they are taken
+        # one level below the directory all pending files share (e.g. the packages of a src/ layout)
+        common: str = os.path.commonpath([file.path for file in pending]) if len(pending) > 1 else ""
+        prefix: str = f"{common}/" if common else ""
+        areas: Counter[str] = Counter()
+        for file in pending:
+            rest: str = file.path[len(prefix) :]
+            areas[f"{prefix}{rest.partition('/')[0]}/" if "/" in rest else prefix or "./"] += 1
+        summary: list[str] = [f"{area} ({count} files)" for area, count in areas.most_common(10)]
+        if len(areas) > 10:
+            summary.append(f"{len(areas) - 10} more")
+
+        msg: str = f"repository {repository_id} is queryable, {fraction:.0%} of the files indexed"
+        logger.info(msg)
+
+        async def update_status():
+            await self.git_agent_client.status_update(
+                repository_id=repository_id,
+                status=ProcessingStatus.PARTIAL,
+                indexed_fraction=fraction,
+                pending=summary,
+            )
+
+        try:
+            asyncio.run(update_status())
+        except Exception as error:
+            # readiness is an optimization, the ingestion goes on without it
+            logger.warning(f"unable to report progress of {repository_id}: {error}")
+
+    def _monitor(
+        self,
+        repository_id: str,
+        pipeline: Pipeline,
+        writer: VectorWriter,
+        stats: IngestionStats,
+        seconds: tuple[float, float],
+        report: ExtractionReport,
+        stopped: threading.Event,
+    ) -> None:
+        while not stopped.wait(timeout=self.stats_interval):
+            self._log_stats(pipeline=pipeline, writer=writer)
+            self._stage_seconds(pipeline=pipeline, writer=writer, stats=stats, seconds=seconds)
+            self._publish_stats(repository_id=repository_id, stats=stats, report=report)
+
+    @staticmethod
+    def _stage_seconds(
+        pipeline: Pipeline, writer: VectorWriter, stats: IngestionStats, seconds: tuple[float, float]
+    ) -> None:
+        """Sets the embedding and upsert seconds to `seconds` plus the time this run spent on them"""
+        busy: dict[str, float] = {stage.name: stage.busy_seconds for stage in pipeline.stats()}
+        stats.embedding_seconds = seconds[0] + busy.get("embed", 0.0)
+        stats.upsert_seconds = seconds[1] + writer.busy_seconds
+
+    def _publish_stats(self, repository_id: str, stats: IngestionStats, report: ExtractionReport) -> None:
+        stats.updated = datetime.now()
+        stats.elapsed_seconds = (stats.updated - stats.started).total_seconds()
+        stats.files_seen = report.files_listed
+        stats.files_filtered = report.files_filtered
+        stats.files_skipped = dict(report.skipped)
+        stats.files_failed = len(report.errors)
+        stats.files_read = report.files_read
+        stats.bytes_read = report.bytes_read
+        stats.files_per_second = stats.files_read / max(stats.elapsed_seconds, 1e-9)
+        stats.chunks_per_second = stats.chunks_written / max(stats.elapsed_seconds, 1e-9)
+        # ru_maxrss is in KiB on Linux, the high-water mark of the process
+        stats.peak_memory_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+        async def update_stats():
+            await self.git_agent_client.stats_update(repository_id=repository_id, stats=stats)
+
+        try:
+            asyncio.run(update_stats())
+        except Exception as error:
+            # statistics are informational, the ingestion goes on without them
+            logger.warning(f"unable to publish ingestion statistics of {repository_id}: {error}")
+
+    def _log_stats(self, pipeline: Pipeline, writer: VectorWriter) -> None:
+        # a full queue in front of a busy stage marks the bottleneck
+        for stats in pipeline.stats():
+            msg: str = (
+                f"ingest stage {stats.name}: {stats.received} in, {stats.emitted} out, "
+                f"{stats.queue_depth}/{stats.queue_size} queued, {stats.throughput:.1f}/s, "
+                f"{stats.utilization:.0%} busy ({stats.workers} workers)"
+            )
+            logger.info(msg)
+        msg: str = (
+            f"ingest writer: {writer.written} batches written, {len(writer.pending)}/{writer.in_flight} in flight, "
+            f"{writer.retried} retries, {writer.busy_seconds:.1f}s writing"
+        )
+        logger.info(msg)
+
+    def _collapse(self, collection: Collection, duplicates: dict[str, set[str]]) -> None:
+        # chroma metadata values are scalars, the paths are stored newline separated; only collapsed chunks are
+        # counted, dropped ones leave nothing but the link a refresh needs
+        ids: list[str] = list(duplicates.keys())
+        for i in range(0, len(ids), self.batch_max_chunks):
+            records: dict = collection.get(ids=ids[i : i + self.batch_max_chunks], include=["metadatas"])
+            metadatas: list[dict] = []
+            for chunk_id, metadata in zip(records["ids"], records["metadatas"]):
+                sources: set[str] = set(filter(None, metadata.get("duplicate_sources", "").split("\n")))
+                sources |= duplicates[chunk_id] - {metadata["source"]}
+                metadata = {**metadata, "duplicate_sources": "\n".join(sorted(sources))}
+                if self.deduplication == "collapse":
+                    metadata["duplicates"] = metadata.get("duplicates", 0) + len(duplicates[chunk_id])
+                metadatas.append(metadata)
+            collection.update(ids=records["ids"], metadatas=metadatas)
+
+    def _duplicate_sources(self, collection: Collection, sources: list[str]) -> list[str]:
+        # follows collapsed chunks transitively, a re-written file can itself hold chunks collapsed from others
+        seen: set[str] = set(sources)
+        linked: list[str] = []
+        frontier: list[str] = list(sources)
+        while frontier:
+            found: list[str] = []
+            for i in range(0, len(frontier), self.batch_max_chunks):
+                records: dict = collection.get(
+                    where={"source": {"$in": frontier[i : i + self.batch_max_chunks]}}, include=["metadatas"]
+                )
+                for metadata in records["metadatas"]:
+                    for path in filter(None, metadata.get("duplicate_sources", "").split("\n")):
+                        if path not in seen:
+                            seen.add(path)
+                            found.append(path)
+            linked.extend(found)
+            frontier = found
+        return linked
 
 
 def main():
@@ -160,8 +663,20 @@ def main():
     worker: AnalysisWorker = AnalysisWorker(
         analysis_service=context["analysis_service"],
         vector_service=context["vector_service"],
+        metadata_service=context["metadata_service"],
         publisher=context["publisher"],
-        text_splitter=context["text_splitter"],
+        chunker=context["chunker"],
+        deduplication=context["ingest_deduplication"],
+        batch_max_chunks=context["ingest_batch_max_chunks"],
+        batch_max_bytes=context["ingest_batch_max_bytes"],
+        embed_workers=context["ingest_embed_workers"],
+        upsert_workers=context["ingest_upsert_workers"],
+        upsert_retries=context["ingest_upsert_retries"],
+        upsert_backoff=context["ingest_upsert_backoff"],
+        queue_batches=context["ingest_queue_batches"],
+        stats_interval=context["ingest_stats_interval"],
+        ready_fraction=context["ingest_ready_fraction"],
+        embedding_cache=context["embedding_cache"],
         git_agent_client=context["git_agent_client"],
     )
 
@@ -1,16 +1,21 @@
+import asyncio
 import logging
+import time
 from datetime import datetime
 from uuid import uuid4
 
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
+from ...core.framework.contracts.dtos.service_response import ServiceResponse
 from ...core.framework.contracts.events.repository import RepositoryEvent
 from ...core.framework.contracts.messaging.commands.repository_clone import RepositoryCloneCommand
 from ...core.framework.contracts.messaging.commands.repository_delete import RepositoryDeleteCommand
-from ...core.infrastructure.messaging.rabbitmq.consumer import MessageConsumer
+from ...core.infrastructure.messaging.rabbitmq.async_consumer import ConsumerHost, Subscription
 from ...core.infrastructure.messaging.rabbitmq.publisher import MessagePublisher
 from ..context import build_runtime_context, context
+from ..sdk.client.git import GitAgentClient
+from ..sdk.contracts.types.processing_status import ProcessingStatus
 from ..services.repository.service import RepositoryService
 
 logging.basicConfig(level=logging.INFO)
@@ -23,29 +28,36 @@ class RepositoryWorker(BaseModel):
 
     repository_service: RepositoryService
     publisher: MessagePublisher
-    consumer_clone: MessageConsumer | None = None
-    consumer_delete: MessageConsumer | None = None
+    git_agent_client: GitAgentClient
+    clone_concurrency: int = 4  # clones running at once, they mostly wait on the network
+    delete_concurrency: int = 2  # deletions running at once
+    consumer: ConsumerHost | None = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self.consumer_clone = MessageConsumer(
+        # clone and delete queues share one connection and event loop, each with its own concurrency
+        self.consumer = ConsumerHost(
             config=context["rabbitmq_config"],
-            message_handler=self.handle_repository_clone,
-            exchange_name="git_agent",
-            routing_key="repository.process",
-            queue_name="repository_clone_queue",
+            subscriptions=[
+                Subscription(
+                    message_handler=self.handle_repository_clone,
+                    exchange_name="git_agent",
+                    routing_key="repository.process",
+                    queue_name="repository_clone_queue",
+                    concurrency=self.clone_concurrency,
+                ),
+                Subscription(
+                    message_handler=self.handle_repository_delete,
+                    exchange_name="git_agent",
+                    routing_key="repository.analyzed",
+                    queue_name="repository_delete_queue",
+                    concurrency=self.delete_concurrency,
+                ),
+            ],
         )
 
-        self.consumer_delete = MessageConsumer(
-            config=context["rabbitmq_config"],
-            message_handler=self.handle_repository_delete,
-            exchange_name="git_agent",
-            routing_key="repository.analyzed",
-            queue_name="repository_delete_queue",
-        )
-
-    def handle_repository_clone(self, message: dict):
+    async def handle_repository_clone(self, message: dict):
         event = RepositoryEvent.model_validate(message)
 
         clone_command = RepositoryCloneCommand(
@@ -55,10 +67,20 @@ class RepositoryWorker(BaseModel):
             repository_id=event.repository_id,
             collection_id=event.collection_id,
             url=event.url,
+            base_commit=event.base_commit,
         )
 
         try:
-            self.repository_service.clone(url=event.url, repository_id=event.repository_id)
+            # the clone runs in a thread, events are awaited so the other subscriptions go on meanwhile
+            started: float = time.perf_counter()
+            response: ServiceResponse = await asyncio.to_thread(
+                self.repository_service.clone,
+                url=clone_command.url,
+                repository_id=clone_command.repository_id,
+                base_commit=clone_command.base_commit,
+            )
+            if not response.success:
+                raise Exception(response.error)
 
             # Publish success event
             event = RepositoryEvent(
@@ -70,14 +92,22 @@ class RepositoryWorker(BaseModel):
                 repository_id=clone_command.repository_id,
                 collection_id=clone_command.collection_id,
                 url=clone_command.url,
+                commit=response.data["commit"],
+                base_commit=response.data.get("base_commit"),
+                # without its base commit a refresh re-ingests every file, still next to the live collection
+                refresh=clone_command.base_commit is not None,
+                clone_seconds=time.perf_counter() - started,
             )
 
-            self.publisher.publish_message(
+            await self.publisher.publish_message_async(
                 routing_key="repository.cloned", message=event, correlation_id=clone_command.correlation_id
             )
 
         except Exception as error:
             logger.error(f"Error handling repository clone event: {str(error)}")
+            await self._report_failure(
+                repository_id=clone_command.repository_id, refresh=clone_command.base_commit is not None
+            )
 
             # Publish failure event
             event = RepositoryEvent(
@@ -92,11 +122,11 @@ class RepositoryWorker(BaseModel):
                 error_details=str(error),
             )
 
-            self.publisher.publish_message(
+            await self.publisher.publish_message_async(
                 routing_key="repository.failed", message=event, correlation_id=clone_command.correlation_id
             )
 
-    def handle_repository_delete(self, message: dict):
+    async def handle_repository_delete(self, message: dict):
         event = RepositoryEvent.model_validate(message)
 
         delete_command = RepositoryDeleteCommand(
@@ -107,7 +137,7 @@ class RepositoryWorker(BaseModel):
         )
 
         try:
-            self.repository_service.delete(repository_id=event.repository_id)
+            await asyncio.to_thread(self.repository_service.delete, repository_id=event.repository_id)
 
             # Publish success event
             event = RepositoryEvent(
@@ -119,7 +149,7 @@ class RepositoryWorker(BaseModel):
                 repository_id=delete_command.repository_id,
             )
 
-            self.publisher.publish_message(
+            await self.publisher.publish_message_async(
                 routing_key="repository.deleted", message=event, correlation_id=delete_command.correlation_id
             )
 
@@ -134,21 +164,31 @@ class RepositoryWorker(BaseModel):
                 correlation_id=delete_command.correlation_id,
                 source_service="repository_worker",
                 repository_id=delete_command.repository_id,
-                collection_id=delete_command.collection_id,
+                collection_id=event.collection_id,
                 error_details=str(error),
             )
 
-            self.publisher.publish_message(
+            await self.publisher.publish_message_async(
                 routing_key="repository.failed", message=event, correlation_id=delete_command.correlation_id
             )
 
+    async def _report_failure(self, repository_id: str, refresh: bool) -> None:
+        # a failed repository can be refreshed (or ingested) again, a refresh which failed to clone leaves the indexed
+        # commit queryable; the client blocks, so it runs in a thread and the other subscriptions go on
+        try:
+            await asyncio.to_thread(
+                self.git_agent_client.status_update_sync,
+                repository_id=repository_id,
+                status=None if refresh else ProcessingStatus.FAILED,
+            )
+        except Exception as error:
+            logger.error(f"unable to report the failure of {repository_id}: {error}")
+
     def start(self):
-        self.consumer_clone.start_consuming()
-        self.consumer_delete.start_consuming()
+        self.consumer.start_consuming()
 
     def stop(self):
-        self.consumer_clone.stop_consuming()
-        self.consumer_delete.stop_consuming()
+        self.consumer.stop_consuming()
 
 
 def main():
@@ -161,7 +201,11 @@ def main():
     logger.info("Done initializing context")
 
     worker: RepositoryWorker = RepositoryWorker(
-        repository_service=context["repository_service"], publisher=context["publisher"]
+        repository_service=context["repository_service"],
+        publisher=context["publisher"],
+        git_agent_client=context["git_agent_client"],
+        clone_concurrency=context["repository_clone_concurrency"],
+        delete_concurrency=context["repository_delete_concurrency"],
     )
 
     logger.info("Consuming messages from queue")
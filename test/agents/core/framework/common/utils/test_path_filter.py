@@ -0,0 +1,96 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from shapeandshare.agents.core.framework.common.utils.path_filter import IgnoreRule, PathFilter
+
+# (.gitignore lines, directory of the .gitignore, {path: ignored}), the expectations are what `git check-ignore`
+# reports for the same files
+CASES: list[tuple[list[str], str, dict[str, bool]]] = [
+    # unanchored patterns match at any depth
+    (["*.log"], "", {"debug.log": True, "logs/debug.log": True, "debug.log.txt": False}),
+    ([".env"], "", {".env": True, "config/.env": True, "environment/settings.py": False, ".envrc": False}),
+    # a leading or middle slash anchors the pattern to the .gitignore's directory
+    (["/build"], "", {"build/out.o": True, "src/build/out.o": False}),
+    (["doc/*.txt"], "", {"doc/notes.txt": True, "doc/server/arch.txt": False, "src/doc/notes.txt": False}),
+    # a trailing slash only matches directories
+    (["build/"], "", {"build/out.o": True, "src/build/out.o": True, "lib/build": False}),
+    # `**` spans directories
+    (["**/logs"], "", {"logs/a.txt": True, "x/y/logs/a.txt": True, "x/logs.txt": False}),
+    (["logs/**"], "", {"logs/a/b.txt": True, "x/logs/a.txt": False}),
+    (["a/**/b"], "", {"a/b": True, "a/x/y/b": True, "a/xb": False, "c/a/x/b": False}),
+    # wildcards never cross a slash
+    (["src/*.py"], "", {"src/a.py": True, "src/pkg/a.py": False}),
+    (["?.c"], "", {"a.c": True, "ab.c": False}),
+    # character classes, with ranges and negation
+    (["*.py[co]"], "", {"m.pyc": True, "m.pyo": True, "m.pyx": False}),
+    (["file[0-9].md"], "", {"file1.md": True, "fileA.md": False}),
+    (["[!a]*.txt"], "", {"b.txt": True, "a.txt": False}),
+    # the last matching rule wins
+    (["*.log", "!keep.log"], "", {"keep.log": False, "other.log": True}),
+    (["!keep.log", "*.log"], "", {"keep.log": True}),
+    # a file can not be re-included when a parent directory is ignored
+    (["build/", "!build/keep.txt"], "", {"build/keep.txt": True, "build/other.txt": True}),
+    (["build/*", "!build/keep.txt"], "", {"build/keep.txt": False, "build/other.txt": True}),
+    (["vendor", "!vendor/lib/keep.go"], "", {"vendor/lib/keep.go": True}),
+    # escapes, comments and trailing spaces
+    (["\\#notes", "# a comment", "\\!important"], "", {"#notes": True, "!important": True, "a comment": False}),
+    (["*.tmp   "], "", {"x.tmp": True}),
+    # rules of a nested .gitignore only apply beneath its directory
+    (["*.txt", "/top.md"], "sub", {"sub/a.txt": True, "sub/deep/a.txt": True, "a.txt": False, "sub/top.md": True}),
+    (["/top.md"], "sub", {"top.md": False, "sub/deep/top.md": False}),
+]
+
+
+def ids() -> list[str]:
+    return [f"{base or '.'}:{'|'.join(lines)}" for lines, base, _ in CASES]
+
+
+@pytest.mark.parametrize("lines, base, expected", CASES, ids=ids())
+def test_gitignore_rules(lines: list[str], base: str, expected: dict[str, bool]):
+    path_filter: PathFilter = PathFilter()
+    path_filter.add_gitignore(lines=lines, base=base)
+    assert {path: not path_filter.matches(path=path) for path in expected} == expected
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+@pytest.mark.parametrize("lines, base, expected", CASES, ids=ids())
+def test_cases_agree_with_git(tmp_path: Path, lines: list[str], base: str, expected: dict[str, bool]):
+    # the user's and system's git configuration (e.g. a global excludes file) is left out
+    env: dict[str, str] = {**os.environ, "GIT_CONFIG_GLOBAL": os.devnull, "GIT_CONFIG_NOSYSTEM": "1"}
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True, env=env)
+    (tmp_path / base).mkdir(parents=True, exist_ok=True)
+    (tmp_path / base / ".gitignore").write_text("".join(f"{line}\n" for line in lines))
+    for path in expected:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+
+    for path, ignored in expected.items():
+        result = subprocess.run(["git", "check-ignore", "-q", path], cwd=tmp_path, env=env, check=False)
+        assert result.returncode in (0, 1)
+        assert (result.returncode == 0) == ignored, path
+
+
+def test_excluded_dirs_match_whole_components():
+    path_filter: PathFilter = PathFilter(extensions={".py"}, excluded_dirs={".env", "node_modules"})
+    assert path_filter.filter(
+        paths=[
+            "environment/settings.py",
+            ".env/lib/site.py",
+            "app/node_modules/pkg/index.py",
+            "app/node_modules_backup/index.py",
+            "app/main.PY",
+            "app/README",
+        ]
+    ) == ["environment/settings.py", "app/node_modules_backup/index.py", "app/main.PY"]
+    assert path_filter.excludes_dir(directory="app/node_modules/pkg")
+    assert not path_filter.excludes_dir(directory="environment")
+
+
+def test_blank_and_comment_lines_are_not_rules():
+    assert IgnoreRule.parse(line="\n") is None
+    assert IgnoreRule.parse(line="# comment") is None
+    assert IgnoreRule.parse(line="/") is None
@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from shapeandshare.agents.core.framework.common.utils.pipeline import Pipeline, Stage
+
+
+def run_in_thread(pipeline: Pipeline, source) -> BaseException | None:
+    """Runs the pipeline, failing the test instead of hanging when it does not return"""
+    raised: list[BaseException] = []
+
+    def target():
+        try:
+            pipeline.run(source=source)
+        except BaseException as error:  # pylint: disable=broad-except
+            raised.append(error)
+
+    thread: threading.Thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "the pipeline did not return"
+    return raised[0] if raised else None
+
+
+def pipeline_threads() -> list[threading.Thread]:
+    return [thread for thread in threading.enumerate() if thread.name.startswith("pipeline-")]
+
+
+def test_ordered_stages_keep_input_order():
+    rng: random.Random = random.Random(1)
+    delays: list[float] = [rng.uniform(0, 0.005) for _ in range(200)]
+    collected: list[int] = []
+
+    def slow_square(item: int) -> Iterator[int]:
+        time.sleep(delays[item])
+        yield item * item
+
+    def expand(item: int) -> Iterator[int]:
+        # several outputs per input stay together and in order
+        time.sleep(delays[item % len(delays)] / 2)
+        yield from (item, -item)
+
+    def flush() -> Iterator[int]:
+        yield -1
+
+    pipeline: Pipeline = Pipeline(
+        stages=[
+            Stage(name="square", process=slow_square, workers=8, queue_size=4, ordered=True),
+            Stage(name="expand", process=expand, workers=4, queue_size=4, ordered=True),
+            Stage(name="collect", process=lambda item: collected.append(item) or (), flush=flush),
+        ]
+    )
+    assert run_in_thread(pipeline=pipeline, source=range(200)) is None
+
+    assert collected == [value for item in range(200) for value in (item * item, -item * item)]
+    stats = {stage.name: stage for stage in pipeline.stats()}
+    assert stats["square"].received == 200
+    assert stats["expand"].emitted == 400
+    assert stats["collect"].received == 400
+
+
+def test_stage_error_stops_pipeline():
+    processed: list[int] = []
+
+    def fail_on_seven(item: int) -> Iterator[int]:
+        if item == 7:
+            raise RuntimeError("bad item")
+        yield item
+
+    def collect(item: int) -> Iterator[None]:
+        time.sleep(0.001)
+        processed.append(item)
+        yield from ()
+
+    pipeline: Pipeline = Pipeline(
+        stages=[
+            Stage(name="check", process=fail_on_seven, workers=4, queue_size=2, ordered=True),
+            Stage(name="collect", process=collect, workers=2, queue_size=2),
+        ]
+    )
+    error: BaseException | None = run_in_thread(pipeline=pipeline, source=range(10_000))
+
+    assert isinstance(error, RuntimeError) and str(error) == "bad item"
+    # the remaining items are drained, not processed
+    assert len(processed) < 100
+    assert 7 not in processed
+    assert not pipeline_threads()
+
+
+def test_source_error_stops_pipeline():
+    def source() -> Iterator[int]:
+        yield from range(5)
+        raise ValueError("listing failed")
+
+    pipeline: Pipeline = Pipeline(stages=[Stage(name="echo", process=lambda item: [item], workers=2)])
+    error: BaseException | None = run_in_thread(pipeline=pipeline, source=source())
+
+    assert isinstance(error, ValueError)
+    assert not pipeline_threads()
+
+
+def test_flush_requires_single_worker():
+    pipeline: Pipeline = Pipeline(stages=[Stage(name="batch", process=lambda item: [item], workers=2, flush=list)])
+    with pytest.raises(ValueError):
+        pipeline.run(source=range(3))
+
+
+def test_full_queues_block_producer():
+    released: threading.Event = threading.Event()
+    produced: list[int] = []
+    written: list[int] = []
+
+    def source() -> Iterator[int]:
+        for item in range(100):
+            produced.append(item)
+            yield item
+
+    def write(item: int) -> Iterator[None]:
+        released.wait()
+        written.append(item)
+        yield from ()
+
+    pipeline: Pipeline = Pipeline(
+        stages=[
+            Stage(name="read", process=lambda item: [item], queue_size=2),
+            Stage(name="write", process=write, queue_size=2),
+        ]
+    )
+    thread: threading.Thread = threading.Thread(target=pipeline.run, kwargs={"source": source()}, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+
+    # one item in each worker, each queue full, and the one the source is blocked handing over
+    assert len(produced) <= 2 + 2 + 2 + 1
+    assert not written
+
+    released.set()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert written == list(range(100))
@@ -0,0 +1,65 @@
+from shapeandshare.agents.core.services.vector.batcher import ChunkBatch, ChunkBatcher
+from shapeandshare.agents.core.services.vector.cache import EmbeddingCache
+from shapeandshare.agents.git.services.analysis.chunker import Chunker
+
+FUNCTION: str = '''def add(a: int, b: int) -> int:
+    """Adds two numbers"""
+    return a + b
+'''
+
+
+class MemoryDao:
+    """The parts of `MongoDaoLegacy` the cache uses, in memory"""
+
+    def __init__(self):
+        self.documents: dict[str, dict] = {}
+
+    def get_many(self, document_type, document_ids: list[str]) -> list[dict]:
+        return [self.documents[document_id] for document_id in document_ids if document_id in self.documents]
+
+    def update_many(self, document_type, document_ids: list[str], partial: dict) -> None:
+        for document_id in document_ids:
+            self.documents[document_id].update(partial)
+
+    def upsert_many(self, document_type, documents: list[dict]) -> None:
+        for document in documents:
+            self.documents[document["id"]] = document
+
+    def count(self, document_type) -> int:
+        return len(self.documents)
+
+
+def embedded(batch: ChunkBatch) -> tuple[EmbeddingCache, list[list[str]]]:
+    calls: list[list[str]] = []
+
+    def embed(texts: list[str]) -> list[list[float]]:
+        calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    cache: EmbeddingCache = EmbeddingCache.model_construct(dao=MemoryDao(), model_name="model")
+    for i in range(len(batch)):
+        cache.embed(texts=batch.texts[i : i + 1], embed=embed)
+    return cache, calls
+
+
+def test_moved_code_shares_cache_entry(monkeypatch):
+    monkeypatch.setenv("HASH_KEY", "test")
+    chunker: Chunker = Chunker()
+    batcher: ChunkBatcher = ChunkBatcher()
+    files: dict[str, str] = {
+        "src/math.py": FUNCTION,
+        "vendor/lib/math.py": FUNCTION,  # another path
+        "src/shifted.py": f"def pad():\n    return '{'x' * 1480}'\n{FUNCTION}",  # other lines, too long to share a chunk
+    }
+    for path, text in files.items():
+        chunk = chunker.split(path=path, text=text)[-1]
+        batcher.add(chunk_id=path, text=chunk.text, document=chunk.document(), metadata=chunk.metadata())
+    batch: ChunkBatch = batcher.flush()
+
+    # the stored documents still name their file and lines
+    assert len(set(batch.documents)) == 3
+    assert [metadata["start_line"] for metadata in batch.metadatas] == [1, 1, 3]
+
+    cache, calls = embedded(batch=batch)
+    assert calls == [[FUNCTION]]
+    assert (cache.hits, cache.misses) == (2, 1)
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Iterator
+
+import pytest
+from chromadb.api.models.Collection import Collection
+
+from shapeandshare.agents.core.framework.common.utils.pipeline import Pipeline, Stage
+from shapeandshare.agents.core.services.vector.batcher import ChunkBatch
+from shapeandshare.agents.core.services.vector.writer import VectorWriter
+
+
+class FakeCollection(Collection):
+    """A collection whose first `failures` upserts raise `error`, each upsert waits for `gate`"""
+
+    def __init__(self, failures: int = 0, error: Exception | None = None):  # pylint: disable=super-init-not-called
+        self.failures = failures
+        self.error = error or ConnectionError("chroma unavailable")
+        self.gate = threading.Event()
+        self.gate.set()
+        self.attempts = 0
+        self.ids: list[str] = []
+        self.attempts_lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs) -> None:
+        self.gate.wait()
+        with self.attempts_lock:
+            self.attempts += 1
+            if self.attempts <= self.failures:
+                raise self.error
+            self.ids.extend(ids)
+
+
+def batch(number: int) -> ChunkBatch:
+    return ChunkBatch(ids=[f"chunk-{number}"], texts=["text"], documents=["document"], metadatas=[{}], size=8)
+
+
+def test_failed_writes_are_retried():
+    collection: FakeCollection = FakeCollection(failures=2)
+    writer: VectorWriter = VectorWriter(collection=collection, in_flight=1, retries=3, backoff=0.001)
+    written: list[int] = []
+
+    writer.submit(batch=batch(1), embeddings=[[0.0]], on_written=lambda: written.append(1))
+    writer.close()
+
+    assert collection.attempts == 3
+    assert collection.ids == ["chunk-1"]
+    assert written == [1]
+    assert (writer.written, writer.retried) == (1, 2)
+
+
+def test_validation_errors_are_not_retried():
+    collection: FakeCollection = FakeCollection(failures=1, error=ValueError("bad embedding"))
+    writer: VectorWriter = VectorWriter(collection=collection, in_flight=1, retries=3, backoff=0.001)
+
+    writer.submit(batch=batch(1), embeddings=[[0.0]])
+    with pytest.raises(ValueError):
+        writer.close()
+    assert collection.attempts == 1
+
+
+def test_flush_waits_for_every_pending_write():
+    collection: FakeCollection = FakeCollection()
+    collection.gate.clear()
+    writer: VectorWriter = VectorWriter(collection=collection, in_flight=4)
+    written: list[int] = []
+
+    for number in range(4):
+        writer.submit(batch=batch(number), embeddings=[[0.0]], on_written=lambda number=number: written.append(number))
+    flushed: threading.Event = threading.Event()
+    flusher: threading.Thread = threading.Thread(target=lambda: (writer.flush(), flushed.set()), daemon=True)
+    flusher.start()
+
+    time.sleep(0.1)
+    assert not flushed.is_set()
+
+    collection.gate.set()
+    flusher.join(timeout=10)
+    assert flushed.is_set()
+    assert sorted(written) == [0, 1, 2, 3]
+    assert writer.written == 4 and not writer.pending
+    writer.close()
+
+
+def test_exhausted_retries_fail_the_pipeline():
+    collection: FakeCollection = FakeCollection(failures=1_000)
+    writer: VectorWriter = VectorWriter(collection=collection, in_flight=2, retries=2, backoff=0.001)
+
+    def upsert(number: int) -> Iterator[None]:
+        writer.submit(batch=batch(number), embeddings=[[0.0]])
+        yield from ()
+
+    pipeline: Pipeline = Pipeline(stages=[Stage(name="upsert", process=upsert, queue_size=2)])
+    with pytest.raises(ConnectionError):
+        # as ingestion runs it, the writer is closed once the pipeline is done
+        try:
+            pipeline.run(source=range(100))
+        finally:
+            writer.close()
+
+    # the first failure stopped the pipeline, later batches were not written
+    assert collection.attempts < 100 * 3
+    assert not collection.ids
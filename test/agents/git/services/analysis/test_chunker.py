@@ -0,0 +1,26 @@
+from shapeandshare.agents.git.services.analysis.chunker import Chunker
+
+
+def test_character_chunks_do_not_share_lines():
+    text: str = "".join(f"line {number} " + "x" * (20 + number % 7) + "\n" for number in range(1, 200))
+    chunks = Chunker(max_chars=300).split(path="notes.txt", text=text)
+    lines: list[str] = text.split("\n")
+    assert len(chunks) > 1
+    assert chunks[0].start_line == 1 and chunks[-1].end_line == 199
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start_line == previous.end_line + 1
+    for chunk in chunks:
+        assert chunk.text == "\n".join(lines[chunk.start_line - 1 : chunk.end_line]) + "\n"
+
+
+def test_markdown_heading_leads_its_section():
+    paragraph: str = " ".join(["word"] * 99)
+    text: str = "# Title\n\nIntro.\n\n## Usage\n\n" + "\n\n".join([paragraph] * 6) + "\n"
+    chunks = Chunker(max_chars=500).split(path="README.md", text=text)
+    usage = [chunk for chunk in chunks if "## Usage" in chunk.text]
+    assert len(usage) == 1
+    assert usage[0].text.startswith("## Usage\n\nword")
+    # the first line of the section does not fit next to the heading within 500 characters, it is kept whole
+    assert len(usage[0].text) <= 500 + len("## Usage\n\n")
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start_line > previous.end_line
@@ -0,0 +1,78 @@
+import random
+import re
+
+from shapeandshare.agents.git.services.analysis.deduplicator import ChunkDeduplicator
+
+APACHE: str = """# Copyright 2024 The Example Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+
+MIT: str = """# Copyright (c) 2024 The Example Authors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+"""
+
+
+def test_exact_duplicate():
+    deduplicator: ChunkDeduplicator = ChunkDeduplicator()
+    assert deduplicator.check(chunk_id="a.py-0", text=APACHE) is None
+    assert deduplicator.check(chunk_id="b.py-0", text=APACHE) == "a.py-0"
+
+
+def test_licence_header_variants():
+    variants: list[str] = [
+        APACHE.replace("2.0", "3.0"),
+        APACHE.replace("2024", "2019"),
+        APACHE.replace("The Example Authors", "Shape and Share LLC"),
+        APACHE.replace("# ", "// ").replace("#", "//"),
+        APACHE.replace("Copyright 2024", "Copyright 2019-2024").replace("reserved.", "reserved"),
+    ]
+    deduplicator: ChunkDeduplicator = ChunkDeduplicator()
+    assert deduplicator.check(chunk_id="LICENSE-0", text=APACHE) is None
+    for i, variant in enumerate(variants):
+        assert deduplicator.check(chunk_id=f"file{i}.py-0", text=variant) == "LICENSE-0", variant
+
+
+def test_other_licence_is_kept():
+    deduplicator: ChunkDeduplicator = ChunkDeduplicator()
+    assert deduplicator.check(chunk_id="a.py-0", text=APACHE) is None
+    assert deduplicator.check(chunk_id="b.py-0", text=MIT) is None
+
+
+def test_changed_tokens():
+    # a few changed words still make a near-duplicate, the chunk is compared against its original only
+    rng: random.Random = random.Random(7)
+    words: list[re.Match] = list(re.finditer(r"\w+", APACHE))
+    for changed, expected in [(1, 100), (2, 100), (5, 95)]:
+        caught: int = 0
+        for trial in range(100):
+            text: str = APACHE
+            for word in sorted(rng.sample(words, changed), key=lambda match: -match.start()):
+                text = f"{text[: word.start()]}w{trial}x{word.start()}{text[word.end() :]}"
+            deduplicator: ChunkDeduplicator = ChunkDeduplicator()
+            deduplicator.check(chunk_id="original", text=APACHE)
+            caught += deduplicator.check(chunk_id="changed", text=text) == "original"
+        assert caught >= expected, (changed, caught)
+
+
+def test_short_chunks_match_exactly():
+    deduplicator: ChunkDeduplicator = ChunkDeduplicator()
+    assert deduplicator.check(chunk_id="a.py-0", text="import os\nimport sys\n") is None
+    assert deduplicator.check(chunk_id="b.py-0", text="import os\nimport re\n") is None
+    assert deduplicator.check(chunk_id="c.py-0", text="import os\nimport sys\n") == "a.py-0"
@@ -0,0 +1,147 @@
+import queue
+import threading
+from datetime import datetime
+
+import pytest
+from chromadb.api.models.Collection import Collection
+
+from shapeandshare.agents.core.framework.contracts.dtos.extraction_report import ExtractionReport
+from shapeandshare.agents.core.framework.contracts.dtos.ingestion_checkpoint import IngestionCheckpoint
+from shapeandshare.agents.core.framework.contracts.dtos.repository_file import RepositoryFile
+from shapeandshare.agents.core.framework.contracts.dtos.service_response import ServiceResponse
+from shapeandshare.agents.core.services.vector.batcher import ChunkBatcher
+from shapeandshare.agents.core.services.vector.writer import VectorWriter
+from shapeandshare.agents.git.sdk.contracts.dtos.ingestion_stats import IngestionStats
+from shapeandshare.agents.git.services.analysis.chunker import Chunker
+from shapeandshare.agents.git.services.analysis.deduplicator import ChunkDeduplicator
+from shapeandshare.agents.git.services.analysis.ingestion import IngestionRun
+from shapeandshare.agents.git.services.analysis.service import AnalysisService
+from shapeandshare.agents.git.services.metadata.service import MetadataService
+
+CONTENTS: dict[str, str] = {
+    **{f"pkg/module_{i}.py": f"def function_{i}(value):\n    return value * {i}\n" for i in range(6)},
+    "pkg/copy.py": "def function_0(value):\n    return value * 0\n",  # a copy of a file written before
+}
+FILES: list[RepositoryFile] = [RepositoryFile(path=path, size=len(text)) for path, text in CONTENTS.items()]
+
+
+class MemoryAnalysisService(AnalysisService):
+    def classify_file(self, repository_id: str, file: RepositoryFile) -> ServiceResponse:
+        # small files are read whole while they are classified
+        return ServiceResponse(success=True, data={"content": CONTENTS[file.path], "truncated": False})
+
+
+class MemoryMetadataService(MetadataService):
+    checkpoints: dict[str, IngestionCheckpoint] = {}
+    saved: list[IngestionCheckpoint] = []
+
+    def checkpoint_get(self, collection_id: str) -> IngestionCheckpoint | None:
+        checkpoint: IngestionCheckpoint | None = self.checkpoints.get(collection_id)
+        return checkpoint.model_copy(deep=True) if checkpoint else None
+
+    def checkpoint_save(self, checkpoint: IngestionCheckpoint) -> None:
+        checkpoint.updated = datetime.now()
+        self.checkpoints[checkpoint.id] = checkpoint.model_copy(deep=True)
+        self.saved.append(checkpoint.model_copy(deep=True))
+
+
+class RecordingCollection(Collection):
+    """Records upserted ids, upserts after the first `healthy` ones fail"""
+
+    def __init__(self, healthy: int | None = None):  # pylint: disable=super-init-not-called
+        self.healthy = healthy
+        self.ids: list[str] = []
+        self.upserts = 0
+        self.lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return "recording"
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs) -> None:
+        with self.lock:
+            self.upserts += 1
+            if self.healthy is not None and self.upserts > self.healthy:
+                raise ConnectionError("chroma unavailable")
+            self.ids.extend(ids)
+
+
+def ingestion_run(
+    metadata_service: MetadataService, checkpoint: IngestionCheckpoint, collection: Collection | None = None, **kwargs
+) -> IngestionRun:
+    return IngestionRun(
+        analysis_service=MemoryAnalysisService.model_construct(),
+        chunker=Chunker(),
+        metadata_service=metadata_service,
+        writer=VectorWriter(collection=collection or RecordingCollection(), in_flight=1, retries=0),
+        embed_batch=lambda batch: [[0.0] for _ in range(len(batch))],
+        repository_id="repository",
+        files=FILES,
+        report=ExtractionReport(),
+        checkpoint=checkpoint,
+        stats=IngestionStats(started=datetime.now()),
+        batcher=ChunkBatcher(max_chunks=2),
+        deduplicator=ChunkDeduplicator(),
+        **kwargs,
+    )
+
+
+def new_checkpoint() -> IngestionCheckpoint:
+    return IngestionCheckpoint(id="collection", repository_id="repository", commit="abc", model_name="model")
+
+
+def test_checkpoint_advances_in_batch_order():
+    metadata_service: MemoryMetadataService = MemoryMetadataService.model_construct(checkpoints={}, saved=[])
+    progress: queue.Queue = queue.Queue()
+    run: IngestionRun = ingestion_run(
+        metadata_service=metadata_service, checkpoint=new_checkpoint(), ready_fraction=0.25, progress=progress
+    )
+
+    # batch 3 is written first, nothing before it is known to be durable
+    run.commit(number=3, files_done=7, chunks=2)
+    assert run.checkpoint.files_committed == 0
+    assert not metadata_service.saved
+    assert run.stats.chunks_written == 2
+
+    run.commit(number=1, files_done=2, chunks=2)
+    assert (run.checkpoint.files_committed, run.checkpoint.chunks_written) == (2, 2)
+    assert progress.get_nowait() == (2 / 7, FILES[2:])
+
+    # batch 2 completes the run up to batch 3
+    run.commit(number=2, files_done=4, chunks=2)
+    assert (run.checkpoint.files_committed, run.checkpoint.chunks_written) == (7, 6)
+    assert [checkpoint.files_committed for checkpoint in metadata_service.saved] == [2, 7]
+    assert not run.written
+    assert progress.empty()
+
+
+def test_interrupted_run_resumes_from_saved_checkpoint():
+    metadata_service: MemoryMetadataService = MemoryMetadataService.model_construct(checkpoints={}, saved=[])
+
+    # the third write fails for good, the two batches before it are durable
+    first: RecordingCollection = RecordingCollection(healthy=2)
+    run: IngestionRun = ingestion_run(metadata_service=metadata_service, checkpoint=new_checkpoint(), collection=first)
+    with pytest.raises(ConnectionError):
+        try:
+            run.pipeline(read_workers=2, embed_workers=2, queue_batches=2).run(source=list(enumerate(FILES)))
+        finally:
+            run.writer.close()
+    assert first.ids == [f"pkg/module_{i}.py-0" for i in range(4)]
+
+    checkpoint: IngestionCheckpoint = metadata_service.checkpoint_get(collection_id="collection")
+    assert (checkpoint.files_committed, checkpoint.chunks_written) == (4, 4)
+
+    second: RecordingCollection = RecordingCollection()
+    resumed: IngestionRun = ingestion_run(metadata_service=metadata_service, checkpoint=checkpoint, collection=second)
+    resumed.restore(read_workers=2)
+    try:
+        resumed.pipeline(read_workers=2, embed_workers=2, queue_batches=2).run(
+            source=list(enumerate(FILES))[checkpoint.files_committed :]
+        )
+    finally:
+        resumed.writer.close()
+
+    # only the remaining files are written, the copy is known to duplicate a file of the interrupted run
+    assert second.ids == ["pkg/module_4.py-0", "pkg/module_5.py-0"]
+    assert resumed.duplicates == {"pkg/module_0.py-0": {"pkg/copy.py"}}
+    assert (resumed.checkpoint.files_committed, resumed.checkpoint.chunks_written) == (7, 6)
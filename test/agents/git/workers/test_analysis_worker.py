@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+
+from shapeandshare.agents.core.framework.contracts.dtos.ingestion_checkpoint import IngestionCheckpoint
+from shapeandshare.agents.core.framework.contracts.messaging.commands.repository_analyze import RepositoryAnalyzeCommand
+from shapeandshare.agents.core.services.vector.service import VectorService
+from shapeandshare.agents.git.services.metadata.service import MetadataService
+from shapeandshare.agents.git.workers.analysis import AnalysisWorker
+
+
+class MemoryMetadataService(MetadataService):
+    checkpoints: dict[str, IngestionCheckpoint] = {}
+
+    def checkpoint_get(self, collection_id: str) -> IngestionCheckpoint | None:
+        checkpoint: IngestionCheckpoint | None = self.checkpoints.get(collection_id)
+        return checkpoint.model_copy(deep=True) if checkpoint else None
+
+
+class RecordingClient:
+    def __init__(self):
+        self.deleted: list[str] = []
+
+    def delete_collection(self, name: str) -> None:
+        self.deleted.append(name)
+
+
+def command(commit: str = "def", base_commit: str | None = "abc") -> RepositoryAnalyzeCommand:
+    return RepositoryAnalyzeCommand(
+        command_id="command",
+        timestamp=datetime.now(),
+        correlation_id="correlation",
+        repository_id="repository",
+        collection_id="collection",
+        analysis_config={},
+        commit=commit,
+        base_commit=base_commit,
+        refresh=base_commit is not None,
+    )
+
+
+def worker(stored: IngestionCheckpoint | None) -> AnalysisWorker:
+    return AnalysisWorker.model_construct(
+        metadata_service=MemoryMetadataService.model_construct(checkpoints={"collection": stored} if stored else {}),
+        vector_service=VectorService.model_construct(client=RecordingClient(), model_name="model-a"),
+    )
+
+
+def stored_checkpoint(**changes) -> IngestionCheckpoint:
+    checkpoint: IngestionCheckpoint = IngestionCheckpoint(
+        id="collection",
+        repository_id="repository",
+        commit="def",
+        base_commit="abc",
+        model_name="model-a",
+        paths=["a.py", "b.py"],
+        stale=["a.py"],
+        files_committed=1,
+        chunks_written=3,
+        updated=datetime.now(),
+    )
+    return checkpoint.model_copy(update=changes)
+
+
+def test_matching_checkpoint_is_resumed():
+    analysis_worker: AnalysisWorker = worker(stored=stored_checkpoint())
+    checkpoint: IngestionCheckpoint = analysis_worker._checkpoint(command=command())
+    assert checkpoint == stored_checkpoint().model_copy(update={"updated": checkpoint.updated})
+    assert not analysis_worker.vector_service.client.deleted
+
+
+def test_missing_checkpoint_starts_over():
+    checkpoint: IngestionCheckpoint = worker(stored=None)._checkpoint(command=command())
+    assert checkpoint.updated is None and checkpoint.files_committed == 0
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"commit": "fed"},  # an older refresh of the repository
+        {"base_commit": None},  # a first ingest of the same commit
+        {"model_name": "model-b"},  # vectors of another model
+        {"repository_id": "another"},
+    ],
+)
+def test_checkpoint_of_another_job_is_discarded(changes: dict):
+    analysis_worker: AnalysisWorker = worker(stored=stored_checkpoint(**changes, rebuild_id="rebuild"))
+    checkpoint: IngestionCheckpoint = analysis_worker._checkpoint(command=command())
+
+    assert checkpoint.updated is None
+    assert (checkpoint.files_committed, checkpoint.chunks_written, checkpoint.paths) == (0, 0, None)
+    assert (checkpoint.commit, checkpoint.base_commit, checkpoint.model_name) == ("def", "abc", "model-a")
+    # the collection the discarded job was rebuilding is left to nothing
+    assert analysis_worker.vector_service.client.deleted == ["rebuild"]